@@ -0,0 +1,118 @@
+"""Helpers to run pulumi programs offline against mocks for benchmarks"""
+import logging
+import multiprocessing
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable
+
+import pulumi
+from pulumi.runtime.mocks import MockMonitor
+
+ACCOUNT_ID = "123456789012"
+REGION = "eu-west-1"
+
+# Results of the invokes made by the components
+CALL_RESULTS = {
+    "aws:index/getCallerIdentity:getCallerIdentity": {
+        "accountId": ACCOUNT_ID,
+        "arn": f"arn:aws:iam::{ACCOUNT_ID}:user/benchmark",
+        "id": ACCOUNT_ID,
+        "userId": "AIDABENCHMARK",
+    },
+    "aws:index/getRegion:getRegion": {
+        "id": REGION,
+        "name": REGION,
+        "endpoint": f"ec2.{REGION}.amazonaws.com",
+        "description": "Europe (Ireland)",
+    },
+    "aws:ec2/getVpcPeeringConnection:getVpcPeeringConnection": {
+        "id": "pcx-0123456789abcdef0",
+    },
+}
+
+# Deprecation warnings of pulumi_aws input types would flood the output
+_logger = logging.getLogger("benchmarks.mocks")
+_logger.setLevel(logging.ERROR)
+
+# Outputs of the resources read with Resource.get
+READ_OUTPUTS = {
+    "aws:ec2/vpc:Vpc": {"cidrBlock": "10.100.0.0/16"},
+}
+
+
+class BenchmarkMocks(pulumi.runtime.Mocks):
+    """Mocks that echo resource inputs back as outputs and count the
+    resources and invokes of the program"""
+
+    def __init__(self, invoke_latency: float = 0.0) -> None:
+        self.resources = 0
+        self.invokes = 0
+        # Seconds every invoke takes, to stand in for the provider round trip
+        self.invoke_latency = invoke_latency
+
+    def new_resource(self, args: pulumi.runtime.MockResourceArgs):
+        self.resources += 1
+        outputs = dict(args.inputs)
+        if args.resource_id:
+            outputs.update(READ_OUTPUTS.get(args.typ, {}))
+        if "tags" in outputs:
+            outputs["tagsAll"] = outputs["tags"]
+        return [args.resource_id or f"{args.name}-id", outputs]
+
+    def call(self, args: pulumi.runtime.MockCallArgs):
+        self.invokes += 1
+        if self.invoke_latency:
+            time.sleep(self.invoke_latency)
+        return CALL_RESULTS.get(args.token, {})
+
+
+class UniqueUrnMonitor(MockMonitor):
+    """Mock monitor failing the registration of a resource whose urn is
+    already taken. A real engine rejects duplicate urns, the mocks would
+    silently register both resources."""
+
+    def make_urn(self, parent: str, type_: str, name: str) -> str:
+        # The parent only reaches the monitor, not Mocks.new_resource
+        urn = super().make_urn(parent, type_, name)
+        if urn in self.resources:
+            raise ValueError(f"Duplicate resource urn {urn}")
+        return urn
+
+
+def run_program(
+    program: Callable[[], object],
+    transformations: Iterable[Callable] = (),
+    mocks: BenchmarkMocks = None,
+) -> Dict[str, float]:
+    """Runs program against mocks and waits for all its outputs to
+    resolve. Returns the wall time and peak memory along with the number
+    of resources registered and invokes made by the program."""
+    mocks = mocks or BenchmarkMocks()
+    pulumi.runtime.set_mocks(
+        mocks,
+        preview=True,
+        logger=_logger,
+        monitor=UniqueUrnMonitor(mocks),
+    )
+    for transformation in transformations:
+        pulumi.runtime.register_stack_transformation(transformation)
+
+    start = time.perf_counter()
+    pulumi.runtime.test(program)()
+    return {
+        "wall_time_s": time.perf_counter() - start,
+        # Peak resident memory of the process, which is only meaningful
+        # when the program runs in its own process, see run_isolated
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "resources": mocks.resources,
+        "invokes": mocks.invokes,
+    }
+
+
+def run_isolated(func: Callable, *args):
+    """Runs func in a fresh interpreter, the pulumi runtime settings and
+    stack transformations are process wide"""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(func, *args).result()
@@ -0,0 +1,221 @@
+"""Mock-based benchmark suite for the components.
+
+Instantiates every component at increasing sizes against pulumi mocks,
+fully offline and without any AWS access, and records per scenario the
+program wall time, the peak memory of the process and the number of
+resources registered and invokes made. Every scenario runs in its own
+interpreter. The results are written to a json file so runs can be
+compared to catch regressions in how long ``pulumi preview`` takes.
+
+Run it from the root of the repository:
+
+    python -m benchmarks.bench_components [--output results.json]
+        [--scenario vpc-30-subnets ...]
+"""
+import argparse
+import ipaddress
+import json
+import platform
+import sys
+import traceback
+from datetime import datetime, timezone
+from importlib import metadata
+from typing import Callable, Dict, Tuple
+
+from benchmarks._mocks import ACCOUNT_ID, run_isolated, run_program
+
+AZS = ("eu-west-1a", "eu-west-1b", "eu-west-1c")
+PROJECT_TAGS = {"project": "benchmark", "owner": "platform"}
+
+
+def _vpc(subnets: int, peerings: int) -> None:
+    from pulumi_components.aws.components.vpc import (
+        Vpc,
+        VpcPeeringArgs,
+        VpcSubnetArgs,
+    )
+
+    cidrs = ipaddress.ip_network("10.0.0.0/16").subnets(new_prefix=26)
+    public_subnets = [
+        VpcSubnetArgs(
+            cidr=str(next(cidrs)), az=AZS[i % len(AZS)], name=f"public-{i}"
+        )
+        for i in range(subnets)
+    ]
+    private_subnets = [
+        VpcSubnetArgs(
+            cidr=str(next(cidrs)), az=AZS[i % len(AZS)], name=f"private-{i}"
+        )
+        for i in range(subnets)
+    ]
+    peer_cidrs = ipaddress.ip_network("172.16.0.0/12").subnets(new_prefix=20)
+    vpc_peering = [
+        # Alternate between peerings resolved through a remote profile
+        # and peerings with a known account id and cidr
+        VpcPeeringArgs(
+            name=f"peer-{i}", vpc_id=f"vpc-{i:08x}", aws_profile="peer"
+        )
+        if i % 2
+        else VpcPeeringArgs(
+            name=f"peer-{i}",
+            vpc_id=f"vpc-{i:08x}",
+            account_id=ACCOUNT_ID[::-1],
+            cidr=str(next(peer_cidrs)),
+        )
+        for i in range(peerings)
+    ]
+    Vpc(
+        "benchmark",
+        cidr="10.0.0.0/16",
+        public_subnets=public_subnets,
+        private_subnets=private_subnets,
+        vpc_peering=vpc_peering,
+    )
+
+
+def _rds_instance(instances: int = 1, shared: bool = False) -> None:
+    from pulumi_components.aws.components.rds import RDSInstance
+
+    for i in range(instances):
+        name = "benchmark" if instances == 1 else f"benchmark-{i}"
+        RDSInstance(
+            name,
+            allocated_storage="20",
+            instance_class="db.r6g.large",
+            engine="postgres",
+            engine_version="14",
+            family="postgres14",
+            identifier=name,
+            username="administrator",
+            password="benchmark-password",
+            vpc_id="vpc-12345678",
+            subnet_ids=["subnet-1", "subnet-2", "subnet-3"],
+            parameters=[
+                {"name": "log_min_duration_statement", "value": "500"}
+            ],
+            ingress_security_group_cidrs=["10.0.0.0/16"],
+            additional_vpc_security_group_ids=[],
+            shared_parameter_group=shared,
+        )
+
+
+def _aurora(instances: int) -> None:
+    from pulumi_components.aws.components.rds import AuroraCluster
+
+    AuroraCluster(
+        "benchmark",
+        cluster_parameters=[{"name": "rds.force_ssl", "value": "1"}],
+        db_parameters=[
+            {"name": "log_min_duration_statement", "value": "500"}
+        ],
+        family="aurora-postgresql14",
+        engine="aurora-postgresql",
+        engine_version="14.6",
+        master_password="benchmark-password",
+        subnet_ids=["subnet-1", "subnet-2", "subnet-3"],
+        vpc_id="vpc-12345678",
+        availability_zones=list(AZS),
+        instances=[{"instance_class": "db.r6g.large"}] * instances,
+        ingress_security_group_cidrs=["10.0.0.0/16"],
+    )
+
+
+def _eks() -> None:
+    from pulumi_components.aws.components.eks import EksCluster
+
+    EksCluster(
+        "benchmark",
+        admin_role_arn=f"arn:aws:iam::{ACCOUNT_ID}:role/eks-admin",
+        subnet_ids=["subnet-1", "subnet-2", "subnet-3"],
+        k8s_version="1.24",
+    )
+
+
+SCENARIOS: Dict[str, Tuple[Callable, Dict]] = {
+    "vpc-3-subnets": (_vpc, {"subnets": 3, "peerings": 0}),
+    "vpc-30-subnets": (_vpc, {"subnets": 30, "peerings": 0}),
+    "vpc-300-subnets": (_vpc, {"subnets": 300, "peerings": 0}),
+    "vpc-100-peerings": (_vpc, {"subnets": 3, "peerings": 100}),
+    "rds-instance": (_rds_instance, {}),
+    "rds-40-instances": (_rds_instance, {"instances": 40}),
+    "rds-40-instances-shared": (
+        _rds_instance,
+        {"instances": 40, "shared": True},
+    ),
+    "aurora-1-instance": (_aurora, {"instances": 1}),
+    "aurora-15-instances": (_aurora, {"instances": 15}),
+    "eks-cluster": (_eks, {}),
+}
+
+
+def _run_scenario(name: str) -> Dict:
+    from pulumi_components.aws.utils import register_tags
+
+    component, params = SCENARIOS[name]
+
+    def program():
+        register_tags(PROJECT_TAGS)
+        component(**params)
+
+    result = {"scenario": name, "params": params}
+    try:
+        result.update(run_program(program))
+    except Exception as e:
+        # A broken scenario is recorded rather than stopping the suite
+        result["error"] = "".join(traceback.format_exception_only(e)).strip()
+    return result
+
+
+def _versions() -> Dict[str, str]:
+    versions = {"python": platform.python_version()}
+    for package in ("pulumi", "pulumi_aws"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--output",
+        default="benchmark-results.json",
+        help="json file the results are written to",
+    )
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="only run the given scenario, can be repeated",
+    )
+    cli_args = parser.parse_args()
+
+    results = []
+    for name in cli_args.scenario or SCENARIOS:
+        result = run_isolated(_run_scenario, name)
+        results.append(result)
+        if "error" in result:
+            print(f"{name:<22} failed: {result['error']}", file=sys.stderr)
+        else:
+            print(
+                f"{name:<22} {result['wall_time_s']:8.2f} s"
+                f" {result['peak_rss_kb'] / 1024:8.1f} MiB"
+                f" {result['resources']:6} resources"
+                f" {result['invokes']:5} invokes"
+            )
+
+    with open(cli_args.output, "w", encoding="utf-8") as output:
+        json.dump(
+            {
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "versions": _versions(),
+                "scenarios": results,
+            },
+            output,
+            indent=2,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Import-time benchmark of the packages of this library.
+
+Runs every import statement in a fresh interpreter with
+``python -X importtime`` and sums the cumulative time of the modules
+imported by the statement, leaving out the interpreter startup. Importing
+a package only loads its submodules, and pulumi_aws, once one of its
+components is used.
+
+Run it from the root of the repository:
+
+    python -m benchmarks.bench_import_time
+"""
+import subprocess
+import sys
+
+REPEAT = 5
+MARKER = "-- benchmark start --"
+
+STATEMENTS = [
+    "import pulumi_components.aws.components.vpc",
+    "from pulumi_components.aws.components.vpc import VpcSubnetArgs",
+    "from pulumi_components.aws.components.vpc import Vpc",
+    "import pulumi_components.aws.components.rds",
+    "from pulumi_components.aws.components.rds import RDSInstance",
+    "import pulumi_components.aws.components.eks",
+    "from pulumi_components.aws.components.eks import EksCluster",
+    "import pulumi_components.aws.utils",
+    "from pulumi_components.aws.utils import register_tags",
+]
+
+
+def import_time_ms(statement: str) -> float:
+    """Returns the time spent importing the modules of the statement"""
+    code = f"import sys; sys.stderr.write({MARKER!r} + '\\n'); {statement}"
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    total_us = 0
+    for line in stderr.split(MARKER, 1)[1].splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        # Only top level imports, nested ones are in their cumulative time
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+    return total_us / 1000
+
+
+def main() -> None:
+    print(f"import time (best of {REPEAT})")
+    for statement in STATEMENTS:
+        best = min(import_time_ms(statement) for _ in range(REPEAT))
+        print(f"  {best:8.1f} ms  {statement}")
+
+
+if __name__ == "__main__":
+    main()
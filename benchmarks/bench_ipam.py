@@ -0,0 +1,59 @@
+"""Benchmark of the allocations of the ipam registry.
+
+Fills registries with increasing numbers of allocations and times the
+allocation of one more cidr, which rebuilds the free blocks from all the
+allocations of the pool while holding the lock of the database.
+
+Run it from the root of the repository:
+
+    python -m benchmarks.bench_ipam
+"""
+import os
+import sqlite3
+import tempfile
+import time
+
+from pulumi_components.aws.components.vpc import IpamRegistry
+
+POOL = "10.0.0.0/8"
+ALLOCATIONS = (100, 1000, 10000)
+REPEAT = 5
+
+
+def allocate_time_ms(path: str) -> float:
+    """Returns the best time of allocating and releasing one cidr"""
+    registry = IpamRegistry(path, POOL)
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        registry.allocate("benchmark", 20)
+        best = min(best, time.perf_counter() - start)
+        registry.release("benchmark")
+    return best * 1000
+
+
+def main() -> None:
+    print(f"ipam allocation of a /20 (best of {REPEAT})")
+    for allocations in ALLOCATIONS:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ipam.db")
+            IpamRegistry(path, POOL)
+            # Fill the pool with /24s directly, allocating them one by
+            # one would take as long as the benchmark itself
+            with sqlite3.connect(path) as connection:
+                connection.executemany(
+                    "INSERT INTO allocations (pool, cidr, owner)"
+                    " VALUES (?, ?, ?)",
+                    (
+                        (POOL, f"10.{i >> 8}.{i & 255}.0/24", f"stack-{i}")
+                        for i in range(allocations)
+                    ),
+                )
+            print(
+                f"  {allocations:6} allocations"
+                f"  {allocate_time_ms(path):8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
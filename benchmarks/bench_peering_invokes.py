@@ -0,0 +1,69 @@
+"""Mock benchmark of the invokes made by vpc peerings.
+
+Every mocked invoke sleeps to stand in for the provider round trip.
+Every peering reads its remote vpc with its own profile, so its lookups
+are not shared with the other peerings: the caller identity of the
+remote account and, on the accepter side, the peering connection.
+Blocking invokes would stall the program one after the other, adding at
+least invokes x latency. Output-form invokes resolve while the rest of
+the program registers its resources and overlap each other.
+
+The program runs once without latency, the difference with the run with
+latency is the time the invokes held up the program.
+
+Run it from the root of the repository:
+
+    python -m benchmarks.bench_peering_invokes
+"""
+from benchmarks._mocks import BenchmarkMocks, run_isolated, run_program
+
+LATENCY = 0.2
+PEERINGS = (1, 10, 20)
+
+
+def _vpc(peerings: int) -> None:
+    from pulumi_components.aws.components.vpc import (
+        Vpc,
+        VpcPeeringArgs,
+        VpcSubnetArgs,
+    )
+
+    Vpc(
+        "benchmark",
+        cidr="10.0.0.0/16",
+        public_subnets=[VpcSubnetArgs(cidr="10.0.0.0/24", az="eu-west-1a")],
+        vpc_peering=[
+            VpcPeeringArgs(
+                name=f"peer-{i}",
+                vpc_id=f"vpc-{i:08x}",
+                aws_profile=f"peer-{i}",
+                # Alternate between requester and accepter peerings
+                accepter=bool(i % 2),
+            )
+            for i in range(peerings)
+        ],
+    )
+
+
+def _run(peerings: int, latency: float):
+    return run_program(
+        lambda: _vpc(peerings), mocks=BenchmarkMocks(invoke_latency=latency)
+    )
+
+
+def main() -> None:
+    print(f"vpc peerings with {LATENCY * 1000:.0f}ms invoke latency")
+    for peerings in PEERINGS:
+        baseline = run_isolated(_run, peerings, 0.0)
+        result = run_isolated(_run, peerings, LATENCY)
+        held_up = result["wall_time_s"] - baseline["wall_time_s"]
+        serialized = result["invokes"] * LATENCY
+        print(
+            f"  {peerings:3} peerings {result['invokes']:3} invokes"
+            f"  held up the program {held_up:6.2f} s"
+            f"  (serialized invokes {serialized:6.2f} s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
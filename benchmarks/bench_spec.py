@@ -0,0 +1,94 @@
+"""Benchmark of the loading of stack specs.
+
+Writes specs of a vpc with increasing numbers of subnets and peerings and
+times their loading, once validating the spec and once reading the
+validated spec from the cache. Yaml specs are timed as well when PyYAML
+is installed.
+
+Run it from the root of the repository:
+
+    python -m benchmarks.bench_spec
+"""
+import json
+import os
+import tempfile
+import time
+
+from pulumi_components.aws.spec import load_spec
+
+ENTRIES = (50, 400)
+REPEAT = 5
+
+
+def spec(entries: int) -> dict:
+    """Returns a spec of a vpc with as many subnets and peerings"""
+    return {
+        "vpcs": [
+            {
+                "name": "benchmark",
+                "cidr": "10.0.0.0/8",
+                "public_subnets": [
+                    {"cidr": "10.0.0.0/24", "az": "eu-west-1a"}
+                ],
+                "private_subnets": [
+                    {
+                        "cidr": f"10.{1 + (i >> 8)}.{i & 255}.0/24",
+                        "az": f"eu-west-1{'abc'[i % 3]}",
+                        "name": f"private-{i}",
+                    }
+                    for i in range(entries)
+                ],
+                "peerings": [
+                    {
+                        "name": f"peer-{i}",
+                        "vpc_id": f"vpc-{i:08x}",
+                        "account_id": "123456789012",
+                        "cidr": f"172.{16 + (i >> 8)}.{i & 255}.0/24",
+                    }
+                    for i in range(entries)
+                ],
+            }
+        ]
+    }
+
+
+def load_time_ms(path: str, cache_dir: str, use_cache: bool) -> float:
+    """Returns the best time of loading the spec"""
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        load_spec(path, cache_dir=cache_dir, use_cache=use_cache)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    try:
+        import yaml
+    except ImportError:
+        yaml = None
+    print(f"spec loading (best of {REPEAT})")
+    for entries in ENTRIES:
+        with tempfile.TemporaryDirectory() as directory:
+            paths = {"json": os.path.join(directory, "spec.json")}
+            with open(paths["json"], "w", encoding="utf-8") as spec_file:
+                json.dump(spec(entries), spec_file)
+            if yaml is not None:
+                paths["yaml"] = os.path.join(directory, "spec.yaml")
+                with open(paths["yaml"], "w", encoding="utf-8") as spec_file:
+                    yaml.safe_dump(spec(entries), spec_file)
+            cache_dir = os.path.join(directory, "cache")
+            for kind, path in paths.items():
+                validated = load_time_ms(path, cache_dir, use_cache=False)
+                # The first load fills the cache
+                load_spec(path, cache_dir=cache_dir)
+                cached = load_time_ms(path, cache_dir, use_cache=True)
+                print(
+                    f"  {entries:4} subnets and peerings, {kind:4}"
+                    f"  validated {validated:8.1f} ms"
+                    f"  cached {cached:8.1f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Micro-benchmark for the taggable resource type lookup in the tagger.
+
+Compares the cost of deciding whether 10k resources can be tagged using
+a linear scan over ``taggable_aws_resource_list`` against the prebuilt
+``TaggableIndex``.
+
+Run it from the root of the repository:
+
+    python -m benchmarks.bench_tagger
+"""
+import random
+import timeit
+
+from pulumi_components.aws.utils.tagger import (
+    TaggableIndex,
+    taggable_aws_resource_list,
+)
+
+RESOURCES = 10_000
+REPEAT = 5
+
+UNTAGGABLE_TYPES = [
+    "aws:ec2/routeTableAssociation:RouteTableAssociation",
+    "aws:ec2/route:Route",
+    "aws:iam/rolePolicyAttachment:RolePolicyAttachment",
+    "aws:s3/bucketPolicy:BucketPolicy",
+    "pulumi-components:aws:components:vpc",
+]
+
+
+def _sample_types(count: int) -> list:
+    """Returns a deterministic mix of taggable and untaggable types"""
+    rng = random.Random(0)
+    population = list(taggable_aws_resource_list) + UNTAGGABLE_TYPES * 20
+    return [rng.choice(population) for _ in range(count)]
+
+
+def _best_of(func) -> float:
+    return min(timeit.repeat(func, number=1, repeat=REPEAT))
+
+
+def main() -> None:
+    types = _sample_types(RESOURCES)
+    index = TaggableIndex(taggable_aws_resource_list)
+    wildcard_index = TaggableIndex([*taggable_aws_resource_list, "aws:rds/*"])
+
+    results = {
+        "list scan": _best_of(
+            lambda: [t in taggable_aws_resource_list for t in types]
+        ),
+        "TaggableIndex": _best_of(lambda: [t in index for t in types]),
+        "TaggableIndex (module wildcard)": _best_of(
+            lambda: [t in wildcard_index for t in types]
+        ),
+    }
+    print(f"lookup cost per {RESOURCES} resources (best of {REPEAT})")
+    for label, seconds in results.items():
+        print(f"  {label:<32} {seconds * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Mock benchmark of a peering mesh against a transit gateway fabric.
+
+Connects increasing numbers of vpcs with each other, once through a full
+mesh of vpc peerings and once through a transit gateway fabric, and
+records the program wall time and the number of resources registered.
+
+Run it from the root of the repository:
+
+    python -m benchmarks.bench_transit_gateway
+"""
+from benchmarks._mocks import ACCOUNT_ID, run_isolated, run_program
+
+AZS = ("eu-west-1a", "eu-west-1b", "eu-west-1c")
+VPCS = (5, 10, 20)
+
+
+def _vpcs(count: int, mesh: bool):
+    from pulumi_components.aws.components.vpc import (
+        SubnetTierArgs,
+        Vpc,
+        VpcPeeringArgs,
+    )
+
+    return [
+        Vpc(
+            f"vpc-{i}",
+            cidr=f"10.{i}.0.0/16",
+            availability_zones=list(AZS),
+            subnet_tiers=[
+                SubnetTierArgs(name="public", prefix_length=24, public=True),
+                SubnetTierArgs(name="private", prefix_length=20),
+            ],
+            # Every pair of vpcs is peered, requested by the first one
+            vpc_peering=[
+                VpcPeeringArgs(
+                    name=f"vpc-{j}",
+                    vpc_id=f"vpc-{j:08x}",
+                    account_id=ACCOUNT_ID,
+                    cidr=f"10.{j}.0.0/16",
+                )
+                if i < j
+                else VpcPeeringArgs(
+                    name=f"vpc-{j}",
+                    vpc_id=f"vpc-{j:08x}",
+                    accepter=True,
+                    aws_profile="benchmark",
+                )
+                for j in range(count)
+                if mesh and i != j
+            ],
+            standalone_routes=True,
+        )
+        for i in range(count)
+    ]
+
+
+def _mesh(count: int) -> None:
+    _vpcs(count, mesh=True)
+
+
+def _fabric(count: int) -> None:
+    from pulumi_components.aws.components.vpc import (
+        TransitGatewayAttachmentArgs,
+        TransitGatewayFabric,
+    )
+
+    TransitGatewayFabric(
+        "fabric",
+        [
+            TransitGatewayAttachmentArgs(name=f"vpc-{i}", vpc=vpc)
+            for i, vpc in enumerate(_vpcs(count, mesh=False))
+        ],
+        summary_cidrs=["10.0.0.0/8"],
+    )
+
+
+def _run(topology: str, count: int):
+    from pulumi_components.aws.utils import register_tags
+
+    def program():
+        register_tags({"project": "benchmark"})
+        (_mesh if topology == "mesh" else _fabric)(count)
+
+    return run_program(program)
+
+
+def main() -> None:
+    for count in VPCS:
+        for topology in ("mesh", "fabric"):
+            result = run_isolated(_run, topology, count)
+            print(
+                f"{count:3} vpcs {topology:<7}"
+                f" {result['wall_time_s']:8.2f} s"
+                f" {result['resources']:6} resources"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Helpers shared by the packages of this library"""
+import importlib
+import os
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+
+def lazy_exports(
+    package: str, exports: Dict[str, str]
+) -> Tuple[Callable, Callable]:
+    """Returns the module level ``__getattr__`` and ``__dir__`` of a
+    package that imports its exports from their submodule on first
+    access, e.g. ``{"Vpc": ".vpc"}``. Importing the package then doesn't
+    import pulumi_aws until a component is actually used."""
+
+    def __getattr__(name: str):
+        submodule = exports.get(name)
+        if submodule is None:
+            raise AttributeError(
+                f"module {package!r} has no attribute {name!r}"
+            )
+        value = getattr(importlib.import_module(submodule, package), name)
+        # Cache it on the package, later lookups don't go through here
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__():
+        return sorted({*vars(sys.modules[package]), *exports})
+
+    return __getattr__, __dir__
+
+
+def camel_case(name: str) -> str:
+    """Returns the camel case form of a snake case name, e.g. the key of
+    an input in the stack config or in an invoke"""
+    first, *rest = name.split("_")
+    return first + "".join(word.capitalize() for word in rest)
+
+
+def user_cache_dir(name: str) -> Path:
+    """Returns the folder of the user's cache directory where this library
+    caches the given kind of files, e.g. ``catalogs``"""
+    cache_home = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "pulumi-components" / name
+
+
+def write_atomically(path: Path, text: str) -> None:
+    """Writes text to path through a temporary file that replaces it
+    atomically, as several programs may write the same file at once"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
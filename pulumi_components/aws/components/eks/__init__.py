@@ -1,3 +1,10 @@
-from .cluster import EksCluster
+from typing import TYPE_CHECKING
+
+from ...._utilities import lazy_exports
+
+if TYPE_CHECKING:
+    from .cluster import EksCluster
 
 __all__ = ["EksCluster"]
+
+__getattr__, __dir__ = lazy_exports(__name__, {"EksCluster": ".cluster"})
@@ -1,5 +1,26 @@
-from ._inputs import RdsSecurityGroupIngressArgs
-from .aurora import AuroraCluster
-from .rds import RDSInstance
+from typing import TYPE_CHECKING
 
-__all__ = ["RdsSecurityGroupIngressArgs", "RDSInstance", "AuroraCluster"]
+from ...._utilities import lazy_exports
+
+if TYPE_CHECKING:
+    from ._inputs import RdsSecurityGroupIngressArgs
+    from .aurora import AuroraCluster
+    from .rds import RDSInstance
+    from .tuning import tune_parameters
+
+__all__ = [
+    "RdsSecurityGroupIngressArgs",
+    "RDSInstance",
+    "AuroraCluster",
+    "tune_parameters",
+]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "RdsSecurityGroupIngressArgs": "._inputs",
+        "AuroraCluster": ".aurora",
+        "RDSInstance": ".rds",
+        "tune_parameters": ".tuning",
+    },
+)
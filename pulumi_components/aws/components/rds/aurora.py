@@ -5,6 +5,11 @@ import pulumi_aws as aws
 from pulumi import ComponentResource, ResourceOptions
 
 from .common import RdsSecurityGroup, RdsSubnetGroup
+from .parameter_groups import (
+    get_cluster_parameter_group,
+    get_parameter_group,
+)
+from .tuning import merge_parameters, smallest_instance_class, tune_parameters
 
 
 class AuroraCluster(ComponentResource):
@@ -40,6 +45,8 @@ class AuroraCluster(ComponentResource):
         skip_final_snapshot: bool = False,
         storage_encrypted: bool = True,
         deletion_protection: bool = True,
+        shared_parameter_groups: bool = False,
+        tuning_profile: Optional[str] = None,
         opts: Optional[ResourceOptions] = None,
         **kwargs,
     ) -> None:
@@ -57,42 +64,76 @@ class AuroraCluster(ComponentResource):
         self.security_group_ids = additional_security_group_ids.append(
             self.security_group.id
         )
-        # Create cluster parameter group
-        cluster_parameter_group_args = [
-            aws.rds.ParameterGroupParameterArgs(
-                name=param["name"],
-                value=param["value"],
-                apply_method=param["apply_method"]
-                if "apply_method" in param
-                else "pending-reboot",
+        # The instances share the db parameter group, so it is tuned for
+        # the instance class with the least memory
+        if tuning_profile is not None:
+            instance_classes = [
+                instance.get("instance_class") for instance in instances
+            ]
+            if not instance_classes or None in instance_classes:
+                raise ValueError(
+                    "Tuning needs the instance_class of every instance"
+                )
+            db_parameters = merge_parameters(
+                tune_parameters(
+                    engine,
+                    smallest_instance_class(instance_classes),
+                    tuning_profile,
+                ),
+                db_parameters,
             )
-            for param in cluster_parameters
-        ]
-        self.cluster_parameter_group = aws.rds.ClusterParameterGroup(
-            (rsc_name := f"{name}-cluster-parameter-group"),
-            name=f"{rsc_name}-{family}",
-            family=family,
-            parameters=cluster_parameter_group_args,
-            opts=pulumi.ResourceOptions(parent=self),
-        )
-        # Create db paramter group
-        db_parameter_group_args = [
-            aws.rds.ParameterGroupParameterArgs(
-                name=param["name"],
-                value=param["value"],
-                apply_method=param["apply_method"]
-                if "apply_method" in param
-                else "pending-reboot",
+        # Reuse the parameter groups of the clusters with the same family
+        # and parameters
+        if shared_parameter_groups:
+            self.cluster_parameter_group = get_cluster_parameter_group(
+                family,
+                cluster_parameters,
+                self.get_provider(
+                    "aws:rds/clusterParameterGroup:ClusterParameterGroup"
+                ),
+            )
+            self.db_parameter_group = get_parameter_group(
+                family,
+                db_parameters,
+                self.get_provider("aws:rds/parameterGroup:ParameterGroup"),
+            )
+        else:
+            # Create cluster parameter group
+            cluster_parameter_group_args = [
+                aws.rds.ParameterGroupParameterArgs(
+                    name=param["name"],
+                    value=param["value"],
+                    apply_method=param["apply_method"]
+                    if "apply_method" in param
+                    else "pending-reboot",
+                )
+                for param in cluster_parameters
+            ]
+            self.cluster_parameter_group = aws.rds.ClusterParameterGroup(
+                (rsc_name := f"{name}-cluster-parameter-group"),
+                name=f"{rsc_name}-{family}",
+                family=family,
+                parameters=cluster_parameter_group_args,
+                opts=pulumi.ResourceOptions(parent=self),
+            )
+            # Create db paramter group
+            db_parameter_group_args = [
+                aws.rds.ParameterGroupParameterArgs(
+                    name=param["name"],
+                    value=param["value"],
+                    apply_method=param["apply_method"]
+                    if "apply_method" in param
+                    else "pending-reboot",
+                )
+                for param in db_parameters
+            ]
+            self.db_parameter_group = aws.rds.ParameterGroup(
+                (rsc_name := f"{name}-db-parameter-group"),
+                name=f"{rsc_name}-{family}",
+                family=family,
+                parameters=db_parameter_group_args,
+                opts=pulumi.ResourceOptions(parent=self),
             )
-            for param in db_parameters
-        ]
-        self.db_parameter_group = aws.rds.ParameterGroup(
-            (rsc_name := f"{name}-db-parameter-group"),
-            name=f"{rsc_name}-{family}",
-            family=family,
-            parameters=db_parameter_group_args,
-            opts=pulumi.ResourceOptions(parent=self),
-        )
 
         # Create subnet group
         self.subnet_group = RdsSubnetGroup(name, subnet_ids)
@@ -112,7 +153,9 @@ class AuroraCluster(ComponentResource):
             storage_encrypted=storage_encrypted,
             vpc_security_group_ids=self.security_group_ids,
             skip_final_snapshot=skip_final_snapshot,
-            final_snapshot_identifier=f"{rsc_name}-final-snapshot",
+            # Named after the db parameter group for existing clusters
+            final_snapshot_identifier=f"{name}-db-parameter-group"
+            "-final-snapshot",
             preferred_backup_window=preferred_backup_window,
             preferred_maintenance_window=preferred_maintenance_window,
             backtrack_window=backtrack_window,
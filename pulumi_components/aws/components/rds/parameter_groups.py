@@ -0,0 +1,147 @@
+"""Rds parameter groups shared for the program run.
+
+Databases with the same engine family and parameters can use the same
+parameter group. Components opting in get their groups from this
+registry, keyed by a hash of the family and the normalized parameters,
+so there is one group per distinct content and provider across all the
+components of the program instead of one per component. The content is
+only known for plain parameters, so Output values can't be shared.
+"""
+import hashlib
+import json
+import re
+from typing import Dict, Mapping, Optional, Sequence, Tuple, Union
+
+import pulumi
+import pulumi_aws as aws
+
+ParameterGroup = Union[aws.rds.ParameterGroup, aws.rds.ClusterParameterGroup]
+# The types of the parameter fields whose content is known up front
+_PLAIN_TYPES = (str, int, float)
+
+_parameter_groups: Dict[
+    Tuple[str, str, Optional[pulumi.ProviderResource]], ParameterGroup
+] = {}
+
+
+def get_parameter_group(
+    family: str,
+    parameters: Sequence[Mapping[str, str]],
+    provider: Optional[pulumi.ProviderResource] = None,
+) -> aws.rds.ParameterGroup:
+    """Returns the db parameter group of the family and parameters, which
+    is only created the first time they are asked for"""
+    return _get("db", family, parameters, provider)
+
+
+def get_cluster_parameter_group(
+    family: str,
+    parameters: Sequence[Mapping[str, str]],
+    provider: Optional[pulumi.ProviderResource] = None,
+) -> aws.rds.ClusterParameterGroup:
+    """Returns the cluster parameter group of the family and parameters,
+    which is only created the first time they are asked for"""
+    return _get("cluster", family, parameters, provider)
+
+
+def clear() -> None:
+    """Forgets all the parameter groups of the registry"""
+    _parameter_groups.clear()
+
+
+def content_hash(
+    family: str, parameters: Sequence[Mapping[str, str]]
+) -> str:
+    """Returns the hash of the family and the normalized parameters. The
+    order of the parameters, the case of their names and the type of
+    their values don't change it, and a parameter given twice keeps its
+    last value like it would in the parameter group. Raises ValueError
+    when a parameter isn't made of plain values."""
+    return _hash(family, _normalize(parameters))
+
+
+def _normalize(
+    parameters: Sequence[Mapping[str, str]]
+) -> Dict[str, Tuple[str, str, str]]:
+    """Returns the name, value and apply method of the parameters keyed
+    by their lower case name, the last one given winning. Raises
+    ValueError for Output values, which can't be compared before they
+    resolve."""
+    normalized = {}
+    for parameter in parameters:
+        fields = (
+            parameter["name"],
+            parameter["value"],
+            parameter.get("apply_method") or "pending-reboot",
+        )
+        if not all(isinstance(field, _PLAIN_TYPES) for field in fields):
+            raise ValueError(
+                f"Parameter {parameter['name']} of a shared parameter group"
+                " must have plain values, Output values can't be shared"
+            )
+        name, value, apply_method = (str(field).strip() for field in fields)
+        normalized[name.lower()] = (name, value, apply_method)
+    return normalized
+
+
+def _hash(family: str, normalized: Dict[str, Tuple[str, str, str]]) -> str:
+    content = json.dumps(
+        [
+            family,
+            [
+                [key, value, apply_method]
+                for key, (_, value, apply_method) in sorted(normalized.items())
+            ],
+        ]
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _get(
+    kind: str,
+    family: str,
+    parameters: Sequence[Mapping[str, str]],
+    provider: Optional[pulumi.ProviderResource],
+) -> ParameterGroup:
+    normalized = _normalize(parameters)
+    digest = _hash(family, normalized)[:12]
+    key = (kind, digest, provider)
+    try:
+        return _parameter_groups[key]
+    except KeyError:
+        pass
+    # Group names only allow letters, digits and hyphens
+    prefix = re.sub(r"[^a-z0-9-]", "-", f"{family}-{digest}".lower())
+    if kind == "cluster":
+        resource, parameter_args = (
+            aws.rds.ClusterParameterGroup,
+            aws.rds.ClusterParameterGroupParameterArgs,
+        )
+    else:
+        resource, parameter_args = (
+            aws.rds.ParameterGroup,
+            aws.rds.ParameterGroupParameterArgs,
+        )
+    resource_name = f"shared-{kind}-parameter-group-{prefix}"
+    # The groups of the same content get one resource per provider, named
+    # after a hash of the provider name so that their urns differ
+    if provider is not None:
+        resource_name += "-" + hashlib.sha1(
+            provider._name.encode()
+        ).hexdigest()[:8]
+    group = _parameter_groups[key] = resource(
+        resource_name,
+        name_prefix=f"{prefix}-",
+        description=f"Shared {kind} parameter group for {family}",
+        family=family,
+        # The group holds the parameters as hashed, so every component
+        # sharing it gets the same content whatever the order they gave
+        parameters=[
+            parameter_args(name=name, value=value, apply_method=apply_method)
+            for _, (name, value, apply_method) in sorted(
+                normalized.items()
+            )
+        ],
+        opts=pulumi.ResourceOptions(provider=provider),
+    )
+    return group
@@ -5,6 +5,8 @@ import pulumi_aws as aws
 from pulumi import ComponentResource
 
 from .common import RdsSecurityGroup, RdsSubnetGroup
+from .parameter_groups import get_parameter_group
+from .tuning import merge_parameters, tune_parameters
 
 
 class RDSInstance(ComponentResource):
@@ -64,6 +66,8 @@ class RDSInstance(ComponentResource):
         ingress_security_group_ids: Optional[
             pulumi.Input[Sequence[str]]
         ] = None,  # noqa E501
+        shared_parameter_group: bool = False,
+        tuning_profile: Optional[str] = None,
         opts: Optional[pulumi.ResourceOptions] = None,
         **kwargs,
     ):
@@ -84,24 +88,39 @@ class RDSInstance(ComponentResource):
         # Create subnet-group
         self.subnet_group = RdsSubnetGroup(name, subnet_ids)
 
-        # Create DB parameter group
-        rds_parameter_group_args = [
-            aws.rds.ParameterGroupParameterArgs(
-                name=param["name"],
-                value=param["value"],
-                apply_method=param["apply_method"]
-                if "apply_method" in param
-                else "pending-reboot",
+        # Tune the memory and connections for the instance class, the
+        # parameters given explicitly take precedence
+        if tuning_profile is not None:
+            parameters = merge_parameters(
+                tune_parameters(engine, instance_class, tuning_profile),
+                parameters,
+            )
+        # Create DB parameter group, or reuse the one of the databases
+        # with the same family and parameters
+        if shared_parameter_group:
+            self.parameter_group = get_parameter_group(
+                family,
+                parameters,
+                self.get_provider("aws:rds/parameterGroup:ParameterGroup"),
+            )
+        else:
+            rds_parameter_group_args = [
+                aws.rds.ParameterGroupParameterArgs(
+                    name=param["name"],
+                    value=param["value"],
+                    apply_method=param["apply_method"]
+                    if "apply_method" in param
+                    else "pending-reboot",
+                )
+                for param in parameters
+            ]
+            self.parameter_group = aws.rds.ParameterGroup(
+                (rsc_name := f"{name}-parameter-group"),
+                name=f"{rsc_name}-{family}",
+                description=f"Parameter group for {name} rds instance",
+                family=family,
+                parameters=rds_parameter_group_args,
             )
-            for param in parameters
-        ]
-        self.parameter_group = aws.rds.ParameterGroup(
-            (rsc_name := f"{name}-parameter-group"),
-            name=f"{rsc_name}-{family}",
-            description=f"Parameter group for {name} rds instance",
-            family=family,
-            parameters=rds_parameter_group_args,
-        )
         self.rds_instance = aws.rds.Instance(
             name,
             args=aws.rds.InstanceArgs(
@@ -0,0 +1,279 @@
+"""Memory aware parameter presets for postgres and mysql databases.
+
+The vCPUs and memory of an instance class are read from a built-in
+catalog, and a tuning profile turns them into the memory, connection
+and parallelism parameters of the engine. The parameters are derived
+from the instance class only, so resizing a database re-tunes it.
+
+Aurora sizes its buffer cache from the memory of the instance and
+doesn't go through the file system cache, so the buffer pool parameters
+are left to aurora and only the other parameters are tuned.
+"""
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+KIB = 1024
+MIB = 1024 * KIB
+GIB = 1024 * MIB
+# Postgres sizes its buffers in 8kB pages
+POSTGRES_PAGE = 8 * KIB
+# The buffer pool of mysql is a multiple of its chunks
+INNODB_CHUNK = 128 * MIB
+MAX_CONNECTIONS = 5000
+
+# Sizes of the instance classes mapped to their vCPUs
+_SIZES = {
+    "large": 2,
+    "xlarge": 4,
+    "2xlarge": 8,
+    "4xlarge": 16,
+    "8xlarge": 32,
+    "12xlarge": 48,
+    "16xlarge": 64,
+    "24xlarge": 96,
+    "32xlarge": 128,
+}
+# The memory per vCPU in GiB and the largest size of every family
+_FAMILIES = {
+    "r5": (8, "24xlarge"),
+    "r6g": (8, "16xlarge"),
+    "r6i": (8, "32xlarge"),
+    "r7g": (8, "16xlarge"),
+    "m5": (4, "24xlarge"),
+    "m6g": (4, "16xlarge"),
+    "m6i": (4, "32xlarge"),
+    "m7g": (4, "16xlarge"),
+}
+# Burstable classes don't follow the ratio of their family
+_BURSTABLE = {
+    "micro": (2, 1),
+    "small": (2, 2),
+    "medium": (2, 4),
+    "large": (2, 8),
+    "xlarge": (4, 16),
+    "2xlarge": (8, 32),
+}
+
+
+def _catalog() -> Dict[str, Tuple[int, int]]:
+    catalog = {}
+    for family, (memory_per_vcpu, largest) in _FAMILIES.items():
+        for size, vcpus in _SIZES.items():
+            if vcpus > _SIZES[largest]:
+                continue
+            catalog[f"db.{family}.{size}"] = (vcpus, vcpus * memory_per_vcpu)
+    for family in ("t3", "t4g"):
+        for size, resources in _BURSTABLE.items():
+            catalog[f"db.{family}.{size}"] = resources
+    return catalog
+
+
+# The vCPUs and memory in GiB of the instance classes
+INSTANCE_CLASSES: Dict[str, Tuple[int, int]] = _catalog()
+
+
+class TuningProfile:
+    """A workload profile, the share of the memory given to the buffers
+    and to the queries and the number of connections per GiB"""
+
+    __slots__ = (
+        "name",
+        "postgres_buffers",
+        "mysql_buffers",
+        "connections_per_gib",
+        "query_memory",
+        "maintenance_memory",
+        "parallel_share",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        postgres_buffers: float,
+        mysql_buffers: float,
+        connections_per_gib: int,
+        query_memory: float,
+        maintenance_memory: float,
+        parallel_share: float,
+    ) -> None:
+        self.name = name
+        # Share of the memory given to shared_buffers and to the innodb
+        # buffer pool
+        self.postgres_buffers = postgres_buffers
+        self.mysql_buffers = mysql_buffers
+        self.connections_per_gib = connections_per_gib
+        # Share of the memory left by the buffers that the queries of all
+        # the connections can use to sort, hash and join
+        self.query_memory = query_memory
+        # Share of the memory used by vacuum and index builds
+        self.maintenance_memory = maintenance_memory
+        # Share of the vCPUs a single query can use
+        self.parallel_share = parallel_share
+
+
+PROFILES: Dict[str, TuningProfile] = {
+    profile.name: profile
+    for profile in (
+        # Many short queries, as many connections as memory allows
+        TuningProfile("oltp", 0.25, 0.75, 100, 0.25, 0.05, 0.0),
+        # Few large queries, memory goes to sorts, hashes and parallelism
+        TuningProfile("analytics", 0.25, 0.6, 20, 0.5, 0.1, 0.5),
+        TuningProfile("mixed", 0.25, 0.7, 50, 0.35, 0.075, 0.25),
+    )
+}
+
+
+def tune_parameters(
+    engine: str,
+    instance_class: str,
+    profile: str = "mixed",
+) -> List[Dict[str, str]]:
+    """Returns the parameters of the profile for the engine and instance
+    class, in the format of the parameters of the rds components"""
+    if profile not in PROFILES:
+        raise ValueError(
+            f"Unknown tuning profile {profile}, expected one of"
+            f" {', '.join(PROFILES)}"
+        )
+    if instance_class not in INSTANCE_CLASSES:
+        raise ValueError(
+            f"Unknown instance class {instance_class}, add its vCPUs and"
+            " memory to INSTANCE_CLASSES"
+        )
+    vcpus, memory_gib = INSTANCE_CLASSES[instance_class]
+    engine = engine.lower()
+    if "postgres" in engine:
+        tune = _postgres
+    elif "mysql" in engine or engine == "aurora":
+        tune = _mysql
+    else:
+        raise ValueError(
+            "Tuning currently only supports Postgres and Mysql engines"
+        )
+    return [
+        {"name": name, "value": str(value), "apply_method": apply_method}
+        for name, (value, apply_method) in tune(
+            PROFILES[profile],
+            vcpus,
+            memory_gib * GIB,
+            aurora=engine.startswith("aurora"),
+        ).items()
+    ]
+
+
+def smallest_instance_class(instance_classes: Sequence[str]) -> str:
+    """Returns the instance class with the least memory, the parameters
+    of a group shared by several instances must fit all of them"""
+    for instance_class in instance_classes:
+        if instance_class not in INSTANCE_CLASSES:
+            raise ValueError(
+                f"Unknown instance class {instance_class}, add its vCPUs"
+                " and memory to INSTANCE_CLASSES"
+            )
+    return min(instance_classes, key=lambda name: INSTANCE_CLASSES[name])
+
+
+def merge_parameters(
+    tuned: Sequence[Mapping[str, str]], parameters: Sequence[Mapping]
+) -> List[Mapping]:
+    """Returns the tuned parameters overridden by the given parameters"""
+    given = {parameter["name"] for parameter in parameters}
+    return [
+        *(parameter for parameter in tuned if parameter["name"] not in given),
+        *parameters,
+    ]
+
+
+def _max_connections(profile: TuningProfile, memory: int) -> int:
+    return max(
+        20,
+        min(MAX_CONNECTIONS, profile.connections_per_gib * memory // GIB),
+    )
+
+
+def _clamp(value: float, low: int, high: int) -> int:
+    return int(max(low, min(high, value)))
+
+
+def _postgres(
+    profile: TuningProfile, vcpus: int, memory: int, aurora: bool
+) -> Dict[str, Tuple[int, str]]:
+    connections = _max_connections(profile, memory)
+    buffers = memory * profile.postgres_buffers
+    parameters = {}
+    if not aurora:
+        parameters["shared_buffers"] = (
+            int(buffers // POSTGRES_PAGE),
+            "pending-reboot",
+        )
+        # The buffers plus the file system cache
+        parameters["effective_cache_size"] = (
+            int(memory * 0.75 // POSTGRES_PAGE),
+            "immediate",
+        )
+        query_memory = (memory - buffers) * profile.query_memory
+    else:
+        # Aurora gives most of the memory to its own buffer cache
+        query_memory = memory * 0.25 * profile.query_memory
+    parameters["max_connections"] = (connections, "pending-reboot")
+    # A query can use several work_mem, one per sort or hash
+    parameters["work_mem"] = (
+        _clamp(
+            query_memory / connections / 2 / KIB, 4 * MIB // KIB, GIB // KIB
+        ),
+        "immediate",
+    )
+    parameters["maintenance_work_mem"] = (
+        _clamp(
+            memory * profile.maintenance_memory / KIB,
+            64 * MIB // KIB,
+            2 * GIB // KIB,
+        ),
+        "immediate",
+    )
+    parameters["max_worker_processes"] = (max(8, vcpus), "pending-reboot")
+    parameters["max_parallel_workers"] = (vcpus, "immediate")
+    parameters["max_parallel_workers_per_gather"] = (
+        _clamp(vcpus * profile.parallel_share, 0, vcpus),
+        "immediate",
+    )
+    return parameters
+
+
+def _mysql(
+    profile: TuningProfile, vcpus: int, memory: int, aurora: bool
+) -> Dict[str, Tuple[int, str]]:
+    connections = _max_connections(profile, memory)
+    buffers = memory * profile.mysql_buffers
+    parameters = {}
+    if not aurora:
+        # Instances of at least 1GiB each cut the contention on the pool,
+        # whose size must be a multiple of the chunks of all instances
+        instances = _clamp(buffers // GIB, 1, 64)
+        step = INNODB_CHUNK * instances
+        parameters["innodb_buffer_pool_size"] = (
+            max(step, int(buffers // step) * step),
+            "pending-reboot",
+        )
+        parameters["innodb_buffer_pool_instances"] = (
+            instances,
+            "pending-reboot",
+        )
+        query_memory = (memory - buffers) * profile.query_memory
+    else:
+        query_memory = memory * 0.25 * profile.query_memory
+    parameters["max_connections"] = (connections, "immediate")
+    # In memory temporary tables need both limits
+    temporary_tables = _clamp(query_memory / connections, 16 * MIB, GIB)
+    parameters["tmp_table_size"] = (temporary_tables, "immediate")
+    parameters["max_heap_table_size"] = (temporary_tables, "immediate")
+    # Aurora storage does its own io, the threads aren't modifiable there
+    if not aurora:
+        parameters["innodb_read_io_threads"] = (
+            _clamp(vcpus // 2, 4, 64),
+            "pending-reboot",
+        )
+        parameters["innodb_write_io_threads"] = (
+            _clamp(vcpus // 2, 4, 64),
+            "pending-reboot",
+        )
+    return parameters
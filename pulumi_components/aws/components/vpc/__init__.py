@@ -1,4 +1,53 @@
-from ._inputs import VpcPeeringArgs, VpcSubnetArgs
-from .vpc import Vpc
+from typing import TYPE_CHECKING
 
-__all__ = ["VpcSubnetArgs", "VpcPeeringArgs", "Vpc"]
+from ...._utilities import lazy_exports
+
+if TYPE_CHECKING:
+    from ._inputs import (
+        SubnetTierArgs,
+        TransitGatewayAttachmentArgs,
+        VpcFlowLogArgs,
+        VpcPeeringArgs,
+        VpcSubnetArgs,
+    )
+    from .exceptions import CidrValidationException
+    from .ipam import IpamRegistry
+    from .planner import BuddyAllocator, plan_ipv6_subnets, plan_subnets
+    from .transit_gateway import TransitGatewayFabric
+    from .validation import validate_vpc_cidrs
+    from .vpc import Vpc
+
+__all__ = [
+    "VpcSubnetArgs",
+    "VpcPeeringArgs",
+    "SubnetTierArgs",
+    "VpcFlowLogArgs",
+    "Vpc",
+    "BuddyAllocator",
+    "plan_subnets",
+    "plan_ipv6_subnets",
+    "validate_vpc_cidrs",
+    "CidrValidationException",
+    "IpamRegistry",
+    "TransitGatewayAttachmentArgs",
+    "TransitGatewayFabric",
+]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "VpcSubnetArgs": "._inputs",
+        "VpcPeeringArgs": "._inputs",
+        "SubnetTierArgs": "._inputs",
+        "VpcFlowLogArgs": "._inputs",
+        "Vpc": ".vpc",
+        "BuddyAllocator": ".planner",
+        "plan_subnets": ".planner",
+        "plan_ipv6_subnets": ".planner",
+        "validate_vpc_cidrs": ".validation",
+        "CidrValidationException": ".exceptions",
+        "IpamRegistry": ".ipam",
+        "TransitGatewayAttachmentArgs": "._inputs",
+        "TransitGatewayFabric": ".transit_gateway",
+    },
+)
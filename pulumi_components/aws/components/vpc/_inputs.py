@@ -1,11 +1,14 @@
 """This module contains nested inputs for the vpc component"""
 import os
-from typing import Mapping, Optional
+from typing import TYPE_CHECKING, Mapping, Optional, Sequence
 
 import pulumi
 
 from .exceptions import VpcPeeringException
 
+if TYPE_CHECKING:
+    from .vpc import Vpc
+
 
 @pulumi.input_type
 class VpcSubnetArgs:
@@ -18,6 +21,23 @@ class VpcSubnetArgs:
     ] = pulumi.property(  # noqa E501
         "tags", default=None
     )
+    # Label in the subnet resource name, defaults to public or private
+    name: Optional[str] = pulumi.property("name", default=None)
+
+
+@pulumi.input_type
+class SubnetTierArgs:
+    """A class defining a tier of subnets, one per availability zone, in
+    the vpc component"""
+
+    name: str = pulumi.property("name")
+    prefix_length: int = pulumi.property("prefix_length")
+    public: bool = pulumi.property("public", default=False)
+    tags: Optional[
+        pulumi.Input[Mapping[str, pulumi.Input[str]]]
+    ] = pulumi.property(  # noqa E501
+        "tags", default=None
+    )
 
 
 @pulumi.input_type
@@ -33,6 +53,8 @@ class VpcPeeringArgs:
         cidr: Optional[str] = None,
         account_id: Optional[str] = None,
         aws_profile: Optional[str] = os.getenv("AWS_PROFILE"),
+        region: Optional[str] = None,
+        role_arn: Optional[str] = None,
     ):
         if accepter and (account_id or cidr):
             raise VpcPeeringException(
@@ -44,6 +66,8 @@ class VpcPeeringArgs:
         pulumi.set(self, "cidr", cidr)
         pulumi.set(self, "account_id", account_id)
         pulumi.set(self, "aws_profile", aws_profile)
+        pulumi.set(self, "region", region)
+        pulumi.set(self, "role_arn", role_arn)
 
     @property
     @pulumi.getter(name="name")
@@ -80,3 +104,56 @@ class VpcPeeringArgs:
     def aws_profile(self) -> Optional[str]:
         """aws profile required for peering connection"""
         ...
+
+    @property
+    @pulumi.getter(name="region")
+    def region(self) -> Optional[str]:
+        """region of the remote vpc, defaults to the region of the stack"""
+        ...
+
+    @property
+    @pulumi.getter(name="role_arn")
+    def role_arn(self) -> Optional[str]:
+        """role assumed with the aws profile to read the remote vpc"""
+        ...
+
+
+@pulumi.input_type
+class TransitGatewayAttachmentArgs:
+    """A class defining the attachment of a vpc component to a transit
+    gateway fabric. The vpc is associated with the route table of its
+    route domain, and propagates its cidr to the route tables of the
+    domains in propagate_to, which default to its own domain."""
+
+    name: str = pulumi.property("name")
+    vpc: "Vpc" = pulumi.property("vpc")
+    domain: str = pulumi.property("domain", default="default")
+    propagate_to: Optional[Sequence[str]] = pulumi.property(
+        "propagate_to", default=None
+    )
+
+
+@pulumi.input_type
+class VpcFlowLogArgs:
+    """A class defining the flow logs of the vpc component, written to s3
+    in parquet with hive compatible hourly partitions. A bucket is created
+    unless bucket_arn is given, and a glue database unless database_name
+    is given."""
+
+    bucket_arn: Optional[pulumi.Input[str]] = pulumi.property(
+        "bucket_arn", default=None
+    )
+    # Folder of the logs in the bucket, defaults to the name of the vpc
+    prefix: Optional[str] = pulumi.property("prefix", default=None)
+    traffic_type: str = pulumi.property("traffic_type", default="ALL")
+    # Seconds, either 60 or 600
+    max_aggregation_interval: int = pulumi.property(
+        "max_aggregation_interval", default=600
+    )
+    # Days the logs are kept in the bucket created for them
+    expiration_days: Optional[int] = pulumi.property(
+        "expiration_days", default=None
+    )
+    database_name: Optional[pulumi.Input[str]] = pulumi.property(
+        "database_name", default=None
+    )
@@ -3,3 +3,7 @@
 
 class VpcPeeringException(Exception):
     pass
+
+
+class CidrValidationException(ValueError):
+    pass
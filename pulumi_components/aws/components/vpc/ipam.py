@@ -0,0 +1,162 @@
+"""Ip address management of vpc cidrs shared by many stacks.
+
+The cidrs allocated from a pool are recorded in a sqlite database along
+with their owner, e.g. the project, stack and name of the vpc. Every
+allocation runs in an immediate transaction, which holds the write lock
+of the database, so stacks deployed at the same time never get the same
+block. The free blocks are rebuilt in a buddy allocator from the recorded
+cidrs, which stays fast with thousands of allocations.
+"""
+import ipaddress
+import sqlite3
+from contextlib import closing, contextmanager
+from typing import Dict, Iterator, Union
+
+from .exceptions import CidrValidationException
+from .planner import BuddyAllocator, Network
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS allocations (
+    pool TEXT NOT NULL,
+    cidr TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    allocated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (pool, owner),
+    UNIQUE (pool, cidr)
+)
+"""
+
+
+def vpc_owner(project: str, stack: str, name: str) -> str:
+    """Returns the owner of the cidr of a vpc in the registry"""
+    return f"{project}/{stack}/{name}"
+
+
+class IpamRegistry:
+    """A registry of the vpc cidrs allocated from a pool.
+
+    Allocations are idempotent per owner, asking again returns the cidr
+    already recorded, so the registry can be used from programs that run
+    on every preview and update. A dry run, e.g. a preview, returns the
+    cidr the owner would get without recording it. Cidrs are kept until
+    they are released, destroying a vpc doesn't release its cidr."""
+
+    def __init__(
+        self,
+        path: str,
+        pool: Union[str, Network] = "10.0.0.0/8",
+        timeout: float = 30.0,
+    ) -> None:
+        self.path = path
+        self.pool = ipaddress.ip_network(pool)
+        # Seconds to wait for the lock held by other stacks
+        self.timeout = timeout
+        with self._transaction() as connection:
+            connection.execute(_SCHEMA)
+
+    def allocate(
+        self, owner: str, prefix_length: int, dry_run: bool = False
+    ) -> str:
+        """Returns the cidr of the owner, allocating the first free block
+        of the prefix length if the owner has none yet"""
+        with self._transaction() as connection:
+            cidr = self._owned_cidr(connection, owner)
+            if cidr is not None:
+                if ipaddress.ip_network(cidr).prefixlen != prefix_length:
+                    raise ValueError(
+                        f"{owner} already owns {cidr}, release it before"
+                        f" allocating a /{prefix_length}"
+                    )
+                return cidr
+            allocator = BuddyAllocator(
+                self.pool, self._allocations(connection)
+            )
+            cidr = str(allocator.allocate(prefix_length))
+            if not dry_run:
+                self._record(connection, owner, cidr)
+            return cidr
+
+    def reserve(
+        self, owner: str, cidr: Union[str, Network], dry_run: bool = False
+    ) -> str:
+        """Records the given cidr for the owner, raises
+        CidrValidationException if it overlaps the cidr of another owner"""
+        network = ipaddress.ip_network(cidr)
+        if network.version != self.pool.version or not network.subnet_of(
+            self.pool
+        ):
+            raise ValueError(f"{network} is not within the pool {self.pool}")
+        with self._transaction() as connection:
+            owned = self._owned_cidr(connection, owner)
+            if owned is not None:
+                if ipaddress.ip_network(owned) != network:
+                    raise ValueError(
+                        f"{owner} already owns {owned}, release it before"
+                        f" reserving {network}"
+                    )
+                return owned
+            allocations = self._allocations(connection)
+            conflicts = [
+                f"{allocated} of {allocation_owner}"
+                for allocated, allocation_owner in allocations.items()
+                if ipaddress.ip_network(allocated).overlaps(network)
+            ]
+            if conflicts:
+                raise CidrValidationException(
+                    f"{network} of {owner} overlaps " + ", ".join(conflicts)
+                )
+            if not dry_run:
+                self._record(connection, owner, str(network))
+            return str(network)
+
+    def release(self, owner: str) -> None:
+        """Frees the cidr of the owner, e.g. once its vpc is destroyed"""
+        with self._transaction() as connection:
+            connection.execute(
+                "DELETE FROM allocations WHERE pool = ? AND owner = ?",
+                (str(self.pool), owner),
+            )
+
+    def allocations(self) -> Dict[str, str]:
+        """Returns the allocated cidrs of the pool mapped to their owner,
+        the format of the cidr registry of the vpc validation"""
+        with self._transaction() as connection:
+            return self._allocations(connection)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with closing(
+            sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None
+            )
+        ) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def _allocations(self, connection: sqlite3.Connection) -> Dict[str, str]:
+        return dict(
+            connection.execute(
+                "SELECT cidr, owner FROM allocations WHERE pool = ?",
+                (str(self.pool),),
+            )
+        )
+
+    def _owned_cidr(self, connection: sqlite3.Connection, owner: str):
+        row = connection.execute(
+            "SELECT cidr FROM allocations WHERE pool = ? AND owner = ?",
+            (str(self.pool), owner),
+        ).fetchone()
+        return row[0] if row else None
+
+    def _record(
+        self, connection: sqlite3.Connection, owner: str, cidr: str
+    ) -> None:
+        connection.execute(
+            "INSERT INTO allocations (pool, cidr, owner) VALUES (?, ?, ?)",
+            (str(self.pool), cidr, owner),
+        )
@@ -0,0 +1,187 @@
+"""Planner allocating the subnets of a vpc from its cidr"""
+import ipaddress
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+from ._inputs import SubnetTierArgs, VpcSubnetArgs
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+class BuddyAllocator:
+    """A buddy allocator over the address space of a network.
+
+    Free blocks are kept per prefix length as sorted start addresses. A
+    request is served from the smallest free block that fits it, lowest
+    address first, and the block is halved down to the requested size
+    keeping the upper halves free. Small subnets fill the holes left next
+    to other small subnets instead of breaking up large blocks, and the
+    same requests always get the same subnets.
+
+    Subnets already in use are given as allocated. The free blocks are then
+    built in one pass over the sorted subnets, as the largest aligned
+    blocks of the gaps between them."""
+
+    __slots__ = ("network", "_free")
+
+    def __init__(
+        self,
+        network: Union[str, Network],
+        allocated: Iterable[Union[str, Network]] = (),
+    ) -> None:
+        self.network = ipaddress.ip_network(network)
+        self._free: Dict[int, List[int]] = {}
+        start = int(self.network.network_address)
+        for first, prefix_length in sorted(map(self._block, allocated)):
+            if first < start:
+                subnet = ipaddress.ip_network((first, prefix_length))
+                raise ValueError(f"{subnet} overlaps an allocated subnet")
+            self._free_range(start, first)
+            start = first + self._size(prefix_length)
+        self._free_range(start, int(self.network.broadcast_address) + 1)
+
+    def allocate(self, prefix_length: int) -> Network:
+        """Allocates and returns a free subnet of the prefix length"""
+        self._check_prefix_length(prefix_length)
+        for length in range(prefix_length, self.network.prefixlen - 1, -1):
+            if self._free.get(length):
+                break
+        else:
+            raise ValueError(
+                f"No free /{prefix_length} subnet left in {self.network}"
+            )
+        start = self._free[length].pop(0)
+        while length < prefix_length:
+            length += 1
+            upper_half = start + self._size(length)
+            insort(self._free.setdefault(length, []), upper_half)
+        return ipaddress.ip_network((start, prefix_length))
+
+    def reserve(self, cidr: Union[str, Network]) -> Network:
+        """Marks the given subnet as allocated and returns it"""
+        start, prefix_length = self._block(cidr)
+        subnet = ipaddress.ip_network((start, prefix_length))
+        for length in range(subnet.prefixlen, self.network.prefixlen - 1, -1):
+            block = start & ~(self._size(length) - 1)
+            blocks = self._free.get(length, [])
+            position = bisect_left(blocks, block)
+            if position < len(blocks) and blocks[position] == block:
+                del blocks[position]
+                break
+        else:
+            raise ValueError(f"{subnet} overlaps an allocated subnet")
+        while length < subnet.prefixlen:
+            length += 1
+            half = self._size(length)
+            # Keep free the half that doesn't hold the subnet
+            if start & half:
+                insort(self._free.setdefault(length, []), block)
+                block += half
+            else:
+                insort(self._free.setdefault(length, []), block + half)
+        return subnet
+
+    def _free_range(self, start: int, end: int) -> None:
+        # Splits the addresses from start up to end into the largest
+        # aligned blocks, appended in address order to keep them sorted
+        while start < end:
+            # The largest power of two start is aligned on and that fits
+            alignment = start & -start or end - start
+            size = 1 << (min(alignment, end - start).bit_length() - 1)
+            length = self.network.max_prefixlen - size.bit_length() + 1
+            self._free.setdefault(length, []).append(start)
+            start += size
+
+    def _block(self, cidr: Union[str, Network]) -> Tuple[int, int]:
+        # The start address and prefix length of a subnet of the network,
+        # integers compare much faster than ip networks
+        subnet = ipaddress.ip_network(cidr)
+        start = int(subnet.network_address)
+        if not (
+            subnet.version == self.network.version
+            and subnet.prefixlen >= self.network.prefixlen
+            and start & ~(self._size(self.network.prefixlen) - 1)
+            == int(self.network.network_address)
+        ):
+            raise ValueError(f"{subnet} is not a subnet of {self.network}")
+        return start, subnet.prefixlen
+
+    def _size(self, prefix_length: int) -> int:
+        return 1 << (self.network.max_prefixlen - prefix_length)
+
+    def _check_prefix_length(self, prefix_length: int) -> None:
+        if not (
+            self.network.prefixlen
+            <= prefix_length
+            <= self.network.max_prefixlen
+        ):
+            raise ValueError(
+                f"Invalid prefix length /{prefix_length} for {self.network}"
+            )
+
+
+def plan_subnets(
+    cidr: Union[str, Network],
+    availability_zones: Sequence[str],
+    tiers: Sequence[SubnetTierArgs],
+    reserved: Sequence[Union[str, Network]] = (),
+) -> Dict[str, List[VpcSubnetArgs]]:
+    """Plans one subnet per availability zone for every tier.
+
+    Returns the subnets of every tier keyed by tier name. The subnets are
+    allocated tier after tier, in the order of the availability zones, out
+    of the cidr minus the reserved subnets. The plan only depends on the
+    arguments, and appending tiers leaves the subnets of the existing tiers
+    unchanged. Changing the zones or existing tiers renumbers the subnets.
+    """
+    if not availability_zones:
+        raise ValueError("At least one availability zone is required")
+    if len(set(tier.name for tier in tiers)) != len(tiers):
+        raise ValueError("Subnet tier names must be unique")
+    allocator = BuddyAllocator(cidr, reserved)
+    return {
+        tier.name: [
+            VpcSubnetArgs(
+                cidr=str(allocator.allocate(tier.prefix_length)),
+                az=zone,
+                name=tier.name,
+                tags=tier.tags,
+            )
+            for zone in availability_zones
+        ]
+        for tier in tiers
+    }
+
+
+def plan_ipv6_subnets(
+    cidr: Union[str, Network], subnets: Sequence[Union[str, Network]]
+) -> List[int]:
+    """Plans the /64 of every subnet within the /56 of a dual-stack vpc.
+
+    Returns the index of the /64 of every subnet. The /56 is split in 256
+    slots mapped to the address space of the vpc cidr, and a subnet gets
+    the slot of its first address, so the /64 of a subnet never changes
+    when other subnets are added or removed. Subnets smaller than a 256th
+    of the vpc cidr can share a slot, which raises a ValueError."""
+    network = ipaddress.ip_network(cidr)
+    host_bits = network.max_prefixlen - network.prefixlen
+    indexes = []
+    slots: Dict[int, Network] = {}
+    for subnet in map(ipaddress.ip_network, subnets):
+        offset = int(subnet.network_address) - int(network.network_address)
+        index = (offset << 8) >> host_bits
+        if index in slots:
+            raise ValueError(
+                f"Subnets {slots[index]} and {subnet} get the same ipv6"
+                f" /64, subnets of a dual-stack vpc must be at least a"
+                f" 256th of {network}"
+            )
+        slots[index] = subnet
+        indexes.append(index)
+    return indexes
+
+
+def ipv6_subnet_cidr(cidr: str, index: int) -> str:
+    """Returns the /64 of the given index within an ipv6 /56"""
+    start = int(ipaddress.ip_network(cidr).network_address) + (index << 64)
+    return str(ipaddress.ip_network((start, 64)))
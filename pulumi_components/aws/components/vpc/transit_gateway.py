@@ -0,0 +1,163 @@
+"""Module defining the transit gateway fabric custom resource"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pulumi
+import pulumi_aws as aws
+
+from ._inputs import TransitGatewayAttachmentArgs
+
+
+class TransitGatewayFabric(pulumi.ComponentResource):
+    """A class defining a hub and spoke fabric of vpc components attached
+    to one transit gateway.
+
+    Every route domain gets a transit gateway route table. A vpc is
+    associated with the route table of its domain and propagates its cidr
+    to the route tables of the domains it is reachable from. The route
+    tables of every vpc route the cidrs of the vpcs it can reach, or the
+    summary cidrs when given, to the transit gateway. The attachments and
+    transit gateway route tables grow linearly with the number of vpcs.
+
+    Passing summary_cidrs is the recommended setup: every vpc route table
+    gets one route per summary cidr. Without them every vpc route table
+    gets one route per reachable vpc, so N vpcs in one domain add
+    N x (N - 1) x route tables per vpc routes, quadratic like a mesh of
+    peerings."""
+
+    def __init__(
+        self,
+        name: str,
+        attachments: Sequence[TransitGatewayAttachmentArgs],
+        summary_cidrs: Optional[Sequence[str]] = None,
+        amazon_side_asn: Optional[int] = None,
+        description: Optional[str] = None,
+        opts: Optional[pulumi.ResourceOptions] = None,
+    ):
+        super().__init__(
+            "pulumi-components:aws:components:transit-gateway-fabric",
+            name,
+            {},
+            opts,
+        )
+
+        names = [attachment.name for attachment in attachments]
+        if len(set(names)) != len(names):
+            raise ValueError(
+                "Transit gateway attachment names must be unique"
+            )
+        for attachment in attachments:
+            # Routes set inline in a route table would remove the routes
+            # added by the fabric
+            if not attachment.vpc.standalone_routes:
+                raise ValueError(
+                    f"The vpc of attachment {attachment.name} must be created"
+                    " with standalone_routes=True"
+                )
+
+        self.transit_gateway = aws.ec2transitgateway.TransitGateway(
+            f"{name}-transit-gateway",
+            amazon_side_asn=amazon_side_asn,
+            description=description,
+            default_route_table_association="disable",
+            default_route_table_propagation="disable",
+            opts=pulumi.ResourceOptions(parent=self),
+        )
+
+        # Create one route table per route domain
+        self.route_tables: Dict[str, aws.ec2transitgateway.RouteTable] = {}
+        for attachment in attachments:
+            for domain in (attachment.domain, *_propagated_to(attachment)):
+                if domain in self.route_tables:
+                    continue
+                route_table = aws.ec2transitgateway.RouteTable(
+                    f"{name}-{domain}-route-table",
+                    transit_gateway_id=self.transit_gateway.id,
+                    opts=pulumi.ResourceOptions(parent=self.transit_gateway),
+                )
+                self.route_tables[domain] = route_table
+
+        # Attach the vpcs, associate them with the route table of their
+        # domain and propagate their cidrs
+        self.attachments: Dict[str, aws.ec2transitgateway.VpcAttachment] = {}
+        for attachment in attachments:
+            vpc_attachment = aws.ec2transitgateway.VpcAttachment(
+                f"{name}-{attachment.name}-attachment",
+                transit_gateway_id=self.transit_gateway.id,
+                vpc_id=attachment.vpc.vpc.id,
+                subnet_ids=attachment.vpc.attachment_subnet_ids,
+                transit_gateway_default_route_table_association=False,
+                transit_gateway_default_route_table_propagation=False,
+                opts=pulumi.ResourceOptions(parent=self.transit_gateway),
+            )
+            self.attachments[attachment.name] = vpc_attachment
+            aws.ec2transitgateway.RouteTableAssociation(
+                f"{name}-{attachment.name}-association",
+                transit_gateway_attachment_id=vpc_attachment.id,
+                transit_gateway_route_table_id=self.route_tables[
+                    attachment.domain
+                ].id,
+                opts=pulumi.ResourceOptions(parent=vpc_attachment),
+            )
+            for domain in _propagated_to(attachment):
+                aws.ec2transitgateway.RouteTablePropagation(
+                    f"{name}-{attachment.name}-{domain}-propagation",
+                    transit_gateway_attachment_id=vpc_attachment.id,
+                    transit_gateway_route_table_id=self.route_tables[
+                        domain
+                    ].id,
+                    opts=pulumi.ResourceOptions(parent=vpc_attachment),
+                )
+
+        # Route the reachable cidrs to the transit gateway from the route
+        # tables of every vpc
+        for attachment in attachments:
+            vpc_attachment = self.attachments[attachment.name]
+            destinations = _destinations(
+                attachment, attachments, summary_cidrs
+            )
+            route_tables = attachment.vpc.route_tables
+            for table_name, route_table in route_tables.items():
+                for destination, cidr in destinations:
+                    aws.ec2.Route(
+                        f"{name}-{attachment.name}-{table_name}"
+                        f"-{destination}-route",
+                        route_table_id=route_table.id,
+                        destination_cidr_block=cidr,
+                        transit_gateway_id=self.transit_gateway.id,
+                        opts=pulumi.ResourceOptions(
+                            parent=vpc_attachment, depends_on=[vpc_attachment]
+                        ),
+                    )
+
+        self.register_outputs(
+            {
+                "transit_gateway": self.transit_gateway,
+                "route_tables": self.route_tables,
+                "attachments": self.attachments,
+            }
+        )
+
+
+def _propagated_to(attachment: TransitGatewayAttachmentArgs) -> List[str]:
+    return list(attachment.propagate_to or [attachment.domain])
+
+
+def _destinations(
+    attachment: TransitGatewayAttachmentArgs,
+    attachments: Sequence[TransitGatewayAttachmentArgs],
+    summary_cidrs: Optional[Sequence[str]],
+) -> List[Tuple[str, pulumi.Input[str]]]:
+    """Returns the cidrs routed to the transit gateway from the vpc of the
+    attachment, keyed by a name stable across updates"""
+    if summary_cidrs:
+        return [
+            (cidr.replace("/", "-").replace(".", "-"), cidr)
+            for cidr in summary_cidrs
+        ]
+    # The vpcs propagating to the domain of the attachment are reachable
+    return [
+        (other.name, other.vpc.vpc.cidr_block)
+        for other in attachments
+        if other is not attachment
+        and attachment.domain in _propagated_to(other)
+    ]
@@ -0,0 +1,173 @@
+"""Pre-flight validation of the cidrs of a vpc.
+
+Two cidrs are either disjoint or one holds the other. The cidrs are
+sorted by start address, so overlaps are found in a single sweep, and a
+range overlapping a cidr either holds it, one of its few supernets, or
+starts within it, found by bisecting the sorted starts.
+"""
+import ipaddress
+import json
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .exceptions import CidrValidationException
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+# A cidr along with the name it is reported by
+LabeledCidr = Tuple[str, Union[str, Network]]
+
+
+class CidrIndex:
+    """A sorted index of labeled cidrs answering overlap queries"""
+
+    __slots__ = ("_entries", "_starts", "_labels")
+
+    def __init__(self, cidrs: Iterable[LabeledCidr]) -> None:
+        self._entries = _sorted_networks(cidrs)
+        self._starts = [_start(network) for network, _ in self._entries]
+        self._labels: Dict[Network, List[str]] = {}
+        for network, label in self._entries:
+            self._labels.setdefault(network, []).append(label)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def overlapping(self, cidr: Union[str, Network]) -> List[LabeledCidr]:
+        """Returns the labeled cidrs overlapping the given cidr"""
+        network = ipaddress.ip_network(cidr)
+        # The ranges holding the cidr are the cidr or one of its supernets
+        found = []
+        for prefix_length in range(network.prefixlen):
+            supernet = network.supernet(new_prefix=prefix_length)
+            found.extend(
+                (label, supernet) for label in self._labels.get(supernet, ())
+            )
+        # The ranges held by the cidr start within it
+        first = bisect_left(self._starts, _start(network))
+        last = bisect_right(
+            self._starts, (network.version, int(network.broadcast_address))
+        )
+        found.extend(
+            (label, entry)
+            for entry, label in self._entries[first:last]
+            if entry.prefixlen >= network.prefixlen
+        )
+        return found
+
+
+def find_overlaps(
+    cidrs: Iterable[LabeledCidr],
+) -> List[Tuple[LabeledCidr, LabeledCidr]]:
+    """Returns the pairs of overlapping cidrs.
+
+    Sweeps the cidrs by start address keeping the ranges that hold the
+    current one, so every overlapping cidr is reported along with the
+    smallest range holding it."""
+    overlaps = []
+    holding: List[Tuple[Network, str]] = []
+    for network, label in _sorted_networks(cidrs):
+        while holding and not _overlaps(holding[-1][0], network):
+            holding.pop()
+        if holding:
+            outer, outer_label = holding[-1]
+            overlaps.append(((outer_label, outer), (label, network)))
+        holding.append((network, label))
+    return overlaps
+
+
+def load_registry(path: str) -> CidrIndex:
+    """Loads the registry of allocated ranges from a json file mapping
+    every allocated cidr to its owner, e.g. the name of its vpc"""
+    with open(path, encoding="utf-8") as registry:
+        allocations = json.load(registry)
+    if not isinstance(allocations, dict):
+        raise ValueError(f"{path} must map allocated cidrs to their owner")
+    return CidrIndex(
+        (str(owner), cidr) for cidr, owner in allocations.items()
+    )
+
+
+def validate_vpc_cidrs(
+    name: str,
+    cidr: Union[str, Network],
+    subnets: Sequence[LabeledCidr] = (),
+    peerings: Sequence[LabeledCidr] = (),
+    registry: Optional[Union[str, CidrIndex]] = None,
+    owner: Optional[str] = None,
+) -> None:
+    """Validates the cidrs of a vpc before any resource is created.
+
+    Checks that the subnets are within the vpc cidr and don't overlap each
+    other, that the peering cidrs overlap neither the vpc cidr nor each
+    other and, given a registry, that the vpc cidr overlaps no range
+    allocated to another owner. The ranges of the vpc are the ones of the
+    given owner, its vpc_owner of project, stack and name, as a vpc of
+    the same name in another stack is another vpc. Raises
+    CidrValidationException listing all the conflicts."""
+    vpc_cidr = ipaddress.ip_network(cidr)
+    errors = [
+        f"subnet {label} {subnet} is not within the vpc cidr {vpc_cidr}"
+        for label, subnet in _networks(subnets)
+        if subnet.version != vpc_cidr.version
+        or not subnet.subnet_of(vpc_cidr)
+    ]
+    errors.extend(
+        f"subnet {label} {subnet} overlaps subnet {outer_label} {outer}"
+        for (outer_label, outer), (label, subnet) in find_overlaps(subnets)
+    )
+    errors.extend(
+        f"{outer_label} {outer} overlaps {label} {network}"
+        for (outer_label, outer), (label, network) in find_overlaps(
+            [(f"vpc {name}", vpc_cidr)]
+            + [(f"peering {label}", cidr) for label, cidr in peerings]
+        )
+    )
+    if registry is not None:
+        if isinstance(registry, str):
+            registry = load_registry(registry)
+        errors.extend(
+            f"vpc {name} {vpc_cidr} overlaps {allocated} allocated to"
+            f" {allocation_owner}"
+            for allocation_owner, allocated in registry.overlapping(vpc_cidr)
+            if owner is None or allocation_owner != owner
+        )
+    if errors:
+        raise CidrValidationException(
+            "Invalid cidrs:\n" + "\n".join(f"  {error}" for error in errors)
+        )
+
+
+def validate_subnet_names(names: Iterable[str]) -> None:
+    """Validates that the subnets of a vpc get distinct resource names.
+    Raises ValueError listing the names given to several subnets."""
+    duplicates = sorted(
+        name for name, count in Counter(names).items() if count > 1
+    )
+    if duplicates:
+        raise ValueError(
+            f"Several subnets are named {', '.join(duplicates)}, subnets of"
+            " the same kind within an availability zone need a name"
+        )
+
+
+def _start(network: Network) -> Tuple[int, int]:
+    return network.version, int(network.network_address)
+
+
+def _overlaps(network: Network, other: Network) -> bool:
+    return network.version == other.version and network.overlaps(other)
+
+
+def _networks(cidrs: Iterable[LabeledCidr]) -> List[Tuple[str, Network]]:
+    return [(label, ipaddress.ip_network(cidr)) for label, cidr in cidrs]
+
+
+def _sorted_networks(
+    cidrs: Iterable[LabeledCidr],
+) -> List[Tuple[Network, str]]:
+    # Holding ranges sort before the ranges they hold
+    return sorted(
+        ((network, label) for label, network in _networks(cidrs)),
+        key=lambda entry: (*_start(entry[0]), entry[0].prefixlen),
+    )
@@ -1,11 +1,72 @@
 """Module defining the vpc custom resource"""
 import ipaddress
-from typing import Mapping, Optional, Sequence
+import re
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 
 import pulumi
 import pulumi_aws as aws
 
-from ._inputs import VpcPeeringArgs, VpcSubnetArgs
+from ...utils import invokes, providers
+from ._inputs import (
+    SubnetTierArgs,
+    VpcFlowLogArgs,
+    VpcPeeringArgs,
+    VpcSubnetArgs,
+)
+from .ipam import IpamRegistry, vpc_owner
+from .planner import ipv6_subnet_cidr, plan_ipv6_subnets, plan_subnets
+from .validation import validate_subnet_names, validate_vpc_cidrs
+
+
+# Services reached through a gateway endpoint, the others through an
+# interface endpoint
+GATEWAY_ENDPOINT_SERVICES = frozenset(("s3", "dynamodb"))
+DEFAULT_ENDPOINTS = (
+    "s3",
+    "dynamodb",
+    "ecr.api",
+    "ecr.dkr",
+    "sts",
+    "ssm",
+    "logs",
+)
+
+
+# Simultaneous connections a nat gateway supports per address to a single
+# destination, i.e. destination ip, port and protocol
+NAT_CONNECTIONS_PER_ADDRESS = 55_000
+
+# Columns of the default flow log format in parquet
+FLOW_LOG_COLUMNS = (
+    ("version", "int"),
+    ("account_id", "string"),
+    ("interface_id", "string"),
+    ("srcaddr", "string"),
+    ("dstaddr", "string"),
+    ("srcport", "int"),
+    ("dstport", "int"),
+    ("protocol", "bigint"),
+    ("packets", "bigint"),
+    ("bytes", "bigint"),
+    ("start", "bigint"),
+    ("end", "bigint"),
+    ("action", "string"),
+    ("log_status", "string"),
+)
+# Hive compatible hourly partitions of the flow logs, with the parameters
+# of their partition projection
+FLOW_LOG_PARTITIONS = {
+    "year": {
+        "type": "date",
+        "format": "yyyy",
+        "range": "2021,NOW",
+        "interval": "1",
+        "interval.unit": "YEARS",
+    },
+    "month": {"type": "integer", "range": "1,12", "digits": "2"},
+    "day": {"type": "integer", "range": "1,31", "digits": "2"},
+    "hour": {"type": "integer", "range": "0,23", "digits": "2"},
+}
 
 
 class Vpc(pulumi.ComponentResource):
@@ -14,15 +75,25 @@ class Vpc(pulumi.ComponentResource):
     def __init__(
         self,
         name: str,
-        cidr: pulumi.Input[str],
-        public_subnets: Sequence[VpcSubnetArgs],
-        private_subnets: Optional[VpcSubnetArgs],
+        cidr: Optional[pulumi.Input[str]] = None,
+        public_subnets: Optional[Sequence[VpcSubnetArgs]] = None,
+        private_subnets: Optional[Sequence[VpcSubnetArgs]] = None,
         vpc_peering: Optional[Sequence[VpcPeeringArgs]] = None,
         ha_nat: bool = True,
         enable_dns_hostnames: bool = True,
         enable_dns_support: bool = True,
         instance_tenancy: str = "default",
         protected_eip: bool = False,
+        availability_zones: Optional[Sequence[str]] = None,
+        subnet_tiers: Optional[Sequence[SubnetTierArgs]] = None,
+        cidr_registry: Optional[str] = None,
+        ipam: Optional[IpamRegistry] = None,
+        ipam_prefix_length: int = 16,
+        standalone_routes: bool = False,
+        endpoints: Optional[Sequence[str]] = DEFAULT_ENDPOINTS,
+        nat_gateways_per_az: int = 1,
+        ipv6: bool = False,
+        flow_logs: Optional[VpcFlowLogArgs] = None,
         opts: Optional[pulumi.ResourceOptions] = None,
     ):
         super().__init__(
@@ -34,30 +105,153 @@ class Vpc(pulumi.ComponentResource):
                 "instance tenancy can only have default or dedicated as values"
             )
 
+        if nat_gateways_per_az < 1:
+            raise ValueError("nat_gateways_per_az must be at least 1")
+        if nat_gateways_per_az > 1 and not ha_nat:
+            raise ValueError("nat_gateways_per_az requires ha_nat")
+
+        # Record the cidr of the vpc in the ipam registry, or allocate
+        # one when none is given. A preview only looks the cidr up.
+        owner = vpc_owner(pulumi.get_project(), pulumi.get_stack(), name)
+        if ipam:
+            dry_run = pulumi.runtime.is_dry_run()
+            if cidr:
+                cidr = ipam.reserve(owner, cidr, dry_run=dry_run)
+            else:
+                cidr = ipam.allocate(
+                    owner, ipam_prefix_length, dry_run=dry_run
+                )
+        elif not cidr:
+            raise ValueError("A cidr is required when ipam is not used")
+
         # Check if correct cidr has been passed
         vpc_cidr = ipaddress.IPv4Network(cidr)
 
+        public_subnets = list(public_subnets or [])
+        private_subnets = list(private_subnets or [])
+        # Plan the subnets of the tiers around the subnets given explicitly
+        if subnet_tiers:
+            planned_subnets = plan_subnets(
+                vpc_cidr,
+                availability_zones or [],
+                subnet_tiers,
+                reserved=[
+                    subnet.cidr for subnet in public_subnets + private_subnets
+                ],
+            )
+            for tier in subnet_tiers:
+                if tier.public:
+                    public_subnets.extend(planned_subnets[tier.name])
+                else:
+                    private_subnets.extend(planned_subnets[tier.name])
+        if private_subnets and not public_subnets:
+            raise ValueError(
+                "Private subnets need a public subnet for the nat gateway"
+            )
+        # Subnets are named after their az and name, or kind when they
+        # have no name
+        subnet_labels = [
+            (f"{subnet.az}-{subnet.name or label}", subnet)
+            for label, subnets in (
+                ("public", public_subnets),
+                ("private", private_subnets),
+            )
+            for subnet in subnets
+        ]
+        validate_subnet_names(label for label, _ in subnet_labels)
+        # Check the cidrs known before any resource is created. The cidrs
+        # of peerings read from the remote vpc are only known later.
+        validate_vpc_cidrs(
+            name,
+            vpc_cidr,
+            subnets=[
+                (label, subnet.cidr)
+                for label, subnet in subnet_labels
+                if isinstance(subnet.cidr, str)
+            ],
+            peerings=[
+                (peering.name, peering.cidr)
+                for peering in vpc_peering or []
+                if isinstance(peering.cidr, str)
+            ],
+            registry=cidr_registry,
+            owner=owner,
+        )
+        # Plan the ipv6 /64 of every subnet within the /56 of the vpc
+        ipv6_indexes: List[Optional[int]] = [None] * (
+            len(public_subnets) + len(private_subnets)
+        )
+        if ipv6:
+            subnet_cidrs = [
+                subnet.cidr for subnet in public_subnets + private_subnets
+            ]
+            if not all(isinstance(cidr, str) for cidr in subnet_cidrs):
+                raise ValueError(
+                    "The subnet cidrs of a dual-stack vpc must be known"
+                    " before any resource is created"
+                )
+            ipv6_indexes = plan_ipv6_subnets(vpc_cidr, subnet_cidrs)
+        public_ipv6_indexes = ipv6_indexes[: len(public_subnets)]
+        private_ipv6_indexes = ipv6_indexes[len(public_subnets) :]
+
         self.protected_eip = protected_eip
+        # Expected load and capacity of every nat gateway keyed by name
+        self.nat_gateway_capacity: Dict[str, Dict[str, int]] = {}
+        # Create the routes as separate resources rather than inline in
+        # their route table
+        self.standalone_routes = standalone_routes
+        # The route tables of the vpc keyed by name
+        self.route_tables: Dict[str, aws.ec2.RouteTable] = {}
+        # The children are prefixed with the name of the vpc, so several
+        # vpcs fit in one stack
+        self.name = name
         # Create a VPC resource
         self.vpc = aws.ec2.Vpc(
-            "vpc",
+            f"{name}-vpc",
             args=aws.ec2.VpcArgs(
                 cidr_block=str(vpc_cidr),
                 enable_dns_hostnames=enable_dns_hostnames,
                 enable_dns_support=enable_dns_support,
                 instance_tenancy=instance_tenancy,
+                # Left unset rather than false so existing vpcs show no diff
+                assign_generated_ipv6_cidr_block=ipv6 or None,
             ),
-            opts=pulumi.ResourceOptions(parent=self),
+            opts=_aliased(pulumi.ResourceOptions(parent=self), "vpc"),
         )
+        self.ipv6_cidr_block = self.vpc.ipv6_cidr_block if ipv6 else None
 
         # Create internet gateway resource
         self.igw = aws.ec2.InternetGateway(
-            "internet-gateway",
+            f"{name}-internet-gateway",
             vpc_id=self.vpc.id,
-            opts=pulumi.ResourceOptions(parent=self.vpc),
+            opts=_aliased(
+                pulumi.ResourceOptions(parent=self.vpc), "internet-gateway"
+            ),
         )
+        # Private subnets reach the internet over ipv6 through an egress
+        # only internet gateway, which needs no nat
+        public_ipv6_routes: Dict[str, aws.ec2.RouteTableRouteArgs] = {}
+        private_ipv6_routes: Dict[str, aws.ec2.RouteTableRouteArgs] = {}
+        self.egress_only_igw = None
+        if ipv6:
+            public_ipv6_routes["default-ipv6"] = aws.ec2.RouteTableRouteArgs(
+                ipv6_cidr_block="::/0", gateway_id=self.igw.id
+            )
+        if ipv6 and private_subnets:
+            self.egress_only_igw = aws.ec2.EgressOnlyInternetGateway(
+                f"{name}-egress-only-internet-gateway",
+                vpc_id=self.vpc.id,
+                opts=pulumi.ResourceOptions(parent=self.vpc),
+            )
+            private_ipv6_routes["default-ipv6"] = aws.ec2.RouteTableRouteArgs(
+                ipv6_cidr_block="::/0",
+                egress_only_gateway_id=self.egress_only_igw.id,
+            )
         # Create VPC peering
         self.vpc_peering_routes = []
+        # Peering routes keyed by peering name, to name standalone routes.
+        # The keys are suffixed so no peering replaces the default routes.
+        self._peering_routes: Dict[str, aws.ec2.RouteTableRouteArgs] = {}
         if vpc_peering:
             for peering in vpc_peering:
                 peering_details = self._create_peering(
@@ -67,50 +261,68 @@ class Vpc(pulumi.ComponentResource):
                     peering.aws_profile,
                     peering.account_id,
                     peering.cidr,
+                    peering.region,
+                    peering.role_arn,
                 )
                 self.vpc_peering_routes.append(
                     peering_details.get("vpc_routes")
                 )  # noqa E501
+                self._peering_routes[
+                    f"{peering.name}-peering"
+                ] = peering_details.get(
+                    "vpc_routes"
+                )
 
         # Create public subnets
         self.public_subnets = []
         self.public_subnet_ids = []
         self.pubic_route_table = self._create_rout_tables(
             "public-rt",
-            [
-                aws.ec2.RouteTableRouteArgs(
+            {
+                "default": aws.ec2.RouteTableRouteArgs(
                     cidr_block="0.0.0.0/0", gateway_id=self.igw.id
-                )
-            ]
-            * self.vpc_peering_routes
-            if self.vpc_peering_routes
-            else [],
+                ),
+                **public_ipv6_routes,
+                **self._peering_routes,
+            },
             opts=pulumi.ResourceOptions(parent=self.vpc),
         )
-        nat_details: Mapping[str, aws.ec2.NatGateway] = {}
-        for subnet in public_subnets:
+        # Nat gateways of every az keyed by az
+        nat_details: Dict[str, List[aws.ec2.NatGateway]] = {}
+        az_public_subnets: Dict[str, List[aws.ec2.Subnet]] = {}
+        for subnet, ipv6_index in zip(public_subnets, public_ipv6_indexes):
             public_subnet = self._create_subnet(
                 subnet.cidr,
                 subnet.az,
                 self.pubic_route_table,
                 False,
-                "public",
+                subnet.name or "public",
                 subnet.tags,
+                ipv6_index,
             )
             self.public_subnets.append(public_subnet)
             self.public_subnet_ids.append(public_subnet.id)
+            az_public_subnets.setdefault(subnet.az, []).append(public_subnet)
 
-            # Create nat gateways if ha_nat enabled
-            if private_subnets and ha_nat:
-                nat_details[subnet.az] = self._create_nat_gateway(
-                    f"{name}-{subnet.az}", public_subnet
-                )
+        # Create nat gateways if ha_nat enabled, nat_gateways_per_az per
+        # az spread over the public subnets of the az
+        if private_subnets and ha_nat:
+            for az, subnets in az_public_subnets.items():
+                nat_details[az] = [
+                    self._create_nat_gateway(
+                        _nat_name(name, az, shard),
+                        subnets[shard % len(subnets)],
+                    )
+                    for shard in range(nat_gateways_per_az)
+                ]
         if private_subnets and not ha_nat:
             # If ha_nat is not enabled. We create only one nat gateway
             # in the az of the first subnet
-            nat_details[public_subnets[0].az] = self._create_nat_gateway(
-                f"{name}-{public_subnets[0].az}", self.public_subnets[0]
-            )
+            nat_details[public_subnets[0].az] = [
+                self._create_nat_gateway(
+                    f"{name}-{public_subnets[0].az}", self.public_subnets[0]
+                )
+            ]
 
         # Create Private subnets
         self.private_subnets = []
@@ -122,55 +334,129 @@ class Vpc(pulumi.ComponentResource):
         if private_subnets and not ha_nat:
             private_rt = self._create_rout_tables(
                 "private-rt",
-                [
-                    aws.ec2.RouteTableRouteArgs(
+                {
+                    "default": aws.ec2.RouteTableRouteArgs(
                         cidr_block="0.0.0.0/0",
-                        nat_gateway_id=list(nat_details.values())[0].id,
-                    )
-                ]
-                * self.vpc_peering_routes
-                if self.vpc_peering_routes
-                else [],
+                        nat_gateway_id=list(nat_details.values())[0][0].id,
+                    ),
+                    **private_ipv6_routes,
+                    **self._peering_routes,
+                },
                 opts=pulumi.ResourceOptions(parent=self.vpc),
             )
             self.private_route_tables.append(private_rt)
-            for subnet in private_subnets:
+            for capacity in self.nat_gateway_capacity.values():
+                capacity["private_subnets"] = len(private_subnets)
+            for subnet, ipv6_index in zip(
+                private_subnets, private_ipv6_indexes
+            ):
                 private_subnet = self._create_subnet(
                     subnet.cidr,
                     subnet.az,
                     self.private_route_tables[0],
                     True,
-                    "private",
+                    subnet.name or "private",
                     subnet.tags,
+                    ipv6_index,
                 )
                 self.private_subnets.append(private_subnet)
                 self.private_subnet_ids.append(private_subnet.id)
         elif private_subnets and ha_nat:
-            for subnet in private_subnets:
-                private_rt = self._create_rout_tables(
-                    f"{subnet.az}-private-rt",
-                    [
-                        aws.ec2.RouteTableRouteArgs(
-                            cidr_block="0.0.0.0/0",
-                            nat_gateway_id=nat_details.get(f"{subnet.az}").id,
-                        )
-                    ]
-                    * self.vpc_peering_routes
-                    if self.vpc_peering_routes
-                    else [],
-                    opts=pulumi.ResourceOptions(parent=self.vpc),
+            # One route table per nat gateway, shared by the private subnets
+            # of the az assigned to the nat gateway. The subnets of an az
+            # are assigned to its nat gateways in turn, so appending a
+            # subnet doesn't move the others.
+            private_route_tables: Dict[
+                Tuple[str, int], aws.ec2.RouteTable
+            ] = {}
+            az_subnet_counts: Dict[str, int] = {}
+            for subnet, ipv6_index in zip(
+                private_subnets, private_ipv6_indexes
+            ):
+                if subnet.az not in nat_details:
+                    raise ValueError(
+                        f"No public subnet in {subnet.az} for the nat"
+                        " gateway of its private subnets"
+                    )
+                az_nat_gateways = nat_details[subnet.az]
+                shard = az_subnet_counts.get(subnet.az, 0) % len(
+                    az_nat_gateways
                 )
-                self.private_route_tables.append(private_rt)
+                az_subnet_counts[subnet.az] = (
+                    az_subnet_counts.get(subnet.az, 0) + 1
+                )
+                nat_gateway = az_nat_gateways[shard]
+                self.nat_gateway_capacity[
+                    f"{_nat_name(name, subnet.az, shard)}-nat-gateway"
+                ]["private_subnets"] += 1
+                private_rt = private_route_tables.get((subnet.az, shard))
+                if private_rt is None:
+                    private_rt = self._create_rout_tables(
+                        f"{subnet.az}-private-rt"
+                        if shard == 0
+                        else f"{subnet.az}-private-rt-{shard}",
+                        {
+                            "default": aws.ec2.RouteTableRouteArgs(
+                                cidr_block="0.0.0.0/0",
+                                nat_gateway_id=nat_gateway.id,
+                            ),
+                            **private_ipv6_routes,
+                            **self._peering_routes,
+                        },
+                        opts=pulumi.ResourceOptions(parent=self.vpc),
+                    )
+                    private_route_tables[(subnet.az, shard)] = private_rt
+                    self.private_route_tables.append(private_rt)
                 private_subnet = self._create_subnet(
                     subnet.cidr,
                     subnet.az,
                     private_rt,
                     True,
-                    "private",
+                    subnet.name or "private",
                     subnet.tags,  # noqa E501
+                    ipv6_index,
                 )
                 self.private_subnets.append(private_subnet)
                 self.private_subnet_ids.append(private_subnet.id)
+        # One subnet per az, private when the vpc has private subnets, to
+        # attach the vpc to a transit gateway and for interface endpoints
+        attachment_subnets: Dict[str, pulumi.Output[str]] = {}
+        for subnet, resource in (
+            list(zip(private_subnets, self.private_subnets))
+            or zip(public_subnets, self.public_subnets)
+        ):
+            attachment_subnets.setdefault(subnet.az, resource.id)
+        self.attachment_subnet_ids = list(attachment_subnets.values())
+        self.public_subnet_ipv6_cidrs = []
+        self.private_subnet_ipv6_cidrs = []
+        if ipv6:
+            self.public_subnet_ipv6_cidrs = [
+                subnet.ipv6_cidr_block for subnet in self.public_subnets
+            ]
+            self.private_subnet_ipv6_cidrs = [
+                subnet.ipv6_cidr_block for subnet in self.private_subnets
+            ]
+
+        # Create vpc endpoints so the private subnets reach aws services
+        # without going through the nat gateways
+        self.endpoints: Dict[str, aws.ec2.VpcEndpoint] = {}
+        self.endpoint_security_group = None
+        if private_subnets and endpoints:
+            # Private dns names of interface endpoints need both dns
+            # options of the vpc, aws rejects them otherwise
+            self._create_endpoints(
+                endpoints,
+                vpc_cidr,
+                private_dns=enable_dns_hostnames and enable_dns_support,
+            )
+
+        # Write the flow logs of the vpc to s3, queryable with athena
+        self.flow_log = None
+        self.flow_logs_bucket = None
+        self.flow_logs_table = None
+        if flow_logs:
+            self._create_flow_logs(name, flow_logs)
+
         self.register_outputs(
             {
                 "vpc": self.vpc,
@@ -180,6 +466,15 @@ class Vpc(pulumi.ComponentResource):
                 "private_subnets": self.private_subnets,
                 "private_subnet_ids": self.private_subnet_ids,
                 "private_route_tables": self.private_route_tables,
+                "endpoints": self.endpoints,
+                "nat_gateway_capacity": self.nat_gateway_capacity,
+                "ipv6_cidr_block": self.ipv6_cidr_block,
+                "egress_only_igw": self.egress_only_igw,
+                "public_subnet_ipv6_cidrs": self.public_subnet_ipv6_cidrs,
+                "private_subnet_ipv6_cidrs": self.private_subnet_ipv6_cidrs,
+                "flow_log": self.flow_log,
+                "flow_logs_bucket": self.flow_logs_bucket,
+                "flow_logs_table": self.flow_logs_table,
             }
         )
 
@@ -191,18 +486,21 @@ class Vpc(pulumi.ComponentResource):
         peering_profile: str = None,
         peering_account_id: str = None,
         peering_cidr: str = None,
-        region: str = "eu-west-1",
+        region: str = None,
+        role_arn: str = None,
     ) -> Mapping:
         """Creates peering connection. To create a peering connection,
         we must have the peering_vpc_id. If the account_id of the remote
         account is provided, we must also have the CIDR range. If account_id
-        and cidr range not provided. The function must have a profile id, as
-        that will be used to obtain this information."""
+        and cidr range not provided. The function must have a profile id or
+        a role, as that will be used to obtain this information. The remote
+        region defaults to the region of the stack."""
         remote_vpc = None
+        remote_provider = None
         remote_cidr_block = None
         remote_account_id = None
-        same_account_peering = False
         conf = pulumi.Config("aws")
+        region = region or conf.get("region")
         # If we have the remote aws account id,
         # We must also have the cidr as well.
         if peering_account_id:
@@ -211,124 +509,327 @@ class Vpc(pulumi.ComponentResource):
                 remote_cidr_block = peering_cidr
             else:
                 raise ValueError("CIDR block not provided for peering")
-        elif peering_profile:
-            # Create a remote provider
-            remote_provider = aws.Provider(
-                f"{peering_profile}-{peering_vpc_name}-remote-provider",
-                profile=peering_profile,
-                region=region,
-                skip_metadata_api_check=False,
-            )
-            # Create remote resource option
-            remote_resource_option = pulumi.ResourceOptions(
-                parent=self, provider=remote_provider
-            )
-            # Create remote invoke option
-            remote_invoke_option = pulumi.InvokeOptions(
-                parent=self, provider=remote_provider
+        elif peering_profile or role_arn:
+            # Get the remote provider, shared by all the peerings
+            # with the same profile, region and role
+            remote_provider = providers.get_provider(
+                peering_profile, region, role_arn
             )
             # Since we don't have the remote account id and cidr
             # We need to get that information, as it is required
             # for creating a peering connection
-            remote_account_id = aws.get_caller_identity(
-                opts=remote_invoke_option
+            remote_account_id = invokes.get_caller_identity_output(
+                remote_provider
             ).account_id
             # Get the remote vpc resource using the vpc_id provided
-            remote_vpc = aws.ec2.Vpc.get(
-                f"{peering_vpc_name}-vpc",
-                id=peering_vpc_id,
-                opts=remote_resource_option,
+            remote_vpc = invokes.get_vpc(
+                f"{self.name}-{peering_vpc_name}-vpc",
+                peering_vpc_id,
+                provider=remote_provider,
+                parent=self,
             )
             remote_cidr_block = remote_vpc.cidr_block
         else:
             raise ValueError(
-                "You must either provide an aws account_id or aws profile"
+                "You must either provide an aws account_id, aws profile"
+                " or role"
             )  # noqa E501
         # Resource option for these resources
         this_resource_option = pulumi.ResourceOptions(parent=self)
-        this_account_id = aws.get_caller_identity(
-            opts=this_resource_option
-        ).account_id  # noqa E501
+        this_account_id = invokes.get_caller_identity_output(
+            self.get_provider("aws:index:getCallerIdentity")
+        ).account_id
 
-        if remote_account_id == this_account_id and region == conf.get(
-            "region"
-        ):  # noqa E501
-            same_account_peering = True
+        # The account ids are only known once the invokes resolve, so the
+        # decision is an Output and the peerings resolve concurrently
+        same_account_peering = pulumi.Output.all(
+            remote_account_id, this_account_id
+        ).apply(
+            lambda ids: ids[0] == ids[1] and region == conf.get("region")
+        )
 
         # If we are requesting the peering connection
         if not peering_accepter:
             peering_connection = aws.ec2.VpcPeeringConnection(
-                f"{peering_vpc_name}-peering-connection",
+                f"{self.name}-{peering_vpc_name}-peering-connection",
                 auto_accept=same_account_peering,
                 peer_vpc_id=peering_vpc_id,
                 vpc_id=self.vpc.id,
                 peer_owner_id=remote_account_id,
-                peer_region=None if same_account_peering else region,
-                tags=self.vpc.tags_all.apply(
+                peer_region=same_account_peering.apply(
+                    lambda same: None if same else region
+                ),
+                tags=pulumi.Output.all(
+                    self.vpc.tags_all, same_account_peering
+                ).apply(
                     lambda x: {
-                        "Name": f"[{x['Name']}] <-> [{peering_vpc_name}]",
-                        "Side": "Local"
-                        if same_account_peering
-                        else "Requester",  # noqa E501
+                        "Name": f"[{x[0]['Name']}] <-> [{peering_vpc_name}]",
+                        "Side": "Local" if x[1] else "Requester",
                     }
                 ),
-                opts=this_resource_option,
+                opts=_aliased(
+                    this_resource_option,
+                    f"{peering_vpc_name}-peering-connection",
+                ),
             )
         else:
-            # If we are not the requester, but accepter and the peering is not
-            # in the same aws account
-            if not same_account_peering:
-                # We need to first get the peering connection
-                remote_peering_connection = (
-                    aws.ec2.get_vpc_peering_connection_output(  # noqa E501
-                        peer_vpc_id=peering_vpc_id,
-                        vpc_id=self.vpc.id,
-                        opts=remote_invoke_option,
-                    )
+            # We are the accepter of the peering connection. The
+            # connection requested by the remote vpc is visible from our
+            # account, whether the remote vpc lives in the same account
+            # or not
+            remote_peering_connection = (
+                invokes.get_vpc_peering_connection_output(
+                    self.get_provider("aws:ec2:getVpcPeeringConnection"),
+                    peer_vpc_id=self.vpc.id,
+                    vpc_id=peering_vpc_id,
                 )
-                # Create vpc peering accepter connection
-                peering_connection = aws.ec2.VpcPeeringConnectionAccepter(
+            )
+            # Create vpc peering accepter connection. When the requester
+            # already accepted a same account connection, the accepter
+            # simply adopts the active connection
+            peering_connection = aws.ec2.VpcPeeringConnectionAccepter(
+                f"{self.name}-{peering_vpc_name}"
+                "-peering-accepter-connection",
+                vpc_peering_connection_id=remote_peering_connection.id,
+                auto_accept=True,
+                tags=self.vpc.tags_all.apply(
+                    lambda x: {
+                        "Name": f"[{x['Name']}] <-> [{peering_vpc_name}]",
+                        "Side": "Accepter",
+                    }
+                ),
+                opts=_aliased(
+                    this_resource_option,
                     f"{peering_vpc_name}-peering-accepter-connection",
-                    vpc_peering_connection_id=remote_peering_connection.id,
-                    auto_accept=True,
-                    tags=self.vpc.tags_all.apply(
-                        lambda x: {
-                            "Name": f"[{x['Name']}] <-> [{peering_vpc_name}]",
-                            "Side": "Accepter",
-                        }
-                    ),
-                    opts=this_resource_option,
-                )
-            else:
-                # If we are accepter and the peering
-                # is in the same aws account.
-                # we simply retrieve the peering connection
-                peering_connection = aws.ec2.get_vpc_peering_connection_output(
-                    peer_vpc_id=self.vpc.id, vpc_id=peering_vpc_id
-                )
+                ),
+            )
 
-                # Create vpc routes
-                routes = aws.ec2.RouteTableRouteArgs(
-                    cidr_block=peering_cidr,
-                    vpc_peering_connection_id=peering_connection.id,
-                )
-                return {
-                    "peering_vpc": remote_vpc,
-                    "connection": peering_connection,
-                    "vpc_routes": routes,
-                    "peering_cidr": remote_cidr_block,
-                }
+        # Create vpc routes
+        routes = aws.ec2.RouteTableRouteArgs(
+            cidr_block=remote_cidr_block,
+            vpc_peering_connection_id=peering_connection.id,
+        )
+        return {
+            "peering_vpc": remote_vpc,
+            "connection": peering_connection,
+            "vpc_routes": routes,
+            "peering_cidr": remote_cidr_block,
+        }
 
     def _create_rout_tables(
         self,
         name: str,
-        routes: Sequence[aws.ec2.RouteTableRouteArgs],
+        routes: Mapping[str, aws.ec2.RouteTableRouteArgs],
         opts: pulumi.ResourceOptions = None,
     ) -> aws.ec2.RouteTable:
-        """Creates and returns a route table resource with given parameters"""
-        return aws.ec2.RouteTable(
-            name, vpc_id=self.vpc.id, routes=routes, opts=opts
-        )  # noqa E501
+        """Creates and returns a route table resource with given parameters.
+        In standalone routes mode every route is a separate resource named
+        after its key, so adding a route doesn't rewrite the others."""
+        table_name = f"{self.name}-{name}"
+        opts = _aliased(opts, name)
+        if not self.standalone_routes:
+            route_table = self.route_tables[name] = aws.ec2.RouteTable(
+                table_name,
+                vpc_id=self.vpc.id,
+                routes=list(routes.values()),
+                opts=opts,
+            )
+            return route_table
+        route_table = self.route_tables[name] = aws.ec2.RouteTable(
+            table_name, vpc_id=self.vpc.id, opts=opts
+        )
+        for route_name, route in routes.items():
+            aws.ec2.Route(
+                f"{table_name}-{route_name}-route",
+                route_table_id=route_table.id,
+                **_route_args(route),
+                opts=pulumi.ResourceOptions(parent=route_table),
+            )
+        return route_table
+
+    def _create_endpoints(
+        self,
+        services: Sequence[str],
+        vpc_cidr: ipaddress.IPv4Network,
+        private_dns: bool = True,
+    ) -> None:
+        """Creates gateway endpoints attached to the private route tables
+        and interface endpoints in the private subnets, one per az, sharing
+        a security group allowing https from the vpc, over ipv6 too when
+        the vpc has an ipv6 cidr"""
+        region = invokes.get_region_output(
+            self.get_provider("aws:index:getRegion")
+        ).name
+        for service in services:
+            if service in self.endpoints:
+                continue
+            service_name = pulumi.Output.concat(
+                "com.amazonaws.", region, ".", service
+            )
+            if service in GATEWAY_ENDPOINT_SERVICES:
+                self.endpoints[service] = aws.ec2.VpcEndpoint(
+                    f"{self.name}-{service}-endpoint",
+                    vpc_id=self.vpc.id,
+                    service_name=service_name,
+                    vpc_endpoint_type="Gateway",
+                    route_table_ids=[
+                        route_table.id
+                        for route_table in self.private_route_tables
+                    ],
+                    opts=pulumi.ResourceOptions(parent=self.vpc),
+                )
+                continue
+            if self.endpoint_security_group is None:
+                self.endpoint_security_group = aws.ec2.SecurityGroup(
+                    f"{self.name}-endpoints-security-group",
+                    vpc_id=self.vpc.id,
+                    description="Allows https to the vpc endpoints",
+                    ingress=[
+                        aws.ec2.SecurityGroupIngressArgs(
+                            description="https from the vpc",
+                            protocol="tcp",
+                            from_port=443,
+                            to_port=443,
+                            cidr_blocks=[str(vpc_cidr)],
+                            ipv6_cidr_blocks=[self.ipv6_cidr_block]
+                            if self.ipv6_cidr_block is not None
+                            else None,
+                        )
+                    ],
+                    opts=pulumi.ResourceOptions(parent=self.vpc),
+                )
+            self.endpoints[service] = aws.ec2.VpcEndpoint(
+                f"{self.name}-{service}-endpoint",
+                vpc_id=self.vpc.id,
+                service_name=service_name,
+                vpc_endpoint_type="Interface",
+                subnet_ids=self.attachment_subnet_ids,
+                security_group_ids=[self.endpoint_security_group.id],
+                private_dns_enabled=private_dns,
+                opts=pulumi.ResourceOptions(parent=self.vpc),
+            )
+
+    def _create_flow_logs(self, name: str, flow_logs: VpcFlowLogArgs) -> None:
+        """Creates a flow log writing parquet files to s3 in hive compatible
+        hourly partitions, and a glue table reading them. The table
+        projects its partitions from the s3 layout, so athena only scans
+        the hours a query filters on and no crawler is needed."""
+        bucket_arn = flow_logs.bucket_arn
+        if bucket_arn is None:
+            self.flow_logs_bucket = aws.s3.BucketV2(
+                f"{name}-flow-logs-bucket",
+                opts=pulumi.ResourceOptions(parent=self.vpc),
+            )
+            aws.s3.BucketPublicAccessBlock(
+                f"{name}-flow-logs-bucket-public-access-block",
+                bucket=self.flow_logs_bucket.id,
+                block_public_acls=True,
+                block_public_policy=True,
+                ignore_public_acls=True,
+                restrict_public_buckets=True,
+                opts=pulumi.ResourceOptions(parent=self.flow_logs_bucket),
+            )
+            if flow_logs.expiration_days:
+                aws.s3.BucketLifecycleConfigurationV2(
+                    f"{name}-flow-logs-bucket-lifecycle",
+                    bucket=self.flow_logs_bucket.id,
+                    rules=[
+                        aws.s3.BucketLifecycleConfigurationV2RuleArgs(
+                            id="expire-flow-logs",
+                            status="Enabled",
+                            expiration=aws.s3.BucketLifecycleConfigurationV2RuleExpirationArgs(  # noqa E501
+                                days=flow_logs.expiration_days
+                            ),
+                        )
+                    ],
+                    opts=pulumi.ResourceOptions(parent=self.flow_logs_bucket),
+                )
+            bucket_arn = self.flow_logs_bucket.arn
+        prefix = (flow_logs.prefix or name).strip("/")
+        self.flow_log = aws.ec2.FlowLog(
+            f"{name}-flow-log",
+            vpc_id=self.vpc.id,
+            traffic_type=flow_logs.traffic_type,
+            log_destination_type="s3",
+            log_destination=pulumi.Output.concat(bucket_arn, "/", prefix),
+            max_aggregation_interval=flow_logs.max_aggregation_interval,
+            destination_options=aws.ec2.FlowLogDestinationOptionsArgs(
+                file_format="parquet",
+                hive_compatible_partitions=True,
+                per_hour_partition=True,
+            ),
+            opts=pulumi.ResourceOptions(parent=self.vpc),
+        )
+
+        # Glue names only allow lower case letters, digits and underscores
+        glue_name = re.sub(r"[^a-z0-9_]", "_", f"{name}_flow_logs".lower())
+        database_name = flow_logs.database_name
+        if database_name is None:
+            database_name = aws.glue.CatalogDatabase(
+                f"{name}-flow-logs-database",
+                name=glue_name,
+                opts=pulumi.ResourceOptions(parent=self.vpc),
+            ).name
+        # The flow log writes to
+        # prefix/AWSLogs/aws-account-id=../aws-service=vpcflowlogs/
+        # aws-region=../year=../month=../day=../hour=..
+        provider = self.get_provider("aws:index:getRegion")
+        location = pulumi.Output.concat(
+            "s3://",
+            pulumi.Output.from_input(bucket_arn).apply(
+                lambda arn: arn.split(":::", 1)[1]
+            ),
+            f"/{prefix}/AWSLogs/aws-account-id=",
+            invokes.get_caller_identity_output(provider).account_id,
+            "/aws-service=vpcflowlogs/aws-region=",
+            invokes.get_region_output(provider).name,
+            "/",
+        )
+        projection = {
+            f"projection.{partition}.{key}": value
+            for partition, parameters in FLOW_LOG_PARTITIONS.items()
+            for key, value in parameters.items()
+        }
+        self.flow_logs_table = aws.glue.CatalogTable(
+            f"{name}-flow-logs-table",
+            name=glue_name,
+            database_name=database_name,
+            table_type="EXTERNAL_TABLE",
+            parameters={
+                "EXTERNAL": "TRUE",
+                "classification": "parquet",
+                "projection.enabled": "true",
+                **projection,
+                "storage.location.template": pulumi.Output.concat(
+                    location,
+                    "/".join(
+                        f"{partition}=${{{partition}}}"
+                        for partition in FLOW_LOG_PARTITIONS
+                    ),
+                ),
+            },
+            partition_keys=[
+                aws.glue.CatalogTablePartitionKeyArgs(
+                    name=partition, type="string"
+                )
+                for partition in FLOW_LOG_PARTITIONS
+            ],
+            storage_descriptor=aws.glue.CatalogTableStorageDescriptorArgs(
+                location=location,
+                input_format="org.apache.hadoop.hive.ql.io.parquet.MapredParquetInputFormat",  # noqa E501
+                output_format="org.apache.hadoop.hive.ql.io.parquet.MapredParquetOutputFormat",  # noqa E501
+                ser_de_info=aws.glue.CatalogTableStorageDescriptorSerDeInfoArgs(  # noqa E501
+                    serialization_library="org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe",  # noqa E501
+                ),
+                columns=[
+                    aws.glue.CatalogTableStorageDescriptorColumnArgs(
+                        name=column, type=column_type
+                    )
+                    for column, column_type in FLOW_LOG_COLUMNS
+                ],
+            ),
+            opts=pulumi.ResourceOptions(parent=self.flow_log),
+        )
 
     def _create_subnet(
         self,
@@ -338,24 +839,39 @@ class Vpc(pulumi.ComponentResource):
         private: bool,
         label: str,
         tags: Mapping[str, str] = None,
+        ipv6_index: Optional[int] = None,
     ) -> aws.ec2.Subnet:
         """Creates subnet and associate it with the provided route table.
-        Returns the subnet resource with given parameters"""
+        Given an ipv6_index, the subnet gets the /64 of that index within
+        the ipv6 cidr of the vpc. Returns the subnet resource with given
+        parameters"""
+        ipv6_cidr_block = None
+        if ipv6_index is not None:
+            ipv6_cidr_block = self.vpc.ipv6_cidr_block.apply(
+                lambda cidr: ipv6_subnet_cidr(cidr, ipv6_index)
+            )
         subnet = aws.ec2.Subnet(
-            f"{zone}-{label}-subnet",
+            f"{self.name}-{zone}-{label}-subnet",
             vpc_id=self.vpc.id,
             availability_zone=zone,
             cidr_block=subnet_cidr,
-            assign_ipv6_address_on_creation=False,
+            ipv6_cidr_block=ipv6_cidr_block,
+            assign_ipv6_address_on_creation=ipv6_index is not None,
             map_public_ip_on_launch=not private,
             tags=tags,
-            opts=pulumi.ResourceOptions(parent=self.vpc),
+            opts=_aliased(
+                pulumi.ResourceOptions(parent=self.vpc),
+                f"{zone}-{label}-subnet",
+            ),
         )
         aws.ec2.RouteTableAssociation(
-            f"{zone}-{label}-subnet-associate",
+            f"{self.name}-{zone}-{label}-subnet-associate",
             route_table_id=route_table.id,
             subnet_id=subnet.id,
-            opts=pulumi.ResourceOptions(parent=route_table),
+            opts=_aliased(
+                pulumi.ResourceOptions(parent=route_table),
+                f"{zone}-{label}-subnet-associate",
+            ),
         )
         return subnet
 
@@ -378,4 +894,38 @@ class Vpc(pulumi.ComponentResource):
             subnet_id=subnet.id,
             opts=pulumi.ResourceOptions(parent=subnet),
         )
+        # A single address supports as many connections to each destination
+        self.nat_gateway_capacity[f"{name}-nat-gateway"] = {
+            "addresses": 1,
+            "connections_per_destination": NAT_CONNECTIONS_PER_ADDRESS,
+            "private_subnets": 0,
+        }
         return nat
+
+
+def _aliased(
+    opts: pulumi.ResourceOptions, name: str
+) -> pulumi.ResourceOptions:
+    """Adds the alias of the name a child had before it was prefixed with
+    the name of the vpc, so existing stacks don't replace it"""
+    return pulumi.ResourceOptions.merge(
+        opts, pulumi.ResourceOptions(aliases=[pulumi.Alias(name=name)])
+    )
+
+
+def _route_args(route: aws.ec2.RouteTableRouteArgs) -> Dict[str, Any]:
+    """Returns the arguments of a standalone route from an inline route"""
+    renamed = {
+        "cidr_block": "destination_cidr_block",
+        "ipv6_cidr_block": "destination_ipv6_cidr_block",
+    }
+    return {
+        renamed.get(key, key): value
+        for key, value in vars(route).items()
+        if value is not None
+    }
+
+
+def _nat_name(name: str, az: str, shard: int) -> str:
+    # The first nat gateway of an az keeps the name it had before sharding
+    return f"{name}-{az}" if shard == 0 else f"{name}-{az}-{shard}"
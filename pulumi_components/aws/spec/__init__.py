@@ -0,0 +1,28 @@
+from typing import TYPE_CHECKING
+
+from ..._utilities import lazy_exports
+
+if TYPE_CHECKING:
+    from .exceptions import SpecValidationException
+    from .loader import deploy_spec, load_spec
+    from .models import StackSpec
+    from .validation import validate_spec
+
+__all__ = [
+    "load_spec",
+    "deploy_spec",
+    "validate_spec",
+    "StackSpec",
+    "SpecValidationException",
+]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "load_spec": ".loader",
+        "deploy_spec": ".loader",
+        "validate_spec": ".validation",
+        "StackSpec": ".models",
+        "SpecValidationException": ".exceptions",
+    },
+)
@@ -0,0 +1,2 @@
+class SpecValidationException(ValueError):
+    """Raised when a stack spec is invalid, listing all its errors"""
@@ -0,0 +1,196 @@
+"""Loader of declarative stack specs.
+
+A spec is a json or yaml file listing the vpcs, rds instances and aurora
+clusters of a stack. It is validated once into typed models, and the
+validated form is cached on disk keyed by a hash of the content of the
+spec and of the versions of this package and of pulumi_aws, whose
+signatures the options are checked against. An unchanged spec is neither
+parsed nor validated again on the next preview or update. Yaml specs
+need PyYAML, installed with the yaml extra.
+"""
+import functools
+import hashlib
+import json
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import pulumi
+
+from ..._utilities import user_cache_dir, write_atomically
+from .models import StackSpec
+from .validation import validate_spec
+
+# Part of the cache key, bump it when the validation or the models change
+SPEC_CACHE_VERSION = 1
+YAML_SUFFIXES = (".yaml", ".yml")
+
+
+def user_spec_cache_dir() -> Path:
+    """Returns the folder where validated specs are cached"""
+    return user_cache_dir("specs")
+
+
+def load_spec(
+    path: Union[str, Path],
+    cache_dir: Optional[Union[str, Path]] = None,
+    use_cache: bool = True,
+) -> StackSpec:
+    """Returns the validated models of the spec file, read from the cache
+    when the spec was already validated. Raises SpecValidationException
+    listing all the errors of an invalid spec."""
+    path = Path(path)
+    content = path.read_bytes()
+    key = hashlib.sha256(
+        f"{SPEC_CACHE_VERSION}:{_package_versions()}:".encode() + content
+    ).hexdigest()
+    cache_path = Path(cache_dir or user_spec_cache_dir()) / f"{key}.json"
+    if use_cache:
+        spec = _read_cached_spec(cache_path)
+        if spec is not None:
+            return spec
+
+    spec = validate_spec(parse_spec(content, path.suffix))
+    if use_cache:
+        try:
+            _write_cached_spec(cache_path, spec)
+        except OSError:
+            # A read-only cache must not stop the program, we simply
+            # validate again next time
+            pass
+    return spec
+
+
+def parse_spec(content: Union[str, bytes], suffix: str = ".json") -> Any:
+    """Parses the content of a spec file, yaml for the .yaml and .yml
+    suffixes and json otherwise"""
+    if suffix.lower() not in YAML_SUFFIXES:
+        return json.loads(content)
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError(
+            "PyYAML is required to load yaml specs, install the yaml extra"
+            " of pulumi-components or use a json spec"
+        ) from None
+    return yaml.safe_load(content)
+
+
+def deploy_spec(spec: StackSpec) -> Dict[str, Dict[str, Any]]:
+    """Creates the components of the spec. Returns them by kind, i-e
+    vpcs, rds_instances and aurora_clusters, keyed by name. Passwords are
+    read from the secret stack config."""
+    from ..components.rds import AuroraCluster, RDSInstance
+    from ..components.vpc import (
+        SubnetTierArgs,
+        Vpc,
+        VpcFlowLogArgs,
+        VpcPeeringArgs,
+        VpcSubnetArgs,
+    )
+
+    config = pulumi.Config()
+    vpcs = {}
+    for vpc in spec.vpcs:
+        options = dict(vpc.options)
+        if options.get("flow_logs") is not None:
+            options["flow_logs"] = VpcFlowLogArgs(**options["flow_logs"])
+        vpcs[vpc.name] = Vpc(
+            vpc.name,
+            cidr=vpc.cidr,
+            public_subnets=[
+                VpcSubnetArgs(**subnet.to_dict())
+                for subnet in vpc.public_subnets
+            ],
+            private_subnets=[
+                VpcSubnetArgs(**subnet.to_dict())
+                for subnet in vpc.private_subnets
+            ],
+            vpc_peering=[
+                # Unset fields keep the defaults of the peering args
+                VpcPeeringArgs(
+                    **{
+                        field: value
+                        for field, value in peering.to_dict().items()
+                        if value is not None
+                    }
+                )
+                for peering in vpc.peerings
+            ],
+            availability_zones=vpc.availability_zones,
+            subnet_tiers=[
+                SubnetTierArgs(**tier.to_dict()) for tier in vpc.subnet_tiers
+            ],
+            **options,
+        )
+
+    rds_instances = {
+        instance.name: RDSInstance(
+            instance.name,
+            vpc_id=vpcs[instance.vpc].vpc.id,
+            subnet_ids=_subnet_ids(vpcs[instance.vpc], instance.subnets),
+            password=config.require_secret(instance.password_config),
+            parameters=[
+                parameter.to_dict() for parameter in instance.parameters
+            ],
+            **instance.options,
+        )
+        for instance in spec.rds_instances
+    }
+    aurora_clusters = {
+        cluster.name: AuroraCluster(
+            cluster.name,
+            vpc_id=vpcs[cluster.vpc].vpc.id,
+            subnet_ids=_subnet_ids(vpcs[cluster.vpc], cluster.subnets),
+            master_password=config.require_secret(cluster.password_config),
+            cluster_parameters=[
+                parameter.to_dict() for parameter in cluster.cluster_parameters
+            ],
+            db_parameters=[
+                parameter.to_dict() for parameter in cluster.db_parameters
+            ],
+            instances=[
+                {"instance_class": instance_class}
+                for instance_class in cluster.instance_classes
+            ],
+            **cluster.options,
+        )
+        for cluster in spec.aurora_clusters
+    }
+    return {
+        "vpcs": vpcs,
+        "rds_instances": rds_instances,
+        "aurora_clusters": aurora_clusters,
+    }
+
+
+def _subnet_ids(vpc, subnets: str) -> list:
+    if subnets == "public":
+        return vpc.public_subnet_ids
+    return vpc.private_subnet_ids
+
+
+@functools.lru_cache(maxsize=None)
+def _package_versions() -> str:
+    """Returns the versions of the packages the validation depends on.
+    A source checkout has no version, SPEC_CACHE_VERSION covers it."""
+    versions = []
+    for package in ("pulumi-components", "pulumi_aws"):
+        try:
+            versions.append(metadata.version(package))
+        except metadata.PackageNotFoundError:
+            versions.append("")
+    return ":".join(versions)
+
+
+def _read_cached_spec(path: Path) -> Optional[StackSpec]:
+    try:
+        return StackSpec.from_dict(
+            json.loads(path.read_text(encoding="utf-8"))
+        )
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_cached_spec(path: Path, spec: StackSpec) -> None:
+    write_atomically(path, json.dumps(spec.to_dict(), separators=(",", ":")))
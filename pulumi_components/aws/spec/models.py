@@ -0,0 +1,146 @@
+"""Typed models of a stack spec.
+
+The models are plain objects with slots. They are only built from specs
+that passed validation, or from the validated form read from the cache,
+so they don't validate their values themselves.
+"""
+from typing import Any, Dict, Mapping, Type
+
+
+class SpecModel:
+    """Base of the spec models. The fields are the slots of the model,
+    and nested models are kept in lists."""
+
+    __slots__ = ()
+    # The fields holding lists of models, mapped to the model
+    _nested: Mapping[str, Type["SpecModel"]] = {}
+
+    def __init__(self, **values: Any) -> None:
+        for field in self.__slots__:
+            setattr(self, field, values.get(field))
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{field}={getattr(self, field)!r}" for field in self.__slots__
+        )
+        return f"{type(self).__name__}({fields})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the json serializable form of the model"""
+        data = {}
+        for field in self.__slots__:
+            value = getattr(self, field)
+            if field in self._nested:
+                value = [item.to_dict() for item in value]
+            data[field] = value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "SpecModel":
+        """Rebuilds a model from its dict form"""
+        values = dict(data)
+        for field, model in cls._nested.items():
+            values[field] = [model.from_dict(item) for item in values[field]]
+        return cls(**values)
+
+
+class SubnetSpec(SpecModel):
+    """A subnet of a vpc given explicitly"""
+
+    __slots__ = ("cidr", "az", "name", "tags")
+
+
+class SubnetTierSpec(SpecModel):
+    """A tier of subnets planned by the vpc, one per availability zone"""
+
+    __slots__ = ("name", "prefix_length", "public", "tags")
+
+
+class PeeringSpec(SpecModel):
+    """A peering of a vpc"""
+
+    __slots__ = (
+        "name",
+        "vpc_id",
+        "accepter",
+        "cidr",
+        "account_id",
+        "aws_profile",
+        "region",
+        "role_arn",
+    )
+
+
+class VpcSpec(SpecModel):
+    """A vpc component, options holds its other keyword arguments"""
+
+    __slots__ = (
+        "name",
+        "cidr",
+        "availability_zones",
+        "public_subnets",
+        "private_subnets",
+        "subnet_tiers",
+        "peerings",
+        "options",
+    )
+    _nested = {
+        "public_subnets": SubnetSpec,
+        "private_subnets": SubnetSpec,
+        "subnet_tiers": SubnetTierSpec,
+        "peerings": PeeringSpec,
+    }
+
+
+class ParameterSpec(SpecModel):
+    """A parameter of an rds parameter group"""
+
+    __slots__ = ("name", "value", "apply_method")
+
+
+class RdsInstanceSpec(SpecModel):
+    """An rds instance component in the subnets of a vpc of the spec. The
+    password is read from the secret stack config key password_config,
+    options holds the other keyword arguments."""
+
+    __slots__ = (
+        "name",
+        "vpc",
+        "subnets",
+        "password_config",
+        "parameters",
+        "options",
+    )
+    _nested = {"parameters": ParameterSpec}
+
+
+class AuroraClusterSpec(SpecModel):
+    """An aurora cluster component in the subnets of a vpc of the spec.
+    The master password is read from the secret stack config key
+    password_config, options holds the other keyword arguments."""
+
+    __slots__ = (
+        "name",
+        "vpc",
+        "subnets",
+        "password_config",
+        "cluster_parameters",
+        "db_parameters",
+        "instance_classes",
+        "options",
+    )
+    _nested = {
+        "cluster_parameters": ParameterSpec,
+        "db_parameters": ParameterSpec,
+    }
+
+
+class StackSpec(SpecModel):
+    """The components of a stack"""
+
+    __slots__ = ("vpcs", "rds_instances", "aurora_clusters")
+    _nested = {
+        "vpcs": VpcSpec,
+        "rds_instances": RdsInstanceSpec,
+        "aurora_clusters": AuroraClusterSpec,
+    }
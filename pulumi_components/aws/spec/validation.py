@@ -0,0 +1,546 @@
+"""Validation of a parsed stack spec into its typed models"""
+import inspect
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+from .exceptions import SpecValidationException
+from .models import (
+    AuroraClusterSpec,
+    ParameterSpec,
+    PeeringSpec,
+    RdsInstanceSpec,
+    StackSpec,
+    SubnetSpec,
+    SubnetTierSpec,
+    VpcSpec,
+)
+
+# The arguments of the components set from the fields of their spec, or
+# that can't be given in a spec, rather than from their options
+VPC_FIELDS = frozenset(
+    (
+        "name",
+        "cidr",
+        "availability_zones",
+        "public_subnets",
+        "private_subnets",
+        "subnet_tiers",
+        "vpc_peering",
+        "ipam",
+        "opts",
+    )
+)
+RDS_INSTANCE_FIELDS = frozenset(
+    ("name", "vpc_id", "subnet_ids", "password", "parameters", "opts")
+)
+AURORA_CLUSTER_FIELDS = frozenset(
+    (
+        "name",
+        "vpc_id",
+        "subnet_ids",
+        "master_password",
+        "cluster_parameters",
+        "db_parameters",
+        "instances",
+        "opts",
+    )
+)
+SUBNET_KINDS = ("private", "public")
+
+
+class _Checker:
+    """Collects the errors of a spec, prefixed with the path of the value
+    in the spec, e.g. ``vpcs[0].cidr``"""
+
+    __slots__ = ("errors",)
+
+    def __init__(self) -> None:
+        self.errors: List[str] = []
+
+    def error(self, path: str, message: str) -> None:
+        self.errors.append(f"{path}: {message}")
+
+    def raise_errors(self) -> None:
+        """Raises SpecValidationException listing the errors, if any"""
+        if self.errors:
+            raise SpecValidationException(
+                "Invalid spec:\n"
+                + "\n".join(f"  {error}" for error in self.errors)
+            )
+
+    def fields(
+        self,
+        value: Any,
+        path: str,
+        required: Sequence[str] = (),
+        optional: Sequence[str] = (),
+    ) -> Optional[Dict[str, Any]]:
+        """Returns the mapping with its optional fields defaulting to None,
+        or None if it isn't a mapping with the given fields"""
+        if not isinstance(value, Mapping):
+            self.error(path, "must be a mapping")
+            return None
+        valid = True
+        for key in value:
+            if key not in required and key not in optional:
+                self.error(f"{path}.{key}", "unknown field")
+                valid = False
+        for key in required:
+            if value.get(key) is None:
+                self.error(f"{path}.{key}", "is required")
+                valid = False
+        if not valid:
+            return None
+        return {key: value.get(key) for key in (*required, *optional)}
+
+    def typed(self, value: Any, kind: type, path: str, default=None) -> Any:
+        """Returns the value if of the given type, the default if None"""
+        if value is None:
+            return default
+        # Booleans are integers in python, but not in a spec
+        if not isinstance(value, kind) or (
+            kind is int and isinstance(value, bool)
+        ):
+            self.error(path, f"must be a {kind.__name__}")
+            return default
+        return value
+
+    def strings(self, value: Any, path: str) -> Optional[List[str]]:
+        if value is None:
+            return None
+        if not isinstance(value, list) or not all(
+            isinstance(item, str) for item in value
+        ):
+            self.error(path, "must be a list of strings")
+            return None
+        return list(value)
+
+    def tags(self, value: Any, path: str) -> Optional[Dict[str, str]]:
+        if value is None:
+            return None
+        if not isinstance(value, Mapping) or not all(
+            isinstance(key, str) and _is_scalar(item)
+            for key, item in value.items()
+        ):
+            self.error(path, "must map tag keys to values")
+            return None
+        return {key: str(item) for key, item in value.items()}
+
+    def items(
+        self, value: Any, path: str, build: Callable[[Any, str], Any]
+    ) -> list:
+        """Returns the items of the list built by build, skipping the
+        invalid ones"""
+        if value is None:
+            return []
+        if not isinstance(value, list):
+            self.error(path, "must be a list")
+            return []
+        built = (build(item, f"{path}[{i}]") for i, item in enumerate(value))
+        return [item for item in built if item is not None]
+
+    def unique(self, models: Sequence[Any], path: str) -> None:
+        names = set()
+        for model in models:
+            if model.name in names:
+                self.error(path, f"{model.name} is defined more than once")
+            names.add(model.name)
+
+    def options(
+        self,
+        value: Any,
+        path: str,
+        component: Callable,
+        fields: frozenset,
+        nested: Optional[Mapping[str, Callable]] = None,
+    ) -> Dict[str, Any]:
+        """Returns the options given as keyword arguments to the component,
+        checked against the signature of the component"""
+        if value is None:
+            value = {}
+        if not isinstance(value, Mapping):
+            self.error(path, "must be a mapping")
+            return {}
+        parameters = _keyword_parameters(component)
+        for key, item in value.items():
+            if key in fields or key not in parameters:
+                self.error(f"{path}.{key}", "unknown option")
+            elif not _is_plain(item):
+                self.error(f"{path}.{key}", "must be a plain value")
+            elif nested and key in nested:
+                self.options(
+                    item, f"{path}.{key}", nested[key], frozenset()
+                )
+        for key, parameter in parameters.items():
+            if (
+                parameter.default is inspect.Parameter.empty
+                and key not in fields
+                and key not in value
+            ):
+                self.error(f"{path}.{key}", "is required")
+        return dict(value)
+
+
+def validate_spec(data: Any) -> StackSpec:
+    """Validates a parsed spec and returns its typed models. Raises
+    SpecValidationException listing all the errors of the spec."""
+    checker = _Checker()
+    spec = checker.fields(
+        data, "spec", optional=("vpcs", "rds_instances", "aurora_clusters")
+    )
+    if spec is None:
+        checker.raise_errors()
+    vpcs = checker.items(
+        spec["vpcs"], "vpcs", lambda item, path: _vpc(checker, item, path)
+    )
+    checker.unique(vpcs, "vpcs")
+    # Invalid vpcs are referenced by name as well, they are reported once
+    vpc_names = frozenset(
+        vpc.get("name")
+        for vpc in spec["vpcs"] or []
+        if isinstance(vpc, Mapping)
+    )
+    rds_instances = checker.items(
+        spec["rds_instances"],
+        "rds_instances",
+        lambda item, path: _rds_instance(checker, item, path, vpc_names),
+    )
+    checker.unique(rds_instances, "rds_instances")
+    aurora_clusters = checker.items(
+        spec["aurora_clusters"],
+        "aurora_clusters",
+        lambda item, path: _aurora_cluster(checker, item, path, vpc_names),
+    )
+    checker.unique(aurora_clusters, "aurora_clusters")
+    checker.raise_errors()
+    return StackSpec(
+        vpcs=vpcs, rds_instances=rds_instances, aurora_clusters=aurora_clusters
+    )
+
+
+def _vpc(checker: _Checker, data: Any, path: str) -> Optional[VpcSpec]:
+    from ..components.vpc import SubnetTierArgs, VpcFlowLogArgs
+    from ..components.vpc.planner import plan_subnets
+    from ..components.vpc.validation import (
+        validate_subnet_names,
+        validate_vpc_cidrs,
+    )
+    from ..components.vpc.vpc import Vpc
+
+    fields = checker.fields(
+        data,
+        path,
+        required=("name", "cidr"),
+        optional=(
+            "availability_zones",
+            "public_subnets",
+            "private_subnets",
+            "subnet_tiers",
+            "peerings",
+            "options",
+        ),
+    )
+    if fields is None:
+        return None
+    errors = len(checker.errors)
+    vpc = VpcSpec(
+        name=checker.typed(fields["name"], str, f"{path}.name"),
+        cidr=checker.typed(fields["cidr"], str, f"{path}.cidr"),
+        availability_zones=checker.strings(
+            fields["availability_zones"], f"{path}.availability_zones"
+        ),
+        public_subnets=checker.items(
+            fields["public_subnets"],
+            f"{path}.public_subnets",
+            lambda item, item_path: _subnet(checker, item, item_path),
+        ),
+        private_subnets=checker.items(
+            fields["private_subnets"],
+            f"{path}.private_subnets",
+            lambda item, item_path: _subnet(checker, item, item_path),
+        ),
+        subnet_tiers=checker.items(
+            fields["subnet_tiers"],
+            f"{path}.subnet_tiers",
+            lambda item, item_path: _subnet_tier(checker, item, item_path),
+        ),
+        peerings=checker.items(
+            fields["peerings"],
+            f"{path}.peerings",
+            lambda item, item_path: _peering(checker, item, item_path),
+        ),
+        options=checker.options(
+            fields["options"],
+            f"{path}.options",
+            Vpc,
+            VPC_FIELDS,
+            nested={"flow_logs": VpcFlowLogArgs},
+        ),
+    )
+    checker.unique(vpc.peerings, f"{path}.peerings")
+    if len(checker.errors) > errors:
+        return None
+
+    # Check the cidrs the same way the component does, but for the cidr
+    # registry whose content may change while the spec doesn't
+    subnets = [
+        (f"{subnet.az}-{subnet.name or label}", subnet.cidr)
+        for label, kind_subnets in (
+            ("public", vpc.public_subnets),
+            ("private", vpc.private_subnets),
+        )
+        for subnet in kind_subnets
+    ]
+    try:
+        if vpc.subnet_tiers:
+            planned = plan_subnets(
+                vpc.cidr,
+                vpc.availability_zones or [],
+                [
+                    SubnetTierArgs(
+                        name=tier.name,
+                        prefix_length=tier.prefix_length,
+                        public=tier.public,
+                    )
+                    for tier in vpc.subnet_tiers
+                ],
+                reserved=[cidr for _, cidr in subnets],
+            )
+            subnets.extend(
+                (f"{subnet.az}-{tier}", subnet.cidr)
+                for tier, tier_subnets in planned.items()
+                for subnet in tier_subnets
+            )
+        validate_subnet_names(label for label, _ in subnets)
+        validate_vpc_cidrs(
+            vpc.name,
+            vpc.cidr,
+            subnets=subnets,
+            peerings=[
+                (peering.name, peering.cidr)
+                for peering in vpc.peerings
+                if peering.cidr
+            ],
+        )
+    except ValueError as exc:
+        checker.error(path, str(exc))
+        return None
+    return vpc
+
+
+def _subnet(checker: _Checker, data: Any, path: str) -> Optional[SubnetSpec]:
+    fields = checker.fields(
+        data, path, required=("cidr", "az"), optional=("name", "tags")
+    )
+    if fields is None:
+        return None
+    return SubnetSpec(
+        cidr=checker.typed(fields["cidr"], str, f"{path}.cidr"),
+        az=checker.typed(fields["az"], str, f"{path}.az"),
+        name=checker.typed(fields["name"], str, f"{path}.name"),
+        tags=checker.tags(fields["tags"], f"{path}.tags"),
+    )
+
+
+def _subnet_tier(
+    checker: _Checker, data: Any, path: str
+) -> Optional[SubnetTierSpec]:
+    fields = checker.fields(
+        data,
+        path,
+        required=("name", "prefix_length"),
+        optional=("public", "tags"),
+    )
+    if fields is None:
+        return None
+    return SubnetTierSpec(
+        name=checker.typed(fields["name"], str, f"{path}.name"),
+        prefix_length=checker.typed(
+            fields["prefix_length"], int, f"{path}.prefix_length"
+        ),
+        public=checker.typed(fields["public"], bool, f"{path}.public", False),
+        tags=checker.tags(fields["tags"], f"{path}.tags"),
+    )
+
+
+def _peering(checker: _Checker, data: Any, path: str) -> Optional[PeeringSpec]:
+    fields = checker.fields(
+        data,
+        path,
+        required=("name", "vpc_id"),
+        optional=(
+            "accepter",
+            "cidr",
+            "account_id",
+            "aws_profile",
+            "region",
+            "role_arn",
+        ),
+    )
+    if fields is None:
+        return None
+    peering = PeeringSpec(
+        accepter=checker.typed(
+            fields["accepter"], bool, f"{path}.accepter", False
+        ),
+        **{
+            key: checker.typed(value, str, f"{path}.{key}")
+            for key, value in fields.items()
+            if key != "accepter"
+        },
+    )
+    if peering.accepter and (peering.account_id or peering.cidr):
+        checker.error(
+            path, "an accepter peering takes neither account_id nor cidr"
+        )
+    return peering
+
+
+def _parameter(
+    checker: _Checker, data: Any, path: str
+) -> Optional[ParameterSpec]:
+    fields = checker.fields(
+        data, path, required=("name", "value"), optional=("apply_method",)
+    )
+    if fields is None:
+        return None
+    if not _is_scalar(fields["value"]):
+        checker.error(f"{path}.value", "must be a string or a number")
+    return ParameterSpec(
+        name=checker.typed(fields["name"], str, f"{path}.name"),
+        value=str(fields["value"]),
+        apply_method=checker.typed(
+            fields["apply_method"],
+            str,
+            f"{path}.apply_method",
+            "pending-reboot",
+        ),
+    )
+
+
+def _database_fields(
+    checker: _Checker,
+    fields: Dict[str, Any],
+    path: str,
+    vpc_names: frozenset,
+) -> Dict[str, Any]:
+    """Returns the fields shared by the rds instances and clusters"""
+    vpc = checker.typed(fields["vpc"], str, f"{path}.vpc")
+    if vpc is not None and vpc not in vpc_names:
+        checker.error(f"{path}.vpc", f"no vpc named {vpc} in the spec")
+    subnets = checker.typed(
+        fields["subnets"], str, f"{path}.subnets", "private"
+    )
+    if subnets not in SUBNET_KINDS:
+        checker.error(f"{path}.subnets", "must be private or public")
+    return {
+        "name": checker.typed(fields["name"], str, f"{path}.name"),
+        "vpc": vpc,
+        "subnets": subnets,
+        "password_config": checker.typed(
+            fields["password_config"], str, f"{path}.password_config"
+        ),
+    }
+
+
+def _rds_instance(
+    checker: _Checker, data: Any, path: str, vpc_names: frozenset
+) -> Optional[RdsInstanceSpec]:
+    from ..components.rds.rds import RDSInstance
+
+    fields = checker.fields(
+        data,
+        path,
+        required=("name", "vpc", "password_config"),
+        optional=("subnets", "parameters", "options"),
+    )
+    if fields is None:
+        return None
+    return RdsInstanceSpec(
+        **_database_fields(checker, fields, path, vpc_names),
+        parameters=checker.items(
+            fields["parameters"],
+            f"{path}.parameters",
+            lambda item, item_path: _parameter(checker, item, item_path),
+        ),
+        options=checker.options(
+            fields["options"],
+            f"{path}.options",
+            RDSInstance,
+            RDS_INSTANCE_FIELDS,
+        ),
+    )
+
+
+def _aurora_cluster(
+    checker: _Checker, data: Any, path: str, vpc_names: frozenset
+) -> Optional[AuroraClusterSpec]:
+    from ..components.rds.aurora import AuroraCluster
+
+    fields = checker.fields(
+        data,
+        path,
+        required=("name", "vpc", "password_config", "instance_classes"),
+        optional=(
+            "subnets",
+            "cluster_parameters",
+            "db_parameters",
+            "options",
+        ),
+    )
+    if fields is None:
+        return None
+    instance_classes = checker.strings(
+        fields["instance_classes"], f"{path}.instance_classes"
+    )
+    if instance_classes == []:
+        checker.error(f"{path}.instance_classes", "must not be empty")
+    return AuroraClusterSpec(
+        **_database_fields(checker, fields, path, vpc_names),
+        cluster_parameters=checker.items(
+            fields["cluster_parameters"],
+            f"{path}.cluster_parameters",
+            lambda item, item_path: _parameter(checker, item, item_path),
+        ),
+        db_parameters=checker.items(
+            fields["db_parameters"],
+            f"{path}.db_parameters",
+            lambda item, item_path: _parameter(checker, item, item_path),
+        ),
+        instance_classes=instance_classes,
+        options=checker.options(
+            fields["options"],
+            f"{path}.options",
+            AuroraCluster,
+            AURORA_CLUSTER_FIELDS,
+        ),
+    )
+
+
+def _keyword_parameters(component: Callable) -> Dict[str, inspect.Parameter]:
+    return {
+        name: parameter
+        for name, parameter in inspect.signature(component).parameters.items()
+        if parameter.kind
+        in (
+            inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            inspect.Parameter.KEYWORD_ONLY,
+        )
+    }
+
+
+def _is_scalar(value: Any) -> bool:
+    return isinstance(value, (str, int, float, bool))
+
+
+def _is_plain(value: Any) -> bool:
+    """Returns true if the value can be stored as json"""
+    if value is None or _is_scalar(value):
+        return True
+    if isinstance(value, list):
+        return all(map(_is_plain, value))
+    if isinstance(value, Mapping):
+        return all(
+            isinstance(key, str) and _is_plain(item)
+            for key, item in value.items()
+        )
+    return False
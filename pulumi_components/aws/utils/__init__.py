@@ -1,3 +1,18 @@
-from .tagger import register_tags
+from typing import TYPE_CHECKING
 
-__all__ = ["register_tags"]
+from ..._utilities import lazy_exports
+
+if TYPE_CHECKING:
+    from .policy import TagPolicy, TagRule
+    from .tagger import register_tags
+
+__all__ = ["register_tags", "TagPolicy", "TagRule"]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "register_tags": ".tagger",
+        "TagPolicy": ".policy",
+        "TagRule": ".policy",
+    },
+)
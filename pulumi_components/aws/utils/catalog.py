@@ -0,0 +1,141 @@
+"""Catalog of the taggable resource types in the installed pulumi-aws.
+
+The catalog is generated by scanning the sources of the installed
+``pulumi_aws`` package for resources that accept a ``tags`` input. It is
+written to a compact json file keyed by the pulumi-aws version, so the
+package is only scanned once per version and not on every ``pulumi up``.
+
+Catalogs shipped with this library live in the ``catalogs`` folder next
+to this module. Catalogs for other versions are generated on first use
+and cached in the user's cache directory. To (re)generate the catalog
+of the installed version run:
+
+    python -m pulumi_components.aws.utils.catalog [output-dir]
+"""
+import json
+import re
+import sys
+from importlib import metadata, util
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional
+
+from ..._utilities import user_cache_dir, write_atomically
+
+PACKAGED_CATALOG_DIR = Path(__file__).parent / "catalogs"
+
+_RESOURCE_TOKEN = re.compile(r"__init__\(\s*'(aws:[^']+)'")
+_INTERNAL_INIT = re.compile(
+    r"def _internal_init\(.*?(?=\n    @staticmethod|\n    def get\(|\Z)",
+    re.DOTALL,
+)
+_TAGS_INPUT = '__props__.__dict__["tags"] = tags'
+
+
+def pulumi_aws_version() -> Optional[str]:
+    """Returns the version of the installed pulumi-aws package"""
+    try:
+        return metadata.version("pulumi_aws")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def user_catalog_dir() -> Path:
+    """Returns the folder where generated catalogs are cached"""
+    return user_cache_dir("catalogs")
+
+
+def catalog_file_name(version: str) -> str:
+    return f"pulumi-aws-{version}.json"
+
+
+def generate_catalog() -> Dict[str, List[str]]:
+    """Scans the installed pulumi_aws package and returns the taggable
+    resource types grouped by module, e.g. ``{"aws:ec2": ["vpc:Vpc"]}``.
+
+    The sources are scanned rather than imported, importing every
+    pulumi_aws module would take minutes."""
+    spec = util.find_spec("pulumi_aws")
+    if spec is None or not spec.submodule_search_locations:
+        raise ModuleNotFoundError("pulumi_aws is not installed")
+    package_dir = Path(list(spec.submodule_search_locations)[0])
+
+    catalog: Dict[str, List[str]] = {}
+    for source in sorted(package_dir.glob("*/*.py")):
+        if source.name.startswith(("_", "get_")):
+            continue
+        text = source.read_text(encoding="utf-8")
+        internal_init = _INTERNAL_INIT.search(text)
+        if not internal_init or _TAGS_INPUT not in internal_init.group():
+            continue
+        token = _RESOURCE_TOKEN.search(text, internal_init.start())
+        if not token:
+            continue
+        module, _, resource = token.group(1).partition("/")
+        catalog.setdefault(module, []).append(resource)
+    return {module: sorted(types) for module, types in sorted(catalog.items())}
+
+
+def write_catalog(
+    version: str, catalog: Dict[str, List[str]], directory: Path
+) -> Path:
+    """Writes the catalog for the given pulumi-aws version to directory"""
+    path = directory / catalog_file_name(version)
+    write_atomically(
+        path,
+        json.dumps(
+            {"pulumi_aws": version, "types": catalog},
+            separators=(",", ":"),
+        ),
+    )
+    return path
+
+
+def _read_catalog(path: Path) -> Optional[Dict[str, List[str]]]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))["types"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def load_catalog(version: Optional[str] = None) -> FrozenSet[str]:
+    """Returns the taggable resource types of the given (by default the
+    installed) pulumi-aws version. The catalog is generated and cached
+    when none exists for that version yet. Returns an empty set when
+    pulumi_aws is not installed."""
+    version = version or pulumi_aws_version()
+    if version is None:
+        return frozenset()
+
+    file_name = catalog_file_name(version)
+    catalog = None
+    for directory in (PACKAGED_CATALOG_DIR, user_catalog_dir()):
+        catalog = _read_catalog(directory / file_name)
+        if catalog is not None:
+            break
+    if catalog is None:
+        if version != pulumi_aws_version():
+            return frozenset()
+        catalog = generate_catalog()
+        try:
+            write_catalog(version, catalog, user_catalog_dir())
+        except OSError:
+            # A read-only home must not stop the program, we simply
+            # scan again next time
+            pass
+
+    return frozenset(
+        f"{module}/{resource}"
+        for module, resources in catalog.items()
+        for resource in resources
+    )
+
+
+if __name__ == "__main__":
+    installed_version = pulumi_aws_version()
+    if installed_version is None:
+        sys.exit("pulumi_aws is not installed")
+    output_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else user_catalog_dir()
+    catalog_path = write_catalog(
+        installed_version, generate_catalog(), output_dir
+    )
+    print(f"catalog for pulumi-aws {installed_version} written to {catalog_path}")  # noqa E501
@@ -0,0 +1,138 @@
+"""Invokes and resource reads memoized for the program run.
+
+Lookups such as the caller identity are network round trips. Components
+that repeat them, e.g. once per vpc peering, go through these helpers so
+every lookup is made once per provider. The invokes are made in their
+output form, so they don't block the program while they resolve. A
+pulumi program runs once per process, so the cache lives as long as the
+module.
+"""
+import functools
+from importlib import metadata
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional
+
+import pulumi
+import pulumi_aws as aws
+
+from ..._utilities import camel_case
+
+_results: Dict[Hashable, Any] = {}
+
+
+def memoize(key: Hashable, lookup: Callable[[], Any]) -> Any:
+    """Returns the result of lookup, which is only called the first time
+    the key is seen in the program run"""
+    try:
+        return _results[key]
+    except KeyError:
+        result = _results[key] = lookup()
+        return result
+
+
+def clear() -> None:
+    """Forgets all the memoized results"""
+    _results.clear()
+
+
+def get_caller_identity_output(
+    provider: Optional[pulumi.ProviderResource] = None,
+) -> pulumi.Output[aws.GetCallerIdentityResult]:
+    """Returns the caller identity of the provider, the default provider
+    when none is given"""
+    return memoize(
+        ("get_caller_identity", provider),
+        lambda: _invoke_output(
+            "aws:index/getCallerIdentity:getCallerIdentity",
+            {},
+            aws.GetCallerIdentityResult,
+            lambda opts: aws.get_caller_identity(opts=opts),
+            provider,
+        ),
+    )
+
+
+def get_region_output(
+    provider: Optional[pulumi.ProviderResource] = None,
+) -> pulumi.Output[aws.GetRegionResult]:
+    """Returns the region of the provider, the default provider when none
+    is given"""
+    return memoize(
+        ("get_region", provider),
+        lambda: _invoke_output(
+            "aws:index/getRegion:getRegion",
+            {},
+            aws.GetRegionResult,
+            lambda opts: aws.get_region(opts=opts),
+            provider,
+        ),
+    )
+
+
+def get_vpc(
+    resource_name: str,
+    vpc_id: pulumi.Input[str],
+    provider: Optional[pulumi.ProviderResource] = None,
+    parent: Optional[pulumi.Resource] = None,
+) -> aws.ec2.Vpc:
+    """Returns the existing vpc with the given id read through the
+    provider. The resource name and parent of the first read are kept."""
+    return memoize(
+        ("get_vpc", provider, vpc_id),
+        lambda: aws.ec2.Vpc.get(
+            resource_name,
+            id=vpc_id,
+            opts=pulumi.ResourceOptions(parent=parent, provider=provider),
+        ),
+    )
+
+
+def get_vpc_peering_connection_output(
+    provider: Optional[pulumi.ProviderResource] = None,
+    **filters: pulumi.Input[str],
+) -> pulumi.Output[aws.ec2.GetVpcPeeringConnectionResult]:
+    """Returns the vpc peering connection matching the filters, e.g.
+    vpc_id and peer_vpc_id, looked up through the provider"""
+    return memoize(
+        (
+            "get_vpc_peering_connection",
+            provider,
+            tuple(sorted(filters.items())),
+        ),
+        lambda: _invoke_output(
+            "aws:ec2/getVpcPeeringConnection:getVpcPeeringConnection",
+            {camel_case(key): value for key, value in filters.items()},
+            aws.ec2.GetVpcPeeringConnectionResult,
+            lambda opts: aws.ec2.get_vpc_peering_connection_output(
+                **filters, opts=opts
+            ),
+            provider,
+        ),
+    )
+
+
+def _invoke_output(
+    token: str,
+    args: Mapping[str, Any],
+    typ: type,
+    fallback: Callable[[pulumi.InvokeOptions], Any],
+    provider: Optional[pulumi.ProviderResource],
+) -> pulumi.Output:
+    """Invokes the function in its output form.
+
+    The output form of pulumi_aws 5 calls the blocking invoke in an apply,
+    which pumps the event loop from within the apply. Many such invokes
+    pending at once nest deeper and deeper until the recursion limit is
+    hit. The runtime invokes the function asynchronously when it supports
+    it. Older runtimes make the invoke of pulumi_aws given as fallback,
+    as the components did before."""
+    # Pin the version of the aws plugin to the one of the sdk, as the
+    # pulumi_aws invoke functions do
+    opts = pulumi.InvokeOptions(provider=provider, version=_aws_version())
+    if hasattr(pulumi.runtime, "invoke_output"):
+        return pulumi.runtime.invoke_output(token, args, opts=opts, typ=typ)
+    return pulumi.Output.from_input(fallback(opts))
+
+
+@functools.lru_cache(maxsize=None)
+def _aws_version() -> str:
+    return metadata.version("pulumi_aws")
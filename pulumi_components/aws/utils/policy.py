@@ -0,0 +1,132 @@
+"""Tag policies adding tags to, or skipping, resources by type and name"""
+import re
+from inspect import isawaitable
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Sequence, Tuple, Union
+
+import pulumi
+
+
+class TagRule:
+    """A rule of a tag policy.
+
+    The rule applies to resources matching one of its type patterns and,
+    if given, whose name fully matches the name regex. A type pattern is
+    either an exact type (``aws:ec2/eip:Eip``), a whole module
+    (``aws:rds/*``) or all resources (``*``). The rule either adds its
+    tags to the matched resources or, with skip set, leaves them
+    untagged."""
+
+    __slots__ = ("types", "name", "tags", "skip")
+
+    def __init__(
+        self,
+        types: Union[str, Sequence[str]] = "*",
+        *,
+        name: Optional[str] = None,
+        tags: Optional[Mapping[str, pulumi.Input[str]]] = None,
+        skip: bool = False,
+    ) -> None:
+        if not tags and not skip:
+            raise ValueError("A tag rule must either add tags or skip")
+        if tags and skip:
+            raise ValueError("A tag rule can't add tags and skip")
+        self.types = (types,) if isinstance(types, str) else tuple(types)
+        self.name = re.compile(name) if name else None
+        self.tags = _validate_tags(tags or {}, "rule tags")
+        self.skip = skip
+
+
+class TagPolicy:
+    """An ordered list of tag rules. Later rules override the tags of
+    earlier ones and a matching skip rule wins over all tags."""
+
+    def __init__(self, rules: Sequence[TagRule]) -> None:
+        self.rules = tuple(rules)
+
+    def compile(self, tags: Mapping[str, str]) -> "CompiledTagPolicy":
+        """Compiles the policy on top of the given base tags"""
+        return CompiledTagPolicy(self.rules, tags)
+
+
+class CompiledTagPolicy:
+    """A tag policy compiled into a decision table.
+
+    The rules are indexed by exact type, by module and for all resources.
+    The candidate rules of a type are resolved once, and the merged tags
+    are memoized per set of matching rules, so the per-resource cost
+    doesn't grow with the number of rules."""
+
+    __slots__ = ("_tags", "_rules", "_index", "_candidates", "_merged")
+
+    def __init__(
+        self, rules: Sequence[TagRule], tags: Mapping[str, str]
+    ) -> None:
+        self._tags = tags
+        self._rules = tuple(rules)
+        self._index: Dict[str, Tuple[int, ...]] = {}
+        for position, rule in enumerate(self._rules):
+            for pattern in rule.types:
+                key = pattern[:-2] if pattern.endswith("/*") else pattern
+                self._index[key] = self._index.get(key, ()) + (position,)
+        self._candidates: Dict[str, Tuple[int, ...]] = {}
+        self._merged: Dict[Tuple[int, ...], Optional[Mapping[str, str]]] = {}
+
+    def resolve(self, type_: str, name: str) -> Optional[Mapping[str, str]]:
+        """Returns the tags of the resource, None if it must be skipped"""
+        candidates = self._candidates.get(type_)
+        if candidates is None:
+            candidates = self._candidates_of(type_)
+        matched = tuple(
+            position
+            for position in candidates
+            if self._rules[position].name is None
+            or self._rules[position].name.fullmatch(name)
+        )
+        try:
+            return self._merged[matched]
+        except KeyError:
+            merged = self._merged[matched] = self._merge(matched)
+            return merged
+
+    def _candidates_of(self, type_: str) -> Tuple[int, ...]:
+        module = type_.partition("/")[0]
+        candidates = tuple(
+            sorted(
+                {
+                    *self._index.get(type_, ()),
+                    *self._index.get(module, ()),
+                    *self._index.get("*", ()),
+                }
+            )
+        )
+        self._candidates[type_] = candidates
+        return candidates
+
+    def _merge(self, matched: Tuple[int, ...]) -> Optional[Mapping[str, str]]:
+        merged = dict(self._tags)
+        for position in matched:
+            rule = self._rules[position]
+            if rule.skip:
+                return None
+            merged.update(rule.tags)
+        return MappingProxyType(merged)
+
+
+def _validate_tags(tags, source: str) -> Mapping[str, pulumi.Input[str]]:
+    """Validates and returns a read only copy of the tags. Plain values
+    are converted to strings, values only known later such as Outputs
+    are kept as they are."""
+    if not isinstance(tags, Mapping):
+        raise ValueError(f"{source} must be a mapping of tag keys to values")
+    validated = {}
+    for key, value in tags.items():
+        if not isinstance(key, str) or not key:
+            raise ValueError(f"{source} has an invalid tag key {key!r}")
+        if isinstance(value, (dict, list)) or value is None:
+            raise ValueError(f"{source} has an invalid value for tag {key}")
+        if isinstance(value, pulumi.Output) or isawaitable(value):
+            validated[key] = value
+        else:
+            validated[key] = str(value)
+    return MappingProxyType(validated)
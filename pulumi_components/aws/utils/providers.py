@@ -0,0 +1,60 @@
+"""Aws providers shared for the program run.
+
+Every provider is a separate plugin configuration resolving its own
+credentials. Components that need a provider for another profile, region
+or role, e.g. to read the remote vpc of a peering, get it from this pool
+so there is one provider per profile, region and role across all the
+components of the program.
+"""
+import hashlib
+import json
+from typing import Dict, Optional, Tuple
+
+import pulumi
+import pulumi_aws as aws
+
+_providers: Dict[Tuple[Optional[str], ...], aws.Provider] = {}
+
+
+def get_provider(
+    profile: Optional[str] = None,
+    region: Optional[str] = None,
+    role_arn: Optional[str] = None,
+) -> aws.Provider:
+    """Returns the provider of the profile, region and role, which is
+    only created the first time they are asked for. The region defaults
+    to the region of the stack."""
+    region = region or pulumi.Config("aws").get("region")
+    key = (profile, region, role_arn)
+    try:
+        return _providers[key]
+    except KeyError:
+        provider = _providers[key] = aws.Provider(
+            _provider_name(profile, region, role_arn),
+            profile=profile,
+            region=region,
+            assume_role=aws.ProviderAssumeRoleArgs(role_arn=role_arn)
+            if role_arn
+            else None,
+            skip_metadata_api_check=False,
+        )
+        return provider
+
+
+def clear() -> None:
+    """Forgets all the providers of the pool"""
+    _providers.clear()
+
+
+def _provider_name(
+    profile: Optional[str], region: Optional[str], role_arn: Optional[str]
+) -> str:
+    # The profile and region keep the name readable, the hash of the whole
+    # key keeps it unique, as profiles and regions may hold hyphens and
+    # arns hold characters that don't belong in resource names
+    digest = hashlib.sha1(
+        json.dumps([profile, region, role_arn]).encode()
+    ).hexdigest()[:8]
+    return "-".join(
+        [profile or "default", region or "default", digest, "remote-provider"]
+    )
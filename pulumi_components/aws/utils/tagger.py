@@ -1,66 +1,347 @@
+import functools
+from inspect import isawaitable
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple, Union
+
 import pulumi
 import pulumi_aws as aws
 
-conf = pulumi.Config()
-project_tags = conf.get_object("tags")
+from ..._utilities import camel_case
+from .catalog import load_catalog
+from .policy import CompiledTagPolicy, TagPolicy, _validate_tags
+
+AUTOSCALING_GROUP = "aws:autoscaling/group:Group"
+DEFAULT_TAGS_CONFIG = "tags"
+
+TagSource = Union[Mapping[str, str], str, None]
+
+# Settings of the default aws provider in the aws namespace of the stack
+# config, grouped by the config getter of their type
+PROVIDER_CONFIG = {
+    "get": (
+        "custom_ca_bundle",
+        "ec2_metadata_service_endpoint",
+        "ec2_metadata_service_endpoint_mode",
+        "http_proxy",
+        "profile",
+        "region",
+        "shared_credentials_file",
+        "sts_region",
+    ),
+    "get_secret": ("access_key", "secret_key", "token"),
+    "get_bool": (
+        "insecure",
+        "s3_force_path_style",
+        "s3_use_path_style",
+        "skip_credentials_validation",
+        "skip_get_ec2_platforms",
+        "skip_metadata_api_check",
+        "skip_region_validation",
+        "skip_requesting_account_id",
+        "use_dualstack_endpoint",
+        "use_fips_endpoint",
+    ),
+    "get_int": ("max_retries",),
+    "get_object": (
+        "allowed_account_ids",
+        "assume_role",
+        "assume_role_with_web_identity",
+        "default_tags",
+        "endpoints",
+        "forbidden_account_ids",
+        "ignore_tags",
+        "shared_config_files",
+        "shared_credentials_files",
+    ),
+}
+
+
+def register_tags(
+    tags: TagSource = None,
+    use_default_tags: bool = False,
+    policy: Optional[TagPolicy] = None,
+) -> None:
+    """Register tags with taggable resource.
+
+    The tags are read from the stack config key ``tags`` unless another
+    source is given, either a dict of tags or a stack config path such
+    as ``"tags"`` or ``"my-namespace:tags"``.
 
+    By default the tags are added to every taggable resource by a stack
+    transformation. When use_default_tags is set, the tags are instead
+    set as the default_tags of a shared aws provider that is used by all
+    aws resources without an explicit provider. The transformation then
+    only adds the Name tag, and the tags of autoscaling groups which
+    default_tags do not cover.
 
-def register_tags() -> None:
-    """Register tags with taggable resource"""
+    A tag policy adds tags to, or skips, resources by type and name on
+    top of the tags. Resources skipped by the policy still get the
+    default_tags of the provider."""
+    project_tags = load_tags(tags)
+    if not use_default_tags:
+        if policy is None:
+            pulumi.runtime.register_stack_transformation(
+                lambda args: _tag_resource(args, project_tags)
+            )
+        else:
+            compiled_policy = policy.compile(project_tags)
+            pulumi.runtime.register_stack_transformation(
+                lambda args: _tag_resource_with_policy(args, compiled_policy)
+            )
+        return
+
+    # An explicit provider doesn't read the aws config of the stack, it
+    # gets the settings the default provider would use
+    provider_args = default_provider_args()
+    config_tags = (provider_args.pop("default_tags", None) or {}).get(
+        "tags", {}
+    )
+    default_provider = aws.Provider(
+        "default-tags-provider",
+        default_tags=aws.ProviderDefaultTagsArgs(
+            tags={**config_tags, **project_tags}
+        ),
+        **provider_args,
+    )
+    # The provider carries the project tags, the policy only adds its own
+    compiled_policy = policy.compile({}) if policy else None
     pulumi.runtime.register_stack_transformation(
-        lambda args: _tag_resource(args, project_tags)
+        lambda args: _tag_resource_with_default_tags(
+            args, project_tags, default_provider, compiled_policy
+        )
     )
 
 
+def load_tags(source: TagSource = None) -> Mapping[str, str]:
+    """Returns the validated tags of the given source. Tags read from the
+    stack config are resolved on first use and memoized, so importing
+    this module doesn't touch the pulumi runtime."""
+    if source is None:
+        source = DEFAULT_TAGS_CONFIG
+    if isinstance(source, str):
+        return _load_config_tags(source)
+    return _validate_tags(source, "tags")
+
+
+def default_provider_args() -> Dict[str, Any]:
+    """Returns the arguments of the default aws provider set in the aws
+    namespace of the stack config, e.g. aws:region or aws:assumeRole"""
+    config = pulumi.Config("aws")
+    args = {}
+    for getter, names in PROVIDER_CONFIG.items():
+        for name in names:
+            value = getattr(config, getter)(camel_case(name))
+            if value is not None:
+                args[name] = value
+    return args
+
+
+@functools.lru_cache(maxsize=None)
+def _load_config_tags(path: str) -> Mapping[str, str]:
+    """Reads the tags from the stack config path [namespace:]key"""
+    namespace, _, key = path.rpartition(":")
+    tags = pulumi.Config(namespace or None).get_object(key)
+    if tags is None:
+        pulumi.log.warn(f"No tags defined in the stack config {path}")
+        return MappingProxyType({})
+    return _validate_tags(tags, path)
+
+
+def _tag_resource_with_policy(
+    args, policy: CompiledTagPolicy
+) -> Optional[pulumi.ResourceTransformationResult]:
+    """helper function to add the tags resolved by the policy"""
+    if not can_be_tagged(args.type_):
+        return None
+    tags = policy.resolve(args.type_, args.name)
+    if tags is None:
+        return None
+    return _tag_resource(args, tags)
+
+
+def _tag_resource_with_default_tags(
+    args,
+    tags,
+    provider: aws.Provider,
+    policy: Optional[CompiledTagPolicy] = None,
+) -> Optional[pulumi.ResourceTransformationResult]:
+    """helper function that points aws resources without a provider to the
+    provider carrying the default_tags and adds the remaining tags"""
+    opts = args.opts
+    if _uses_default_provider(args):
+        opts = pulumi.ResourceOptions.merge(
+            opts, pulumi.ResourceOptions(provider=provider)
+        )
+    # Autoscaling groups don't get the provider default_tags
+    remaining_tags = tags if args.type_ == AUTOSCALING_GROUP else {}
+    if policy is not None and can_be_tagged(args.type_):
+        policy_tags = policy.resolve(args.type_, args.name)
+        if policy_tags is None:
+            remaining_tags = None
+        elif policy_tags:
+            remaining_tags = {**remaining_tags, **policy_tags}
+    result = None
+    if remaining_tags is not None:
+        result = _tag_resource(args, remaining_tags)
+    if result is not None:
+        return pulumi.ResourceTransformationResult(result.props, opts)
+    if opts is not args.opts:
+        return pulumi.ResourceTransformationResult(args.props, opts)
+    return None
+
+
+def _uses_default_provider(args) -> bool:
+    """Returns true if the aws resource would be registered with the
+    default aws provider i-e no provider is given in its options and
+    none is inherited from its parent"""
+    if not args.type_.startswith("aws:"):
+        return False
+    opts = args.opts
+    if opts.provider is not None:
+        return False
+    providers = opts.providers or {}
+    if isinstance(providers, Mapping):
+        providers = providers.values()
+    if any(p.package == "aws" for p in providers):
+        return False
+    return opts.parent is None or opts.parent.get_provider(args.type_) is None
+
+
 def _tag_resource(args, tags) -> pulumi.ResourceTransformationResult:  # noqa E501
     """helper function to add tags to taggable aws resources at run time"""
     # Check if the aws resource is taggable or not
     if can_be_tagged(args.type_):
         # Skip resources with id
         if args.opts.id:
-            return pulumi.ResourceTransformationResult(args.prop, args.opts)
+            return pulumi.ResourceTransformationResult(args.props, args.opts)
+        resource_tags = args.props.get("tags")
         # We need to handle autoscaling group resource differently
-        if args.type_ == "aws:autoscaling/group:Group":
-            tag_list = [
-                aws.autoscaling.GroupTagArgs(
-                    key=k, value=v, propagate_at_launch=True
-                )  # noqa E501
-                for k, v in tags.items()
-            ]
+        if args.type_ == AUTOSCALING_GROUP:
+            project_tag_args = _group_tag_args(tuple(tags.items()))
+
             # Autoscaling group requires a list of GroupTagArgs
-            args.props["tags"] = pulumi.Output.from_input(
-                args.props["tags"]
-            ).apply(  # noqa E501
-                # We add the Name tag with value set to the
-                # name of the resource
-                lambda tags: [
-                    aws.autoscaling.GroupTagArgs(
-                        key="Name",
-                        value=f"{args.name}",
-                    ),
-                    *tag_list,
-                    *(tags or []),
-                ]
-            )
+            def merge_tags(x):
+                return _merge_group_tags(args.name, project_tag_args, x)
+
         else:
-            args.props["tags"] = pulumi.Output.from_input(
-                args.props["tags"]
-            ).apply(  # noqa E501
+
+            def merge_tags(x):
                 # We add the Name tag with value set to the
                 # name of the resource
-                lambda x: {
+                return {
                     "Name": f"{args.name}",
                     **tags,
                     **(x or {}),
                 }
-            )
+
+        # Plain values are merged right away, only tags that are not
+        # known yet are merged once they resolve
+        if _is_plain(resource_tags):
+            args.props["tags"] = merge_tags(resource_tags)
+        else:
+            args.props["tags"] = pulumi.Output.from_input(
+                resource_tags
+            ).apply(merge_tags)
         return pulumi.ResourceTransformationResult(args.props, args.opts)
 
 
+@functools.lru_cache(maxsize=None)
+def _group_tag_args(
+    tags: Tuple[Tuple[str, str], ...]
+) -> Mapping[str, "aws.autoscaling.GroupTagArgs"]:
+    """Returns the GroupTagArgs of the tags keyed by tag key. They are
+    built once per set of tags and shared by all autoscaling groups"""
+    # The autoscaling annotations are quoted to only import the module
+    # when a stack actually has autoscaling groups
+    return MappingProxyType(
+        {
+            key: aws.autoscaling.GroupTagArgs(
+                key=key, value=value, propagate_at_launch=True
+            )
+            for key, value in tags
+        }
+    )
+
+
+def _merge_group_tags(
+    name: str,
+    project_tag_args: Mapping[str, "aws.autoscaling.GroupTagArgs"],
+    resource_tags,
+) -> list:
+    """Merges the Name tag, the project tags and the tags of the
+    autoscaling group. Like the tags of other resources, a key defined
+    on the resource overrides the same key of the project tags."""
+    # We add the Name tag with value set to the
+    # name of the resource
+    merged = {
+        "Name": aws.autoscaling.GroupTagArgs(
+            key="Name", value=f"{name}", propagate_at_launch=True
+        ),
+        **project_tag_args,
+    }
+    unkeyed = []
+    for tag in resource_tags or []:
+        key = _group_tag_key(tag)
+        if isinstance(key, str):
+            merged[key] = tag
+        else:
+            # The key is not known yet, we can't deduplicate it
+            unkeyed.append(tag)
+    return [*merged.values(), *unkeyed]
+
+
+def _group_tag_key(tag):
+    if isinstance(tag, aws.autoscaling.GroupTagArgs):
+        return tag.key
+    if isinstance(tag, Mapping):
+        return tag.get("key")
+    return None
+
+
+def _is_plain(value) -> bool:
+    """Returns true if the value is known at registration time i-e it is
+    neither an Output nor an awaitable"""
+    return not isinstance(value, pulumi.Output) and not isawaitable(value)
+
+
 def can_be_tagged(resource) -> bool:
     """A function that returns true if the provided aws resource
     can be tagged."""
-    return resource in taggable_aws_resource_list
+    return resource in _taggable_index
+
+
+class TaggableIndex:
+    """A prebuilt index of taggable aws resource types.
+
+    Exact resource types are kept in a frozenset. Patterns ending in
+    ``/*`` (e.g. ``aws:rds/*``) mark a whole module as taggable and are
+    kept in a per-module table. Both lookups are constant time, which
+    matters as the check runs in the stack transformation of every
+    resource registered in the program."""
+
+    __slots__ = ("_types", "_modules")
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        types = set()
+        modules = set()
+        for pattern in patterns:
+            if pattern.endswith("/*"):
+                modules.add(pattern[:-2])
+            else:
+                types.add(pattern)
+        self._types = frozenset(types)
+        self._modules = frozenset(modules)
+
+    def __contains__(self, resource_type: str) -> bool:
+        if resource_type in self._types:
+            return True
+        if not self._modules:
+            return False
+        module, sep, _ = resource_type.partition("/")
+        return bool(sep) and module in self._modules
+
+    def __len__(self) -> int:
+        return len(self._types) + len(self._modules)
 
 
 taggable_aws_resource_list = [
@@ -292,3 +573,7 @@ taggable_aws_resource_list = [
     "aws:workspaces/directory:Directory",
     "aws:workspaces/ipGroup:IpGroup",
 ]
+
+# The hand maintained list is kept as a fallback for resource types
+# missing from the catalog of the installed pulumi-aws version
+_taggable_index = TaggableIndex([*taggable_aws_resource_list, *load_catalog()])
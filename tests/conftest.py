@@ -0,0 +1,78 @@
+"""Fixtures running the components against pulumi mocks"""
+from typing import Dict, Iterator, List
+
+import pulumi
+import pytest
+
+from pulumi_components.aws.components.rds import parameter_groups
+from pulumi_components.aws.utils import invokes, providers
+
+ACCOUNT_ID = "123456789012"
+REGION = "eu-west-1"
+IPV6_CIDR = "2600:1f18:abcd:1200::/56"
+
+CALL_RESULTS = {
+    "aws:index/getCallerIdentity:getCallerIdentity": {
+        "accountId": ACCOUNT_ID,
+        "arn": f"arn:aws:iam::{ACCOUNT_ID}:user/test",
+        "id": ACCOUNT_ID,
+        "userId": "AIDATEST",
+    },
+    "aws:index/getRegion:getRegion": {"id": REGION, "name": REGION},
+}
+
+
+class Mocks(pulumi.runtime.Mocks):
+    """Mocks that echo resource inputs back as outputs and record the
+    registered resources and the invokes"""
+
+    def __init__(self) -> None:
+        self.resources: List[pulumi.runtime.MockResourceArgs] = []
+        self.calls: List[pulumi.runtime.MockCallArgs] = []
+
+    def new_resource(self, args: pulumi.runtime.MockResourceArgs):
+        self.resources.append(args)
+        outputs = dict(args.inputs)
+        if "tags" in outputs:
+            outputs["tagsAll"] = outputs["tags"]
+        # aws assigns the ipv6 /56 of a vpc
+        if outputs.get("assignGeneratedIpv6CidrBlock"):
+            outputs["ipv6CidrBlock"] = IPV6_CIDR
+        # aws names the arn of a bucket after it
+        if args.typ == "aws:s3/bucketV2:BucketV2":
+            outputs["arn"] = f"arn:aws:s3:::{args.name}"
+        return [args.resource_id or f"{args.name}-id", outputs]
+
+    def call(self, args: pulumi.runtime.MockCallArgs):
+        self.calls.append(args)
+        return CALL_RESULTS.get(args.token, {})
+
+    def of_type(self, typ: str) -> Dict[str, dict]:
+        """Returns the inputs of the resources of the type keyed by name"""
+        return {
+            resource.name: resource.inputs
+            for resource in self.resources
+            if resource.typ == typ
+        }
+
+
+@pytest.fixture
+def config():
+    """Returns the setter of the stack config, cleared after the test"""
+    pulumi.runtime.set_all_config({})
+    yield pulumi.runtime.set_config
+    pulumi.runtime.set_all_config({})
+
+
+@pytest.fixture
+def mocks(config) -> Iterator[Mocks]:
+    """Runs the test against fresh mocks, a new root stack drops the
+    stack transformations of the previous tests"""
+    pulumi.runtime.settings.set_root_resource(None)
+    mocks = Mocks()
+    pulumi.runtime.set_mocks(mocks, preview=False)
+    yield mocks
+    # Memoized lookups and shared resources belong to the program run
+    invokes.clear()
+    providers.clear()
+    parameter_groups.clear()
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from pulumi_components.aws.utils import catalog
+
+CATALOG = {"aws:ec2": ["vpc:Vpc"], "aws:s3": ["bucketV2:BucketV2"]}
+
+
+@pytest.fixture
+def cache_home(tmp_path, monkeypatch):
+    """Points the user cache to a tmp folder and hides the shipped
+    catalogs"""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(catalog, "PACKAGED_CATALOG_DIR", tmp_path / "none")
+    return tmp_path / "cache"
+
+
+def test_generates_the_catalog_of_the_installed_pulumi_aws():
+    types = catalog.generate_catalog()
+
+    assert "vpc:Vpc" in types["aws:ec2"]
+    assert "flowLog:FlowLog" in types["aws:ec2"]
+    # Resources without a tags input are left out
+    assert "route:Route" not in types["aws:ec2"]
+
+
+def test_caches_the_generated_catalog_per_version(cache_home, monkeypatch):
+    monkeypatch.setattr(catalog, "generate_catalog", lambda: CATALOG)
+    version = catalog.pulumi_aws_version()
+
+    types = catalog.load_catalog()
+
+    assert types == {"aws:ec2/vpc:Vpc", "aws:s3/bucketV2:BucketV2"}
+    path = cache_home / "pulumi-components" / "catalogs"
+    cached = json.loads(
+        (path / f"pulumi-aws-{version}.json").read_text(encoding="utf-8")
+    )
+    assert cached == {"pulumi_aws": version, "types": CATALOG}
+    # The next programs read the cached catalog
+    monkeypatch.setattr(catalog, "generate_catalog", pytest.fail)
+    assert catalog.load_catalog() == types
+
+
+def test_unwritable_cache_still_returns_the_catalog(cache_home, monkeypatch):
+    monkeypatch.setattr(catalog, "generate_catalog", lambda: CATALOG)
+    # The cache folder can't be created under a file
+    cache_home.write_text("")
+
+    assert catalog.load_catalog() == {
+        "aws:ec2/vpc:Vpc",
+        "aws:s3/bucketV2:BucketV2",
+    }
+
+
+def test_version_without_a_catalog_is_empty(cache_home, monkeypatch):
+    monkeypatch.setattr(catalog, "generate_catalog", pytest.fail)
+
+    assert catalog.load_catalog("0.0.1") == frozenset()
+
+
+def test_shipped_catalog_is_read_first(cache_home, monkeypatch, tmp_path):
+    packaged = tmp_path / "packaged"
+    catalog.write_catalog("0.0.1", CATALOG, packaged)
+    monkeypatch.setattr(catalog, "PACKAGED_CATALOG_DIR", packaged)
+
+    assert "aws:ec2/vpc:Vpc" in catalog.load_catalog("0.0.1")
@@ -0,0 +1,51 @@
+import pulumi
+import pytest
+
+from pulumi_components.aws.utils import invokes
+
+CALLER_IDENTITY = "aws:index/getCallerIdentity:getCallerIdentity"
+
+
+def _account_ids(count: int):
+    results = []
+
+    def program():
+        for _ in range(count):
+            invokes.get_caller_identity_output().account_id.apply(
+                results.append
+            )
+
+    pulumi.runtime.test(program)()
+    return results
+
+
+def test_lookups_are_made_once_per_provider(mocks):
+    assert _account_ids(3) == ["123456789012"] * 3
+    assert [call.token for call in mocks.calls] == [CALLER_IDENTITY]
+
+
+def test_old_runtimes_fall_back_to_the_pulumi_aws_invokes(
+    mocks, monkeypatch
+):
+    monkeypatch.delattr(pulumi.runtime, "invoke_output", raising=False)
+
+    assert _account_ids(2) == ["123456789012"] * 2
+    assert [call.token for call in mocks.calls] == [CALLER_IDENTITY]
+
+
+@pytest.mark.parametrize("runtime_invoke", [True, False])
+def test_peering_connection_lookup_waits_for_its_filters(
+    mocks, monkeypatch, runtime_invoke
+):
+    if not runtime_invoke:
+        monkeypatch.delattr(pulumi.runtime, "invoke_output")
+
+    def program():
+        invokes.get_vpc_peering_connection_output(
+            vpc_id=pulumi.Output.from_input("vpc-1"), peer_vpc_id="vpc-2"
+        )
+
+    pulumi.runtime.test(program)()
+
+    (call,) = mocks.calls
+    assert call.args == {"vpcId": "vpc-1", "peerVpcId": "vpc-2"}
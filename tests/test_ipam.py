@@ -0,0 +1,95 @@
+import ipaddress
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pulumi
+import pytest
+
+from pulumi_components.aws.components.vpc import (
+    CidrValidationException,
+    IpamRegistry,
+    Vpc,
+)
+
+OWNER = "project/stack/main"
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return IpamRegistry(str(tmp_path / "ipam.db"), pool="10.0.0.0/8")
+
+
+def test_allocations_are_idempotent_per_owner(registry):
+    assert registry.allocate(OWNER, 16) == "10.0.0.0/16"
+    assert registry.allocate("project/stack/other", 16) == "10.1.0.0/16"
+    assert registry.allocate(OWNER, 16) == "10.0.0.0/16"
+    with pytest.raises(ValueError, match="already owns 10.0.0.0/16"):
+        registry.allocate(OWNER, 20)
+
+
+def test_reserve_rejects_overlaps_and_cidrs_outside_the_pool(registry):
+    assert registry.reserve(OWNER, "10.2.0.0/16") == "10.2.0.0/16"
+    assert registry.reserve(OWNER, "10.2.0.0/16") == "10.2.0.0/16"
+    with pytest.raises(CidrValidationException, match="of project/stack/main"):
+        registry.reserve("project/stack/other", "10.2.128.0/17")
+    with pytest.raises(ValueError, match="is not within the pool"):
+        registry.reserve("project/stack/other", "192.168.0.0/16")
+    # Allocations go around the reserved cidr
+    assert registry.allocate("project/stack/other", 15) == "10.0.0.0/15"
+    assert registry.allocate("project/stack/third", 16) == "10.3.0.0/16"
+
+
+def test_dry_runs_record_nothing(registry):
+    assert registry.allocate(OWNER, 16, dry_run=True) == "10.0.0.0/16"
+    assert registry.reserve(OWNER, "10.1.0.0/16", dry_run=True)
+    assert registry.allocations() == {}
+
+
+def test_release_frees_the_cidr(registry):
+    registry.allocate(OWNER, 16)
+    registry.release(OWNER)
+
+    assert registry.allocations() == {}
+    assert registry.allocate("project/stack/other", 16) == "10.0.0.0/16"
+
+
+def test_concurrent_allocations_get_distinct_blocks(tmp_path):
+    path = str(tmp_path / "ipam.db")
+    IpamRegistry(path)
+
+    def allocate(i):
+        return IpamRegistry(path).allocate(f"project/stack-{i}/main", 16)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        cidrs = list(pool.map(allocate, range(32)))
+
+    networks = sorted(map(ipaddress.ip_network, cidrs))
+    assert len(set(networks)) == 32
+    assert all(
+        not first.overlaps(second)
+        for first, second in zip(networks, networks[1:])
+    )
+
+
+def _vpc(name: str = "main", **kwargs):
+    pulumi.runtime.test(lambda: Vpc(name, **kwargs))()
+
+
+def test_a_preview_doesnt_record_the_cidr(mocks, registry):
+    pulumi.runtime.set_mocks(mocks, preview=True)
+    _vpc(ipam=registry)
+
+    assert registry.allocations() == {}
+
+
+def test_the_registry_dump_validates_the_vpc_it_came_from(
+    mocks, registry, tmp_path
+):
+    _vpc(ipam=registry)
+    dump = tmp_path / "registry.json"
+    dump.write_text(json.dumps(registry.allocations()))
+
+    assert registry.allocations() == {"10.0.0.0/16": OWNER}
+    _vpc(cidr="10.0.0.0/16", cidr_registry=str(dump))
+    with pytest.raises(CidrValidationException, match=OWNER):
+        _vpc("other", cidr="10.0.0.0/16", cidr_registry=str(dump))
@@ -0,0 +1,121 @@
+import pulumi
+import pulumi_aws as aws
+import pytest
+
+from pulumi_components.aws.components.rds.parameter_groups import (
+    content_hash,
+    get_cluster_parameter_group,
+    get_parameter_group,
+)
+
+FAMILY = "postgres14"
+
+
+def test_hash_ignores_order_case_and_value_types():
+    assert content_hash(
+        FAMILY,
+        [
+            {"name": "work_mem", "value": 4096},
+            {"name": "max_connections", "value": "200"},
+        ],
+    ) == content_hash(
+        FAMILY,
+        [
+            {"name": "Max_Connections", "value": 200},
+            {"name": "work_mem", "value": "4096"},
+        ],
+    )
+
+
+def test_hash_keeps_the_last_value_of_a_parameter():
+    assert content_hash(
+        FAMILY,
+        [
+            {"name": "work_mem", "value": "1024"},
+            {"name": "work_mem", "value": "4096"},
+        ],
+    ) == content_hash(FAMILY, [{"name": "work_mem", "value": "4096"}])
+
+
+def test_hash_rejects_output_values(mocks):
+    with pytest.raises(ValueError, match="work_mem"):
+        content_hash(
+            FAMILY,
+            [
+                {
+                    "name": "work_mem",
+                    "value": pulumi.Output.from_input("4096"),
+                }
+            ],
+        )
+
+
+def test_shared_group_holds_the_normalized_parameters(mocks):
+    def program():
+        first = get_parameter_group(
+            FAMILY,
+            [
+                {"name": "work_mem", "value": 4096},
+                {"name": "Max_Connections", "value": "100"},
+                {"name": "Max_Connections", "value": "200"},
+            ],
+        )
+        second = get_parameter_group(
+            FAMILY,
+            [
+                {"name": "max_connections", "value": "200"},
+                {"name": "work_mem", "value": "4096"},
+            ],
+        )
+        assert first is second
+        # The kinds of groups are never shared
+        get_cluster_parameter_group(
+            FAMILY, [{"name": "work_mem", "value": "4096"}]
+        )
+
+    pulumi.runtime.test(program)()
+
+    (group,) = mocks.of_type("aws:rds/parameterGroup:ParameterGroup").values()
+    assert group["parameters"] == [
+        {
+            "applyMethod": "pending-reboot",
+            "name": "Max_Connections",
+            "value": "200",
+        },
+        {"applyMethod": "pending-reboot", "name": "work_mem", "value": "4096"},
+    ]
+    assert len(
+        mocks.of_type("aws:rds/clusterParameterGroup:ClusterParameterGroup")
+    ) == 1
+
+
+def test_providers_get_their_own_group(mocks):
+    def program():
+        parameters = [{"name": "work_mem", "value": "4096"}]
+        groups = [
+            get_parameter_group(FAMILY, parameters, provider)
+            for provider in (
+                None,
+                aws.Provider("a", region="eu-west-1"),
+                aws.Provider("b", region="us-east-1"),
+            )
+        ]
+        assert len({id(group) for group in groups}) == 3
+
+    pulumi.runtime.test(program)()
+
+    groups = [
+        resource
+        for resource in mocks.resources
+        if resource.typ == "aws:rds/parameterGroup:ParameterGroup"
+    ]
+    names = [group.name for group in groups]
+    assert len(set(names)) == 3
+    assert names[0] == "shared-db-parameter-group-postgres14-" + (
+        content_hash(FAMILY, [{"name": "work_mem", "value": "4096"}])[:12]
+    )
+    assert all(name.startswith(names[0]) for name in names)
+    assert [group.provider.split("::")[-2:] for group in groups[1:]] == [
+        ["a", "a-id"],
+        ["b", "b-id"],
+    ]
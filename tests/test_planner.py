@@ -0,0 +1,179 @@
+import ipaddress
+
+import pytest
+
+from pulumi_components.aws.components.vpc import (
+    BuddyAllocator,
+    SubnetTierArgs,
+    plan_ipv6_subnets,
+    plan_subnets,
+)
+from pulumi_components.aws.components.vpc.planner import ipv6_subnet_cidr
+
+AZS = ["eu-west-1a", "eu-west-1b", "eu-west-1c"]
+
+
+def _cidrs(plan):
+    return {
+        tier: [subnet.cidr for subnet in subnets]
+        for tier, subnets in plan.items()
+    }
+
+
+def test_allocates_lowest_addresses_first():
+    allocator = BuddyAllocator("10.0.0.0/16")
+
+    assert str(allocator.allocate(24)) == "10.0.0.0/24"
+    assert str(allocator.allocate(24)) == "10.0.1.0/24"
+    assert str(allocator.allocate(20)) == "10.0.16.0/20"
+    # Small subnets fill the hole left next to the other small subnets
+    assert str(allocator.allocate(23)) == "10.0.2.0/23"
+
+
+def test_allocates_around_the_allocated_subnets():
+    allocator = BuddyAllocator("10.0.0.0/16", ["10.0.0.0/24", "10.0.2.0/23"])
+
+    assert str(allocator.allocate(24)) == "10.0.1.0/24"
+    assert str(allocator.allocate(23)) == "10.0.4.0/23"
+
+
+def test_reserve_marks_a_subnet_as_allocated():
+    allocator = BuddyAllocator("10.0.0.0/16")
+
+    assert str(allocator.reserve("10.0.0.0/24")) == "10.0.0.0/24"
+    assert str(allocator.reserve("10.0.3.0/24")) == "10.0.3.0/24"
+    assert str(allocator.allocate(24)) == "10.0.1.0/24"
+    assert str(allocator.allocate(24)) == "10.0.2.0/24"
+    assert str(allocator.allocate(24)) == "10.0.4.0/24"
+
+
+@pytest.mark.parametrize(
+    "cidr", ["10.0.0.0/24", "10.0.0.128/25", "10.0.0.0/23"]
+)
+def test_reserve_rejects_allocated_subnets(cidr):
+    allocator = BuddyAllocator("10.0.0.0/16", ["10.0.0.0/24"])
+
+    with pytest.raises(ValueError, match="overlaps an allocated subnet"):
+        allocator.reserve(cidr)
+
+
+def test_rejects_overlapping_allocated_subnets():
+    with pytest.raises(ValueError, match="overlaps an allocated subnet"):
+        BuddyAllocator("10.0.0.0/16", ["10.0.0.0/23", "10.0.1.0/24"])
+
+
+@pytest.mark.parametrize("cidr", ["10.1.0.0/24", "10.0.0.0/15", "fd00::/64"])
+def test_rejects_subnets_outside_the_network(cidr):
+    with pytest.raises(ValueError, match="is not a subnet of"):
+        BuddyAllocator("10.0.0.0/16", [cidr])
+
+
+@pytest.mark.parametrize("prefix_length", [15, 33])
+def test_rejects_invalid_prefix_lengths(prefix_length):
+    with pytest.raises(ValueError, match="Invalid prefix length"):
+        BuddyAllocator("10.0.0.0/16").allocate(prefix_length)
+
+
+def test_fails_when_no_block_is_left():
+    allocator = BuddyAllocator("10.0.0.0/23")
+    allocator.allocate(24)
+    allocator.allocate(24)
+
+    with pytest.raises(ValueError, match="No free /24 subnet left"):
+        allocator.allocate(24)
+
+
+def test_allocations_cover_the_network_without_overlaps():
+    allocator = BuddyAllocator("10.0.0.0/20")
+    subnets = [allocator.allocate(length) for length in (22, 24, 23, 24, 21)]
+
+    assert sum(subnet.num_addresses for subnet in subnets) == 4096
+    for i, subnet in enumerate(subnets):
+        assert subnet.subnet_of(ipaddress.ip_network("10.0.0.0/20"))
+        assert not any(subnet.overlaps(other) for other in subnets[i + 1 :])
+
+
+def test_plans_one_subnet_per_zone_and_tier():
+    plan = plan_subnets(
+        "10.0.0.0/16",
+        AZS,
+        [
+            SubnetTierArgs(name="public", prefix_length=24, public=True),
+            SubnetTierArgs(name="private", prefix_length=20),
+        ],
+    )
+
+    assert _cidrs(plan) == {
+        "public": ["10.0.0.0/24", "10.0.1.0/24", "10.0.2.0/24"],
+        "private": ["10.0.16.0/20", "10.0.32.0/20", "10.0.48.0/20"],
+    }
+    assert [subnet.az for subnet in plan["private"]] == AZS
+    assert {subnet.name for subnet in plan["private"]} == {"private"}
+
+
+def test_appending_a_tier_keeps_the_earlier_tiers():
+    tiers = [
+        SubnetTierArgs(name="public", prefix_length=24, public=True),
+        SubnetTierArgs(name="private", prefix_length=20),
+    ]
+    before = _cidrs(plan_subnets("10.0.0.0/16", AZS, tiers))
+    after = _cidrs(
+        plan_subnets(
+            "10.0.0.0/16",
+            AZS,
+            tiers + [SubnetTierArgs(name="data", prefix_length=24)],
+        )
+    )
+
+    assert {tier: after[tier] for tier in before} == before
+    assert after["data"] == ["10.0.3.0/24", "10.0.4.0/24", "10.0.5.0/24"]
+
+
+def test_plans_around_the_reserved_subnets():
+    plan = plan_subnets(
+        "10.0.0.0/16",
+        AZS[:2],
+        [SubnetTierArgs(name="data", prefix_length=24)],
+        reserved=["10.0.0.0/24"],
+    )
+
+    assert _cidrs(plan) == {"data": ["10.0.1.0/24", "10.0.2.0/24"]}
+
+
+def test_plan_requires_zones_and_unique_tiers():
+    tier = SubnetTierArgs(name="data", prefix_length=24)
+
+    with pytest.raises(ValueError, match="availability zone"):
+        plan_subnets("10.0.0.0/16", [], [tier])
+    with pytest.raises(ValueError, match="must be unique"):
+        plan_subnets("10.0.0.0/16", AZS, [tier, tier])
+
+
+def test_maps_subnets_to_the_ipv6_slot_of_their_first_address():
+    indexes = plan_ipv6_subnets(
+        "10.0.0.0/16", ["10.0.0.0/24", "10.0.255.0/24", "10.0.16.0/20"]
+    )
+
+    assert indexes == [0, 255, 16]
+
+
+def test_ipv6_slots_ignore_the_other_subnets():
+    before = plan_ipv6_subnets("10.0.0.0/16", ["10.0.1.0/24", "10.0.2.0/24"])
+    after = plan_ipv6_subnets(
+        "10.0.0.0/16", ["10.0.0.0/24", "10.0.2.0/24", "10.0.1.0/24"]
+    )
+
+    assert before == [1, 2]
+    assert after == [0, 2, 1]
+
+
+def test_rejects_subnets_sharing_an_ipv6_slot():
+    with pytest.raises(ValueError, match="same ipv6 /64"):
+        plan_ipv6_subnets("10.0.0.0/16", ["10.0.0.0/25", "10.0.0.128/25"])
+
+
+def test_ipv6_subnet_cidr_is_the_indexed_64():
+    cidr = "2600:1f18:abcd:1200::/56"
+
+    assert ipv6_subnet_cidr(cidr, 0) == "2600:1f18:abcd:1200::/64"
+    assert ipv6_subnet_cidr(cidr, 255) == "2600:1f18:abcd:12ff::/64"
@@ -0,0 +1,91 @@
+import pulumi
+import pytest
+
+from pulumi_components.aws.utils import TagPolicy, TagRule
+from pulumi_components.aws.utils.policy import _validate_tags
+
+EIP = "aws:ec2/eip:Eip"
+SUBNET = "aws:ec2/subnet:Subnet"
+INSTANCE = "aws:rds/instance:Instance"
+
+
+def test_rules_match_by_type_module_and_name():
+    policy = TagPolicy(
+        [
+            TagRule(tags={"scope": "all"}),
+            TagRule("aws:ec2/*", tags={"scope": "ec2"}),
+            TagRule(EIP, tags={"scope": "eip"}),
+            TagRule(name="prod-.*", tags={"env": "prod"}),
+        ]
+    ).compile({"team": "platform"})
+
+    assert policy.resolve(EIP, "nat") == {"team": "platform", "scope": "eip"}
+    assert policy.resolve(SUBNET, "prod-a") == {
+        "team": "platform",
+        "scope": "ec2",
+        "env": "prod",
+    }
+    assert policy.resolve(INSTANCE, "db") == {
+        "team": "platform",
+        "scope": "all",
+    }
+
+
+def test_later_rules_override_and_skip_wins():
+    policy = TagPolicy(
+        [
+            TagRule("aws:rds/*", tags={"data-class": "internal"}),
+            TagRule(name=".*-pii", tags={"data-class": "pii"}),
+            TagRule(EIP, skip=True),
+            TagRule(name="nat", tags={"role": "nat"}),
+        ]
+    ).compile({})
+
+    assert policy.resolve(INSTANCE, "db-pii") == {"data-class": "pii"}
+    assert policy.resolve(INSTANCE, "db") == {"data-class": "internal"}
+    assert policy.resolve(EIP, "nat") is None
+    assert policy.resolve(SUBNET, "nat") == {"role": "nat"}
+
+
+def test_name_patterns_match_the_full_name():
+    policy = TagPolicy([TagRule(name="db", tags={"role": "db"})]).compile({})
+
+    assert policy.resolve(INSTANCE, "db") == {"role": "db"}
+    assert policy.resolve(INSTANCE, "db-replica") == {}
+
+
+def test_merged_tags_are_shared_by_resources_matching_the_same_rules():
+    policy = TagPolicy([TagRule("aws:ec2/*", tags={"a": "b"})]).compile({})
+
+    assert policy.resolve(SUBNET, "one") is policy.resolve(EIP, "two")
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{}, {"tags": {"a": "b"}, "skip": True}],
+)
+def test_rules_must_either_tag_or_skip(kwargs):
+    with pytest.raises(ValueError):
+        TagRule(**kwargs)
+
+
+def test_validate_tags_stringifies_plain_values():
+    assert _validate_tags({"cost": 10, "on": True}, "tags") == {
+        "cost": "10",
+        "on": "True",
+    }
+
+
+def test_validate_tags_keeps_outputs():
+    owner = pulumi.Output.from_input("platform")
+
+    assert _validate_tags({"owner": owner}, "tags")["owner"] is owner
+
+
+@pytest.mark.parametrize(
+    "tags",
+    [["a"], {"": "b"}, {1: "b"}, {"a": None}, {"a": {"b": "c"}}],
+)
+def test_validate_tags_rejects_invalid_tags(tags):
+    with pytest.raises(ValueError):
+        _validate_tags(tags, "tags")
@@ -0,0 +1,69 @@
+import json
+
+import pulumi
+
+from pulumi_components.aws.components.vpc import (
+    Vpc,
+    VpcPeeringArgs,
+    VpcSubnetArgs,
+)
+from pulumi_components.aws.utils import register_tags
+from pulumi_components.aws.utils.providers import get_provider
+
+PROVIDER = "pulumi:providers:aws"
+
+
+def test_passes_the_profile_region_and_role(mocks):
+    role_arn = "arn:aws:iam::210987654321:role/network"
+    pulumi.runtime.test(
+        lambda: get_provider("network", "us-east-1", role_arn)
+    )()
+
+    (provider,) = mocks.of_type(PROVIDER).values()
+    assert provider["profile"] == "network"
+    assert provider["region"] == "us-east-1"
+    assert json.loads(provider["assumeRole"]) == {"roleArn": role_arn}
+
+
+def test_region_defaults_to_the_stack_region(mocks, config):
+    config("aws:region", "eu-central-1")
+
+    pulumi.runtime.test(lambda: get_provider("network"))()
+
+    (provider,) = mocks.of_type(PROVIDER).values()
+    assert provider["region"] == "eu-central-1"
+
+
+def test_ambiguous_keys_get_distinct_providers(mocks):
+    def program():
+        assert get_provider("a-b", "c") is not get_provider("a", "b-c")
+
+    pulumi.runtime.test(program)()
+
+    assert len(mocks.of_type(PROVIDER)) == 2
+
+
+def test_vpcs_share_the_provider_of_a_profile(mocks):
+    def program():
+        register_tags({"team": "network"})
+        for index, name in enumerate(("blue", "green")):
+            Vpc(
+                name,
+                cidr=f"10.{index}.0.0/16",
+                endpoints=None,
+                public_subnets=[
+                    VpcSubnetArgs(cidr=f"10.{index}.0.0/24", az="eu-west-1a")
+                ],
+                vpc_peering=[
+                    VpcPeeringArgs(
+                        name="shared",
+                        vpc_id="vpc-1",
+                        aws_profile="network",
+                        accepter=True,
+                    )
+                ],
+            )
+
+    pulumi.runtime.test(program)()
+
+    assert len(mocks.of_type(PROVIDER)) == 1
@@ -0,0 +1,129 @@
+import json
+
+import pytest
+
+from pulumi_components.aws.spec import (
+    SpecValidationException,
+    load_spec,
+    validate_spec,
+)
+from pulumi_components.aws.spec import loader
+
+SPEC = {
+    "vpcs": [
+        {
+            "name": "main",
+            "cidr": "10.0.0.0/16",
+            "availability_zones": ["eu-west-1a", "eu-west-1b"],
+            "subnet_tiers": [
+                {"name": "public", "prefix_length": 24, "public": True},
+                {"name": "db", "prefix_length": 24},
+            ],
+            "options": {"ha_nat": False},
+        }
+    ]
+}
+
+
+def _errors(data):
+    with pytest.raises(SpecValidationException) as raised:
+        validate_spec(data)
+    return str(raised.value).splitlines()[1:]
+
+
+def test_validates_a_spec_into_models():
+    spec = validate_spec(SPEC)
+
+    (vpc,) = spec.vpcs
+    assert vpc.name == "main"
+    assert [tier.name for tier in vpc.subnet_tiers] == ["public", "db"]
+    assert vpc.options == {"ha_nat": False}
+
+
+def test_reports_all_the_errors_at_once():
+    errors = _errors(
+        {
+            "vpcs": [
+                {"name": "main", "colour": "blue"},
+                {"name": "other", "cidr": "10.1.0.0/16", "options": {"x": 1}},
+            ],
+            "rds_instances": [
+                {"name": "db", "vpc": "missing", "password_config": "pw"}
+            ],
+        }
+    )
+
+    assert "  vpcs[0].colour: unknown field" in errors
+    assert "  vpcs[0].cidr: is required" in errors
+    assert "  vpcs[1].options.x: unknown option" in errors
+    assert "  rds_instances[0].vpc: no vpc named missing in the spec" in errors
+
+
+def test_reports_conflicting_subnets():
+    errors = _errors(
+        {
+            "vpcs": [
+                {
+                    "name": "main",
+                    "cidr": "10.0.0.0/16",
+                    "public_subnets": [
+                        {"cidr": "10.0.0.0/24", "az": "eu-west-1a"},
+                        {"cidr": "10.0.1.0/24", "az": "eu-west-1a"},
+                    ],
+                }
+            ]
+        }
+    )
+
+    assert len(errors) == 1
+    assert "eu-west-1a-public" in errors[0]
+
+
+def test_caches_the_validated_spec(tmp_path, monkeypatch):
+    path = tmp_path / "stack.json"
+    path.write_text(json.dumps(SPEC))
+    cache_dir = tmp_path / "cache"
+    spec = load_spec(path, cache_dir=cache_dir)
+
+    # A cached spec is neither parsed nor validated again
+    monkeypatch.setattr(loader, "validate_spec", pytest.fail)
+    assert load_spec(path, cache_dir=cache_dir).to_dict() == spec.to_dict()
+    assert len(list(cache_dir.iterdir())) == 1
+
+
+def test_cache_key_includes_the_package_versions(tmp_path, monkeypatch):
+    path = tmp_path / "stack.json"
+    path.write_text(json.dumps(SPEC))
+    cache_dir = tmp_path / "cache"
+    load_spec(path, cache_dir=cache_dir)
+
+    monkeypatch.setattr(loader, "_package_versions", lambda: "0.2.0:6.0.0")
+    load_spec(path, cache_dir=cache_dir)
+
+    assert len(list(cache_dir.iterdir())) == 2
+
+
+def test_corrupt_cache_is_validated_again(tmp_path):
+    path = tmp_path / "stack.json"
+    path.write_text(json.dumps(SPEC))
+    cache_dir = tmp_path / "cache"
+    spec = load_spec(path, cache_dir=cache_dir)
+    (cached,) = cache_dir.iterdir()
+    cached.write_text("{")
+
+    assert load_spec(path, cache_dir=cache_dir).to_dict() == spec.to_dict()
+
+
+def test_loads_yaml_specs(tmp_path):
+    path = tmp_path / "stack.yaml"
+    path.write_text(
+        "vpcs:\n"
+        "  - name: main\n"
+        "    cidr: 10.0.0.0/16\n"
+        "    public_subnets:\n"
+        "      - {cidr: 10.0.0.0/24, az: eu-west-1a}\n"
+    )
+
+    spec = load_spec(path, use_cache=False)
+
+    assert spec.vpcs[0].public_subnets[0].cidr == "10.0.0.0/24"
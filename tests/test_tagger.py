@@ -0,0 +1,169 @@
+import json
+
+import pulumi
+
+from pulumi_components.aws.utils import register_tags
+from pulumi_components.aws.utils.tagger import (
+    TaggableIndex,
+    _tag_resource,
+    can_be_tagged,
+    default_provider_args,
+)
+
+BUCKET = "aws:s3/bucketV2:BucketV2"
+
+
+def _transform(props, tags):
+    args = pulumi.ResourceTransformationArgs(
+        None, BUCKET, "logs", props, pulumi.ResourceOptions()
+    )
+    return _tag_resource(args, tags).props["tags"]
+
+
+def test_default_provider_args_read_the_aws_config(config):
+    config("aws:region", "eu-central-1")
+    config("aws:profile", "production")
+    config("aws:skipMetadataApiCheck", "false")
+    config("aws:maxRetries", "5")
+    config("aws:assumeRole", json.dumps({"roleArn": "arn:aws:iam::1:role/x"}))
+    config("aws:allowedAccountIds", json.dumps(["123456789012"]))
+    config("project:region", "us-east-1")
+
+    assert default_provider_args() == {
+        "region": "eu-central-1",
+        "profile": "production",
+        "skip_metadata_api_check": False,
+        "max_retries": 5,
+        "assume_role": {"roleArn": "arn:aws:iam::1:role/x"},
+        "allowed_account_ids": ["123456789012"],
+    }
+
+
+def test_default_provider_args_without_aws_config(config):
+    assert default_provider_args() == {}
+
+
+def test_default_tags_provider_uses_the_stack_config(mocks, config):
+    config("aws:region", "eu-central-1")
+    config("aws:assumeRole", json.dumps({"roleArn": "arn:aws:iam::1:role/x"}))
+    config("aws:defaultTags", json.dumps({"tags": {"owner": "platform"}}))
+
+    pulumi.runtime.test(
+        lambda: register_tags({"team": "data"}, use_default_tags=True)
+    )()
+
+    provider = mocks.of_type("pulumi:providers:aws")["default-tags-provider"]
+    assert provider["region"] == "eu-central-1"
+    assert json.loads(provider["assumeRole"]) == {
+        "roleArn": "arn:aws:iam::1:role/x"
+    }
+    assert json.loads(provider["defaultTags"]) == {
+        "tags": {"owner": "platform", "team": "data"}
+    }
+
+
+def test_output_tag_values_are_resolved(mocks):
+    def program():
+        import pulumi_aws as aws
+
+        register_tags({"owner": pulumi.Output.from_input("platform")})
+        aws.s3.BucketV2("logs")
+        aws.autoscaling.Group("workers", max_size=1, min_size=1)
+
+    pulumi.runtime.test(program)()
+
+    bucket = mocks.of_type("aws:s3/bucketV2:BucketV2")["logs"]
+    assert bucket["tags"] == {"Name": "logs", "owner": "platform"}
+    group = mocks.of_type("aws:autoscaling/group:Group")["workers"]
+    assert {tag["key"]: tag["value"] for tag in group["tags"]} == {
+        "Name": "workers",
+        "owner": "platform",
+    }
+
+
+def test_taggable_index_matches_types_and_module_wildcards():
+    index = TaggableIndex(["aws:s3/bucketV2:BucketV2", "aws:rds/*"])
+
+    assert "aws:s3/bucketV2:BucketV2" in index
+    assert "aws:rds/instance:Instance" in index
+    assert "aws:s3/bucketPolicy:BucketPolicy" not in index
+    assert "aws:rds" not in index
+    assert len(index) == 2
+
+
+def test_taggable_resources_of_the_list_and_the_catalog():
+    # From the built-in list, and from the catalog of pulumi_aws only
+    assert can_be_tagged("aws:ec2/vpc:Vpc")
+    assert can_be_tagged("aws:ec2/flowLog:FlowLog")
+    assert not can_be_tagged("aws:ec2/route:Route")
+    assert not can_be_tagged(
+        "aws:ec2/routeTableAssociation:RouteTableAssociation"
+    )
+    assert not can_be_tagged("pulumi:providers:aws")
+
+
+def test_plain_tags_are_merged_right_away():
+    tags = _transform({"tags": {"team": "data"}}, {"owner": "platform"})
+
+    assert tags == {"Name": "logs", "owner": "platform", "team": "data"}
+    # Also without tags of the resource
+    assert _transform({}, {"owner": "platform"}) == {
+        "Name": "logs",
+        "owner": "platform",
+    }
+
+
+def test_output_tags_are_merged_once_resolved(mocks):
+    def check(merged):
+        assert merged == {"Name": "logs", "owner": "platform", "team": "data"}
+
+    def program():
+        tags = _transform(
+            {"tags": pulumi.Output.from_input({"team": "data"})},
+            {"owner": "platform"},
+        )
+        assert isinstance(tags, pulumi.Output)
+        return tags.apply(check)
+
+    pulumi.runtime.test(program)()
+
+
+def test_output_tag_values_keep_the_fast_path(mocks):
+    team = pulumi.Output.from_input("data")
+
+    tags = _transform({"tags": {"team": team}}, {"owner": "platform"})
+
+    # The keys are known, the value resolves with the resource
+    assert tags == {"Name": "logs", "owner": "platform", "team": team}
+
+
+def test_group_tags_keep_one_entry_per_key(mocks):
+    def program():
+        import pulumi_aws as aws
+
+        register_tags({"owner": "platform", "team": "data"})
+        aws.autoscaling.Group(
+            "workers",
+            max_size=1,
+            min_size=1,
+            tags=[
+                aws.autoscaling.GroupTagArgs(
+                    key="team", value="search", propagate_at_launch=False
+                ),
+                {"key": "Name", "value": "web", "propagate_at_launch": True},
+            ],
+        )
+
+    pulumi.runtime.test(program)()
+
+    group = mocks.of_type("aws:autoscaling/group:Group")["workers"]
+    keys = [tag["key"] for tag in group["tags"]]
+    assert sorted(keys) == ["Name", "owner", "team"]
+    # The tags of the group win over the project tags
+    assert {tag["key"]: tag["value"] for tag in group["tags"]} == {
+        "Name": "web",
+        "owner": "platform",
+        "team": "search",
+    }
+    team = next(tag for tag in group["tags"] if tag["key"] == "team")
+    assert team["propagateAtLaunch"] is False
@@ -0,0 +1,152 @@
+import pulumi
+import pytest
+
+from pulumi_components.aws.components.vpc import (
+    TransitGatewayAttachmentArgs,
+    TransitGatewayFabric,
+    Vpc,
+    VpcSubnetArgs,
+)
+
+
+def _vpc(name, index, standalone_routes=True):
+    return Vpc(
+        name,
+        cidr=f"10.{index}.0.0/16",
+        endpoints=None,
+        standalone_routes=standalone_routes,
+        public_subnets=[
+            VpcSubnetArgs(cidr=f"10.{index}.0.0/24", az="eu-west-1a")
+        ],
+    )
+
+
+def _fabric(summary_cidrs=None):
+    shared = _vpc("shared", 0)
+    prod = _vpc("prod", 1)
+    TransitGatewayFabric(
+        "hub",
+        [
+            TransitGatewayAttachmentArgs(
+                name="shared",
+                vpc=shared,
+                domain="shared",
+                propagate_to=["shared", "prod"],
+            ),
+            TransitGatewayAttachmentArgs(
+                name="prod", vpc=prod, domain="prod", propagate_to=["shared"]
+            ),
+        ],
+        summary_cidrs=summary_cidrs,
+    )
+
+
+def _fabric_routes(mocks):
+    return {
+        name: inputs
+        for name, inputs in mocks.of_type("aws:ec2/route:Route").items()
+        if inputs.get("transitGatewayId")
+    }
+
+
+def test_associates_the_vpcs_with_the_route_table_of_their_domain(mocks):
+    pulumi.runtime.test(_fabric)()
+
+    assert sorted(
+        mocks.of_type("aws:ec2transitgateway/routeTable:RouteTable")
+    ) == ["hub-prod-route-table", "hub-shared-route-table"]
+    associations = mocks.of_type(
+        "aws:ec2transitgateway/routeTableAssociation:RouteTableAssociation"
+    )
+    assert {
+        name: inputs["transitGatewayRouteTableId"]
+        for name, inputs in associations.items()
+    } == {
+        "hub-shared-association": "hub-shared-route-table-id",
+        "hub-prod-association": "hub-prod-route-table-id",
+    }
+
+
+def test_propagates_the_vpcs_to_their_propagate_to_domains(mocks):
+    pulumi.runtime.test(_fabric)()
+
+    propagations = mocks.of_type(
+        "aws:ec2transitgateway/routeTablePropagation:RouteTablePropagation"
+    )
+    assert {
+        name: inputs["transitGatewayRouteTableId"]
+        for name, inputs in propagations.items()
+    } == {
+        "hub-shared-shared-propagation": "hub-shared-route-table-id",
+        "hub-shared-prod-propagation": "hub-prod-route-table-id",
+        "hub-prod-shared-propagation": "hub-shared-route-table-id",
+    }
+
+
+def test_routes_the_cidr_of_every_reachable_vpc(mocks):
+    pulumi.runtime.test(_fabric)()
+
+    routes = _fabric_routes(mocks)
+    assert {
+        name: inputs["destinationCidrBlock"]
+        for name, inputs in routes.items()
+    } == {
+        "hub-shared-public-rt-prod-route": "10.1.0.0/16",
+        "hub-prod-public-rt-shared-route": "10.0.0.0/16",
+    }
+    assert {inputs["routeTableId"] for inputs in routes.values()} == {
+        "shared-public-rt-id",
+        "prod-public-rt-id",
+    }
+
+
+def test_routes_the_summary_cidrs_instead(mocks):
+    pulumi.runtime.test(lambda: _fabric(summary_cidrs=["10.0.0.0/8"]))()
+
+    routes = _fabric_routes(mocks)
+    assert {
+        name: inputs["destinationCidrBlock"]
+        for name, inputs in routes.items()
+    } == {
+        "hub-shared-public-rt-10-0-0-0-8-route": "10.0.0.0/8",
+        "hub-prod-public-rt-10-0-0-0-8-route": "10.0.0.0/8",
+    }
+
+
+@pytest.mark.parametrize(
+    "summary_cidrs, expected", [(None, 4 * 3), (["10.0.0.0/8"], 4)]
+)
+def test_route_growth_of_one_domain(mocks, summary_cidrs, expected):
+    def program():
+        TransitGatewayFabric(
+            "hub",
+            [
+                TransitGatewayAttachmentArgs(name=name, vpc=_vpc(name, index))
+                for index, name in enumerate(("a", "b", "c", "d"))
+            ],
+            summary_cidrs=summary_cidrs,
+        )
+
+    pulumi.runtime.test(program)()
+
+    assert len(_fabric_routes(mocks)) == expected
+
+
+def test_rejects_vpcs_without_standalone_routes(mocks):
+    vpc = _vpc("inline", 0, standalone_routes=False)
+    with pytest.raises(ValueError, match="standalone_routes=True"):
+        TransitGatewayFabric(
+            "hub", [TransitGatewayAttachmentArgs(name="inline", vpc=vpc)]
+        )
+
+
+def test_rejects_duplicate_attachment_names(mocks):
+    vpc = _vpc("main", 0)
+    with pytest.raises(ValueError, match="unique"):
+        TransitGatewayFabric(
+            "hub",
+            [
+                TransitGatewayAttachmentArgs(name="main", vpc=vpc),
+                TransitGatewayAttachmentArgs(name="main", vpc=vpc),
+            ],
+        )
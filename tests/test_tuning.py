@@ -0,0 +1,171 @@
+import pulumi
+import pytest
+
+from pulumi_components.aws.components.rds import AuroraCluster, RDSInstance
+from pulumi_components.aws.components.rds.tuning import (
+    GIB,
+    INNODB_CHUNK,
+    merge_parameters,
+    smallest_instance_class,
+    tune_parameters,
+)
+
+
+def _values(parameters):
+    return {parameter["name"]: parameter["value"] for parameter in parameters}
+
+
+def test_tunes_postgres_from_the_instance_memory():
+    # 2 vCPUs and 16GiB
+    values = _values(tune_parameters("postgres", "db.r6g.large", "oltp"))
+
+    assert values == {
+        # A quarter of the memory in 8kB pages
+        "shared_buffers": "524288",
+        "effective_cache_size": "1572864",
+        "max_connections": "1600",
+        "work_mem": "4096",
+        "maintenance_work_mem": "838860",
+        "max_worker_processes": "8",
+        "max_parallel_workers": "2",
+        "max_parallel_workers_per_gather": "0",
+    }
+
+
+def test_buffer_pool_is_a_multiple_of_the_chunks_of_its_instances():
+    values = _values(tune_parameters("mysql", "db.r6g.xlarge", "oltp"))
+
+    instances = int(values["innodb_buffer_pool_instances"])
+    pool_size = int(values["innodb_buffer_pool_size"])
+    assert instances == 24
+    assert pool_size == 24 * GIB
+    assert pool_size % (INNODB_CHUNK * instances) == 0
+
+
+def test_aurora_keeps_its_buffer_cache():
+    postgres = _values(tune_parameters("aurora-postgresql", "db.r6g.large"))
+    mysql = _values(tune_parameters("aurora-mysql", "db.r6g.large"))
+
+    assert "shared_buffers" not in postgres
+    assert "innodb_buffer_pool_size" not in mysql
+    assert postgres["max_connections"] == mysql["max_connections"] == "800"
+
+
+def test_only_mysql_tunes_the_io_threads():
+    mysql = _values(tune_parameters("mysql", "db.r6i.4xlarge"))
+    aurora = _values(tune_parameters("aurora-mysql", "db.r6i.4xlarge"))
+
+    assert mysql["innodb_read_io_threads"] == "8"
+    assert mysql["innodb_write_io_threads"] == "8"
+    assert "innodb_read_io_threads" not in aurora
+    assert "innodb_write_io_threads" not in aurora
+
+
+def test_analytics_favours_parallel_queries():
+    oltp = _values(tune_parameters("postgres", "db.r6i.4xlarge", "oltp"))
+    analytics = _values(
+        tune_parameters("postgres", "db.r6i.4xlarge", "analytics")
+    )
+
+    assert int(analytics["max_connections"]) < int(oltp["max_connections"])
+    assert int(analytics["work_mem"]) > int(oltp["work_mem"])
+    assert analytics["max_parallel_workers_per_gather"] == "8"
+
+
+@pytest.mark.parametrize(
+    "engine, instance_class, profile, message",
+    [
+        ("postgres", "db.r6g.large", "batch", "Unknown tuning profile"),
+        ("postgres", "db.x9.large", "mixed", "Unknown instance class"),
+        ("sqlserver-ee", "db.r6g.large", "mixed", "only supports"),
+    ],
+)
+def test_rejects_what_it_cant_tune(engine, instance_class, profile, message):
+    with pytest.raises(ValueError, match=message):
+        tune_parameters(engine, instance_class, profile)
+
+
+def test_smallest_instance_class_has_the_least_memory():
+    assert (
+        smallest_instance_class(
+            ["db.r6g.xlarge", "db.t4g.medium", "db.m6g.large"]
+        )
+        == "db.t4g.medium"
+    )
+    with pytest.raises(ValueError, match="db.x9.large"):
+        smallest_instance_class(["db.r6g.large", "db.x9.large"])
+
+
+def test_given_parameters_override_the_tuned_ones():
+    tuned = tune_parameters("postgres", "db.r6g.large")
+    merged = merge_parameters(
+        tuned, [{"name": "max_connections", "value": "100"}]
+    )
+
+    assert len(merged) == len(tuned)
+    assert _values(merged)["max_connections"] == "100"
+
+
+def test_rds_instance_gets_the_tuned_parameter_group(mocks):
+    def program():
+        RDSInstance(
+            "db",
+            allocated_storage="20",
+            instance_class="db.r6g.large",
+            engine="postgres",
+            engine_version="14",
+            family="postgres14",
+            identifier="db",
+            username="administrator",
+            password="password",
+            vpc_id="vpc-1",
+            subnet_ids=["subnet-1"],
+            parameters=[{"name": "max_connections", "value": "100"}],
+            additional_vpc_security_group_ids=[],
+            tuning_profile="oltp",
+        )
+
+    pulumi.runtime.test(program)()
+
+    group = mocks.of_type("aws:rds/parameterGroup:ParameterGroup")[
+        "db-parameter-group"
+    ]
+    values = _values(group["parameters"])
+    assert values["shared_buffers"] == "524288"
+    assert values["max_connections"] == "100"
+
+
+def test_aurora_cluster_gets_the_tuned_db_parameter_group(mocks):
+    def program():
+        AuroraCluster(
+            "db",
+            cluster_parameters=[{"name": "binlog_format", "value": "ROW"}],
+            db_parameters=[],
+            family="aurora-mysql8.0",
+            engine="aurora-mysql",
+            engine_version="8.0",
+            master_password="password",
+            subnet_ids=["subnet-1"],
+            vpc_id="vpc-1",
+            availability_zones=["eu-west-1a"],
+            instances=[
+                {"instance_class": "db.r6g.xlarge"},
+                {"instance_class": "db.r6g.large"},
+            ],
+            additional_security_group_ids=[],
+            tuning_profile="oltp",
+        )
+
+    pulumi.runtime.test(program)()
+
+    group = mocks.of_type("aws:rds/parameterGroup:ParameterGroup")[
+        "db-db-parameter-group"
+    ]
+    # Tuned for the instance class with the least memory
+    assert _values(group["parameters"]) == _values(
+        tune_parameters("aurora-mysql", "db.r6g.large", "oltp")
+    )
+    cluster_group = mocks.of_type(
+        "aws:rds/clusterParameterGroup:ClusterParameterGroup"
+    )["db-cluster-parameter-group"]
+    assert _values(cluster_group["parameters"]) == {"binlog_format": "ROW"}
@@ -0,0 +1,146 @@
+import json
+
+import pytest
+
+from pulumi_components.aws.components.vpc import (
+    CidrValidationException,
+    validate_vpc_cidrs,
+)
+from pulumi_components.aws.components.vpc.validation import (
+    CidrIndex,
+    find_overlaps,
+    validate_subnet_names,
+)
+
+
+def _pairs(overlaps):
+    return [(outer[0], inner[0]) for outer, inner in overlaps]
+
+
+def test_finds_no_overlaps_in_disjoint_cidrs():
+    assert find_overlaps([("a", "10.0.0.0/24"), ("b", "10.0.1.0/24")]) == []
+
+
+def test_reports_the_smallest_range_holding_a_cidr():
+    overlaps = find_overlaps(
+        [
+            ("small", "10.0.1.0/26"),
+            ("vpc", "10.0.0.0/16"),
+            ("subnet", "10.0.1.0/24"),
+            ("other", "10.1.0.0/24"),
+        ]
+    )
+
+    assert _pairs(overlaps) == [("vpc", "subnet"), ("subnet", "small")]
+
+
+def test_reports_duplicate_cidrs():
+    overlaps = find_overlaps([("a", "10.0.0.0/24"), ("b", "10.0.0.0/24")])
+
+    assert len(overlaps) == 1
+
+
+def test_ipv4_and_ipv6_cidrs_never_overlap():
+    assert find_overlaps([("a", "10.0.0.0/8"), ("b", "::/0")]) == []
+
+
+def test_index_finds_holding_and_held_ranges():
+    index = CidrIndex(
+        [
+            ("org", "10.0.0.0/8"),
+            ("team", "10.1.0.0/16"),
+            ("vpc", "10.1.2.0/24"),
+            ("other", "10.2.0.0/16"),
+        ]
+    )
+
+    assert sorted(label for label, _ in index.overlapping("10.1.0.0/16")) == [
+        "org",
+        "team",
+        "vpc",
+    ]
+    assert [label for label, _ in index.overlapping("192.168.0.0/16")] == []
+
+
+def test_accepts_valid_cidrs():
+    validate_vpc_cidrs(
+        "main",
+        "10.0.0.0/16",
+        subnets=[("a", "10.0.0.0/24"), ("b", "10.0.1.0/24")],
+        peerings=[("peer", "10.1.0.0/16")],
+    )
+
+
+def test_reports_all_the_conflicts_at_once():
+    with pytest.raises(CidrValidationException) as raised:
+        validate_vpc_cidrs(
+            "main",
+            "10.0.0.0/16",
+            subnets=[
+                ("a", "10.0.0.0/24"),
+                ("b", "10.0.0.128/25"),
+                ("c", "10.1.0.0/24"),
+            ],
+            peerings=[("peer", "10.0.0.0/8"), ("other", "10.2.0.0/16")],
+        )
+
+    errors = str(raised.value).splitlines()[1:]
+    assert errors == [
+        "  subnet c 10.1.0.0/24 is not within the vpc cidr 10.0.0.0/16",
+        "  subnet b 10.0.0.128/25 overlaps subnet a 10.0.0.0/24",
+        "  peering peer 10.0.0.0/8 overlaps vpc main 10.0.0.0/16",
+        "  peering peer 10.0.0.0/8 overlaps peering other 10.2.0.0/16",
+    ]
+
+
+def test_checks_the_registry_ignoring_the_own_range(tmp_path):
+    registry = tmp_path / "registry.json"
+    registry.write_text(
+        json.dumps({"10.0.0.0/16": "app/prod/main", "10.1.0.0/16": "shared"})
+    )
+
+    validate_vpc_cidrs(
+        "main", "10.0.0.0/16", registry=str(registry), owner="app/prod/main"
+    )
+    with pytest.raises(CidrValidationException, match="allocated to shared"):
+        validate_vpc_cidrs(
+            "main",
+            "10.1.0.0/24",
+            registry=str(registry),
+            owner="app/prod/main",
+        )
+
+
+def test_vpcs_of_the_same_name_in_other_stacks_conflict(tmp_path):
+    registry = tmp_path / "registry.json"
+    registry.write_text(json.dumps({"10.0.0.0/16": "app/prod/main"}))
+
+    with pytest.raises(CidrValidationException, match="app/prod/main"):
+        validate_vpc_cidrs(
+            "main",
+            "10.0.0.0/16",
+            registry=str(registry),
+            owner="app/staging/main",
+        )
+    # Nor does the bare name of the vpc own a range
+    with pytest.raises(CidrValidationException, match="app/prod/main"):
+        validate_vpc_cidrs("main", "10.0.0.0/16", registry=str(registry))
+
+
+def test_registry_must_map_cidrs_to_owners(tmp_path):
+    registry = tmp_path / "registry.json"
+    registry.write_text(json.dumps(["10.0.0.0/16"]))
+
+    with pytest.raises(ValueError, match="must map allocated cidrs"):
+        validate_vpc_cidrs("main", "10.0.0.0/16", registry=str(registry))
+
+
+def test_accepts_distinct_subnet_names():
+    validate_subnet_names(["eu-west-1a-public", "eu-west-1a-app"])
+
+
+def test_reports_subnets_sharing_a_name():
+    with pytest.raises(ValueError, match="eu-west-1a-public"):
+        validate_subnet_names(
+            ["eu-west-1a-public", "eu-west-1b-public", "eu-west-1a-public"]
+        )
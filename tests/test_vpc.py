@@ -0,0 +1,258 @@
+import pulumi
+import pytest
+
+from pulumi_components.aws.components.vpc import (
+    Vpc,
+    VpcFlowLogArgs,
+    VpcPeeringArgs,
+    VpcSubnetArgs,
+)
+from pulumi_components.aws.utils import register_tags
+
+from .conftest import ACCOUNT_ID, IPV6_CIDR, REGION
+
+PUBLIC = [VpcSubnetArgs(cidr="10.0.0.0/24", az="eu-west-1a")]
+
+
+def test_rejects_unnamed_subnets_of_a_kind_in_one_az(mocks):
+    with pytest.raises(ValueError, match="eu-west-1a-private"):
+        Vpc(
+            "main",
+            cidr="10.0.0.0/16",
+            endpoints=None,
+            public_subnets=PUBLIC,
+            private_subnets=[
+                VpcSubnetArgs(cidr="10.0.1.0/24", az="eu-west-1a"),
+                VpcSubnetArgs(cidr="10.0.2.0/24", az="eu-west-1a"),
+            ],
+        )
+
+
+def test_names_the_subnets_of_a_kind_in_one_az(mocks):
+    pulumi.runtime.test(
+        lambda: Vpc(
+            "main",
+            cidr="10.0.0.0/16",
+            endpoints=None,
+            public_subnets=PUBLIC,
+            private_subnets=[
+                VpcSubnetArgs(cidr="10.0.1.0/24", az="eu-west-1a", name="app"),
+                VpcSubnetArgs(cidr="10.0.2.0/24", az="eu-west-1a", name="db"),
+            ],
+        )
+    )()
+
+    assert sorted(mocks.of_type("aws:ec2/subnet:Subnet")) == [
+        "main-eu-west-1a-app-subnet",
+        "main-eu-west-1a-db-subnet",
+        "main-eu-west-1a-public-subnet",
+    ]
+
+
+def test_peering_routes_keep_the_default_route(mocks):
+    def program():
+        register_tags({"team": "network"})
+        Vpc(
+            "main",
+            cidr="10.0.0.0/16",
+            endpoints=None,
+            standalone_routes=True,
+            public_subnets=PUBLIC,
+            vpc_peering=[
+                VpcPeeringArgs(
+                    name="default",
+                    vpc_id="vpc-1",
+                    account_id="210987654321",
+                    cidr="10.1.0.0/16",
+                )
+            ],
+        )
+
+    pulumi.runtime.test(program)()
+
+    routes = mocks.of_type("aws:ec2/route:Route")
+    assert routes["main-public-rt-default-route"]["gatewayId"]
+    peering_route = routes["main-public-rt-default-peering-route"]
+    assert peering_route["destinationCidrBlock"] == "10.1.0.0/16"
+
+
+def test_vpcs_share_a_stack(mocks):
+    def program():
+        for index, name in enumerate(("blue", "green")):
+            Vpc(
+                name,
+                cidr=f"10.{index}.0.0/16",
+                endpoints=None,
+                public_subnets=[
+                    VpcSubnetArgs(cidr=f"10.{index}.0.0/24", az="eu-west-1a")
+                ],
+            )
+
+    pulumi.runtime.test(program)()
+
+    # The urns of the children are made of their type and name
+    children = [(r.typ, r.name) for r in mocks.resources]
+    assert len(children) == len(set(children))
+    assert sorted(mocks.of_type("aws:ec2/vpc:Vpc")) == [
+        "blue-vpc",
+        "green-vpc",
+    ]
+
+
+def _private_vpc(**kwargs):
+    return Vpc(
+        "main",
+        cidr="10.0.0.0/16",
+        endpoints=["sts"],
+        public_subnets=PUBLIC,
+        private_subnets=[VpcSubnetArgs(cidr="10.0.1.0/24", az="eu-west-1a")],
+        **kwargs,
+    )
+
+
+def test_interface_endpoints_use_private_dns(mocks):
+    pulumi.runtime.test(_private_vpc)()
+
+    endpoint = mocks.of_type("aws:ec2/vpcEndpoint:VpcEndpoint")[
+        "main-sts-endpoint"
+    ]
+    assert endpoint["privateDnsEnabled"] is True
+
+
+def test_interface_endpoints_without_vpc_dns(mocks):
+    pulumi.runtime.test(lambda: _private_vpc(enable_dns_hostnames=False))()
+
+    endpoint = mocks.of_type("aws:ec2/vpcEndpoint:VpcEndpoint")[
+        "main-sts-endpoint"
+    ]
+    assert endpoint["privateDnsEnabled"] is False
+
+
+def test_endpoint_security_group_allows_ipv6(mocks):
+    pulumi.runtime.test(lambda: _private_vpc(ipv6=True))()
+
+    group = mocks.of_type("aws:ec2/securityGroup:SecurityGroup")[
+        "main-endpoints-security-group"
+    ]
+    assert group["ingress"][0]["cidrBlocks"] == ["10.0.0.0/16"]
+    assert group["ingress"][0]["ipv6CidrBlocks"] == [IPV6_CIDR]
+
+
+def test_ipv6_subnets_get_the_64_of_their_slot(mocks):
+    pulumi.runtime.test(lambda: _private_vpc(ipv6=True))()
+
+    subnets = mocks.of_type("aws:ec2/subnet:Subnet")
+    assert subnets["main-eu-west-1a-public-subnet"]["ipv6CidrBlock"] == (
+        "2600:1f18:abcd:1200::/64"
+    )
+    assert subnets["main-eu-west-1a-private-subnet"]["ipv6CidrBlock"] == (
+        "2600:1f18:abcd:1201::/64"
+    )
+
+
+def test_nat_gateway_capacity(mocks):
+    vpc = _private_vpc(nat_gateways_per_az=2)
+
+    assert vpc.nat_gateway_capacity == {
+        "main-eu-west-1a-nat-gateway": {
+            "addresses": 1,
+            "connections_per_destination": 55_000,
+            "private_subnets": 1,
+        },
+        "main-eu-west-1a-1-nat-gateway": {
+            "addresses": 1,
+            "connections_per_destination": 55_000,
+            "private_subnets": 0,
+        },
+    }
+
+
+def _flow_logged_vpc(flow_logs):
+    return Vpc(
+        "main",
+        cidr="10.0.0.0/16",
+        endpoints=None,
+        public_subnets=PUBLIC,
+        flow_logs=flow_logs,
+    )
+
+
+def test_flow_log_writes_hourly_hive_partitions(mocks):
+    pulumi.runtime.test(lambda: _flow_logged_vpc(VpcFlowLogArgs()))()
+
+    flow_log = mocks.of_type("aws:ec2/flowLog:FlowLog")["main-flow-log"]
+    assert flow_log["logDestinationType"] == "s3"
+    assert flow_log["logDestination"] == (
+        "arn:aws:s3:::main-flow-logs-bucket/main"
+    )
+    assert flow_log["destinationOptions"] == {
+        "fileFormat": "parquet",
+        "hiveCompatiblePartitions": True,
+        "perHourPartition": True,
+    }
+
+
+@pytest.mark.parametrize(
+    "flow_logs, location",
+    [
+        (VpcFlowLogArgs(), "s3://main-flow-logs-bucket/main"),
+        (
+            VpcFlowLogArgs(
+                bucket_arn="arn:aws:s3:::logs",
+                prefix="/vpc/main/",
+                database_name="network",
+            ),
+            "s3://logs/vpc/main",
+        ),
+    ],
+)
+def test_flow_logs_table_projects_the_flow_log_layout(
+    mocks, flow_logs, location
+):
+    pulumi.runtime.test(lambda: _flow_logged_vpc(flow_logs))()
+
+    flow_log = mocks.of_type("aws:ec2/flowLog:FlowLog")["main-flow-log"]
+    table = mocks.of_type("aws:glue/catalogTable:CatalogTable")[
+        "main-flow-logs-table"
+    ]
+    # The layout of the hive compatible hourly partitions of the flow log
+    bucket, prefix = flow_log["logDestination"].split(":::", 1)[1].split(
+        "/", 1
+    )
+    logs = (
+        f"s3://{bucket}/{prefix}/AWSLogs/aws-account-id={ACCOUNT_ID}"
+        f"/aws-service=vpcflowlogs/aws-region={REGION}/"
+    )
+    assert logs.startswith(f"{location}/AWSLogs/")
+    parameters = table["parameters"]
+    assert parameters["storage.location.template"] == (
+        f"{logs}year=${{year}}/month=${{month}}/day=${{day}}/hour=${{hour}}"
+    )
+    assert table["storageDescriptor"]["location"] == logs
+    assert [key["name"] for key in table["partitionKeys"]] == [
+        "year",
+        "month",
+        "day",
+        "hour",
+    ]
+    assert parameters["projection.enabled"] == "true"
+    assert {
+        key: value
+        for key, value in parameters.items()
+        if key.startswith("projection.") and key != "projection.enabled"
+    } == {
+        "projection.year.type": "date",
+        "projection.year.format": "yyyy",
+        "projection.year.range": "2021,NOW",
+        "projection.year.interval": "1",
+        "projection.year.interval.unit": "YEARS",
+        "projection.month.type": "integer",
+        "projection.month.range": "1,12",
+        "projection.month.digits": "2",
+        "projection.day.type": "integer",
+        "projection.day.range": "1,31",
+        "projection.day.digits": "2",
+        "projection.hour.type": "integer",
+        "projection.hour.range": "0,23",
+        "projection.hour.digits": "2",
+    }